@@ -11,12 +11,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import hashlib
 
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
 from oslo_utils import importutils
+from oslo_utils import timeutils
 import requests
 import webob
 
@@ -28,6 +30,9 @@ from heat.common import wsgi
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of validated signatures to cache
+MAX_CACHED_SIGNATURES = 1000
+
 
 opts = [
     cfg.StrOpt('auth_uri',
@@ -54,6 +59,12 @@ opts = [
                 default=False,
                 help=_('If set, then the server\'s certificate will not '
                        'be verified.')),
+    cfg.IntOpt('cache_ttl',
+               default=60,
+               help=_('Number of seconds for which the result of validating '
+                      'a signed request with keystone is cached, so that '
+                      'identical requests are not validated again. Set to '
+                      '0 to disable caching.')),
 ]
 cfg.CONF.register_opts(opts, group='ec2authtoken')
 
@@ -65,6 +76,9 @@ class EC2Token(wsgi.Middleware):
         self.conf = conf
         self.application = app
         self._ssl_options = None
+        self._sessions = {}
+        self._cache = collections.OrderedDict()
+        self._last_auth_uri = None
 
     def _conf_get(self, name):
         # try config from paste-deploy first
@@ -136,11 +150,18 @@ class EC2Token(wsgi.Middleware):
             # This is safe for the following reasons:
             # 1. AWSAccessKeyId is a randomly generated sequence
             # 2. No secret is transferred to validate a request
+            # The endpoint that last authorized a request is tried first.
             last_failure = None
-            for auth_uri in self._conf_get('allowed_auth_uris'):
+            auth_uris = list(self._conf_get('allowed_auth_uris'))
+            if self._last_auth_uri in auth_uris:
+                auth_uris.remove(self._last_auth_uri)
+                auth_uris.insert(0, self._last_auth_uri)
+            for auth_uri in auth_uris:
                 try:
                     LOG.debug("Attempt authorize on %s" % auth_uri)
-                    return self._authorize(req, auth_uri)
+                    app = self._authorize(req, auth_uri)
+                    self._last_auth_uri = auth_uri
+                    return app
                 except exception.HeatAPIException as e:
                     LOG.debug("Authorize failed: %s" % e.__class__)
                     last_failure = e
@@ -159,6 +180,33 @@ class EC2Token(wsgi.Middleware):
             }
         return self._ssl_options
 
+    def _session(self, keystone_ec2_uri):
+        '''Return the HTTP session, which pools connections, for a URI.'''
+        session = self._sessions.get(keystone_ec2_uri)
+        if session is None:
+            session = requests.Session()
+            self._sessions[keystone_ec2_uri] = session
+        return session
+
+    def _cache_get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        validated_at, result = entry
+        if timeutils.is_older_than(validated_at,
+                                   int(self._conf_get('cache_ttl'))):
+            del self._cache[key]
+            return None
+        return result
+
+    def _cache_put(self, key, result):
+        if int(self._conf_get('cache_ttl')) <= 0:
+            return
+        self._cache.pop(key, None)
+        self._cache[key] = (timeutils.utcnow(), result)
+        while len(self._cache) > MAX_CACHED_SIGNATURES:
+            self._cache.popitem(last=False)
+
     def _authorize(self, req, auth_uri):
         # Read request signature and access id.
         # If we find X-Auth-User in the headers we ignore a key error
@@ -211,12 +259,20 @@ class EC2Token(wsgi.Middleware):
         headers = {'Content-Type': 'application/json'}
 
         keystone_ec2_uri = self._conf_get_keystone_ec2_uri(auth_uri)
-        LOG.info(_LI('Authenticating with %s'), keystone_ec2_uri)
-        response = requests.post(keystone_ec2_uri, data=creds_json,
-                                 headers=headers,
-                                 verify=self.ssl_options['verify'],
-                                 cert=self.ssl_options['cert'])
-        result = response.json()
+        cache_key = (keystone_ec2_uri, access, signature,
+                     hashlib.sha256(creds_json.encode('utf-8')).hexdigest())
+        result = self._cache_get(cache_key)
+        if result is not None:
+            LOG.info(_LI('Using cached authentication with %s'),
+                     keystone_ec2_uri)
+        else:
+            LOG.info(_LI('Authenticating with %s'), keystone_ec2_uri)
+            session = self._session(keystone_ec2_uri)
+            response = session.post(keystone_ec2_uri, data=creds_json,
+                                    headers=headers,
+                                    verify=self.ssl_options['verify'],
+                                    cert=self.ssl_options['cert'])
+            result = response.json()
         try:
             token_id = result['access']['token']['id']
             tenant = result['access']['token']['tenant']['name']
@@ -239,6 +295,7 @@ class EC2Token(wsgi.Middleware):
                 raise exception.HeatAccessDeniedError()
 
         # Authenticated!
+        self._cache_put(cache_key, result)
         ec2_creds = {'ec2Credentials': {'access': access,
                                         'signature': signature}}
         req.headers['X-Auth-EC2-Creds'] = json.dumps(ec2_creds)
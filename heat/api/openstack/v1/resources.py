@@ -120,11 +120,11 @@ class ResourceController(object):
         Gets metadata information for a resource
         """
 
-        res = self.rpc_client.describe_stack_resource(req.context,
-                                                      identity,
-                                                      resource_name)
+        metadata = self.rpc_client.resource_metadata(req.context,
+                                                     identity,
+                                                     resource_name)
 
-        return {rpc_api.RES_METADATA: res[rpc_api.RES_METADATA]}
+        return {rpc_api.RES_METADATA: metadata}
 
     @util.identified_stack
     def signal(self, req, identity, resource_name, body=None):
@@ -134,10 +134,21 @@ class ResourceController(object):
                                         details=body)
 
 
+class ResourceSerializer(serializers.JSONResponseSerializer):
+    """Handles serialization of specific controller method responses."""
+
+    def metadata(self, response, result):
+        # Metadata is polled by servers, so tag it with an ETag and let the
+        # response be replaced with a 304 if the client already has it
+        self.default(response, result)
+        response.md5_etag()
+        response.conditional_response = True
+
+
 def create_resource(options):
     """
     Resources resource factory method.
     """
     deserializer = wsgi.JSONRequestDeserializer()
-    serializer = serializers.JSONResponseSerializer()
+    serializer = ResourceSerializer()
     return wsgi.Resource(ResourceController(options), deserializer, serializer)
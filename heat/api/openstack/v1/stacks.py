@@ -396,9 +396,18 @@ class StackController(object):
         """
         Gets detailed information for a stack
         """
+        live_outputs = False
+        if rpc_api.PARAM_RESOLVE_OUTPUTS in req.params:
+            try:
+                mode = param_utils.extract_resolve_outputs(
+                    req.params.get(rpc_api.PARAM_RESOLVE_OUTPUTS))
+            except ValueError as ex:
+                raise exc.HTTPBadRequest(six.text_type(ex))
+            live_outputs = mode == 'live'
 
         stack_list = self.rpc_client.show_stack(req.context,
-                                                identity)
+                                                identity,
+                                                live_outputs=live_outputs)
 
         if not stack_list:
             raise exc.HTTPInternalServerError()
@@ -116,6 +116,20 @@ engine_opts = [
                default=1000,
                help=_('Maximum resources allowed per top-level stack. '
                       '-1 stands for unlimited.')),
+    cfg.IntOpt('max_concurrent_resource_actions_per_stack',
+               default=0,
+               help=_('Maximum number of resources in a single stack that '
+                      'may be acted on at the same time. 0 stands for '
+                      'unlimited.')),
+    cfg.IntOpt('max_concurrent_resource_actions',
+               default=0,
+               help=_('Maximum number of resource actions that may be in '
+                      'progress at the same time across all stacks in an '
+                      'engine. Available slots are shared fairly between '
+                      'stacks, and the limit is reduced temporarily when '
+                      'a cloud API reports that it is over its limit. '
+                      '0 stands for unlimited, in which case actions are '
+                      'never throttled.')),
     cfg.IntOpt('max_stacks_per_tenant',
                default=100,
                help=_('Maximum number of stacks any one tenant may have'
@@ -136,6 +150,12 @@ engine_opts = [
                help=_('Maximum events that will be available per stack. Older'
                       ' events will be deleted when this is reached. Set to 0'
                       ' for unlimited events per stack.')),
+    cfg.FloatOpt('event_flush_interval',
+                 default=0.0,
+                 help=_('Maximum time in seconds for which an engine queues '
+                        'resource events before writing them to the '
+                        'database in a single batch. Set to 0 to write each '
+                        'event as soon as it occurs.')),
     cfg.IntOpt('stack_action_timeout',
                default=3600,
                help=_('Timeout in seconds for stack action (ie. create or'
@@ -162,6 +182,44 @@ engine_opts = [
                 help=_('Enables engine with convergence architecture. All '
                        'stacks with this option will be created using '
                        'convergence engine .')),
+    cfg.IntOpt('template_cache_size',
+               default=100,
+               help=_('Maximum number of parsed templates that an engine '
+                      'keeps in memory for reuse. Set to 0 to disable the '
+                      'cache.')),
+    cfg.IntOpt('template_cache_max_size',
+               default=64,
+               help=_('Maximum total size in MB of the templates that an '
+                      'engine keeps in memory for reuse.')),
+    cfg.IntOpt('client_lookup_cache_ttl',
+               default=60,
+               help=_('Number of seconds for which the ID found when looking '
+                      'up an image, flavor, network or other entity by name '
+                      'is reused by later lookups with the same request '
+                      'context. Set to 0 to disable caching.')),
+    cfg.IntOpt('convergence_check_batch_size',
+               default=50,
+               help=_('Maximum number of resource checks that an engine sends '
+                      'to other engines in a single message during a '
+                      'convergence traversal.')),
+    cfg.FloatOpt('convergence_check_batch_linger',
+                 default=0.0,
+                 help=_('Time in seconds for which an engine holds resource '
+                        'checks that have become ready, so that they can be '
+                        'sent together with checks triggered by other '
+                        'resources. Set to 0 to send the checks triggered by '
+                        'each resource as soon as it is complete.')),
+    cfg.BoolOpt('cache_resolved_properties',
+                default=False,
+                help=_('Cache the resolved values of resource properties '
+                       'between changes of resource state, instead of '
+                       'resolving them again on every access.')),
+    cfg.IntOpt('sync_point_retry_limit',
+               default=30,
+               help=_('Maximum number of times an engine will retry a '
+                      'conflicting update to a convergence sync point, '
+                      'backing off exponentially between attempts, before '
+                      'giving up.')),
     cfg.StrOpt('default_software_config_transport',
                choices=['POLL_SERVER_CFN',
                         'POLL_SERVER_HEAT',
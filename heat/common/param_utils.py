@@ -65,6 +65,15 @@ def extract_tags(subject):
     return tags
 
 
+def extract_resolve_outputs(subject):
+    mode = subject.lower()
+    if mode not in ('stored', 'live'):
+        raise ValueError(_('Invalid value "%(value)s" for resolve_outputs, '
+                           'valid values are: stored, live.') %
+                         {'value': subject})
+    return mode
+
+
 def extract_template_type(subject):
     template_type = subject.lower()
     if template_type not in ('cfn', 'hot'):
@@ -0,0 +1,77 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process counters for collecting engine performance statistics.
+
+Counters are grouped by name (e.g. "sync_point") and are shared by all users
+of that name within a process, so that the values can be logged or inspected
+from a single place.
+"""
+
+import collections
+
+import six
+
+
+_registry = {}
+
+
+class Counters(object):
+    """A named group of monotonically increasing counters."""
+
+    def __init__(self, name):
+        self.name = name
+        self._values = collections.defaultdict(int)
+
+    def incr(self, key, amount=1):
+        """Increment the named counter by the given amount."""
+        self._values[key] += amount
+
+    def get(self, key):
+        """Return the current value of the named counter."""
+        return self._values.get(key, 0)
+
+    def ratio(self, key, other_key):
+        """Return the proportion of key out of the sum of key and other_key.
+
+        This is intended for calculating e.g. cache hit rates; 0.0 is returned
+        if both counters are zero.
+        """
+        total = self.get(key) + self.get(other_key)
+        if not total:
+            return 0.0
+        return float(self.get(key)) / total
+
+    def as_dict(self):
+        """Return a snapshot of all counters as a dictionary."""
+        return dict(self._values)
+
+    def reset(self):
+        """Reset all counters to zero."""
+        self._values.clear()
+
+
+def get_counters(name):
+    """Return the group of counters with the given name.
+
+    The group is created the first time it is requested.
+    """
+    if name not in _registry:
+        _registry[name] = Counters(name)
+    return _registry[name]
+
+
+def get_all():
+    """Return a snapshot of every group of counters, keyed by name."""
+    return dict((name, counters.as_dict())
+                for name, counters in six.iteritems(_registry))
@@ -110,6 +110,14 @@ def resource_create(context, values):
     return IMPL.resource_create(context, values)
 
 
+def resource_create_batch(context, values_list):
+    return IMPL.resource_create_batch(context, values_list)
+
+
+def resource_update_batch(context, values_by_id):
+    return IMPL.resource_update_batch(context, values_by_id)
+
+
 def resource_exchange_stacks(context, resource_id1, resource_id2):
     return IMPL.resource_exchange_stacks(context, resource_id1, resource_id2)
 
@@ -135,6 +143,11 @@ def stack_get(context, stack_id, show_deleted=False, tenant_safe=True,
                           eager_load=eager_load)
 
 
+def stack_get_status(context, stack_id, show_deleted=False):
+    return IMPL.stack_get_status(context, stack_id,
+                                 show_deleted=show_deleted)
+
+
 def stack_get_by_name_and_owner_id(context, stack_name, owner_id):
     return IMPL.stack_get_by_name_and_owner_id(context, stack_name,
                                                owner_id=owner_id)
@@ -254,10 +267,18 @@ def event_count_all_by_stack(context, stack_id):
     return IMPL.event_count_all_by_stack(context, stack_id)
 
 
+def event_delete_oldest_by_stack(context, stack_id, limit):
+    return IMPL.event_delete_oldest_by_stack(context, stack_id, limit)
+
+
 def event_create(context, values):
     return IMPL.event_create(context, values)
 
 
+def event_create_batch(context, values_list):
+    return IMPL.event_create_batch(context, values_list)
+
+
 def watch_rule_get(context, watch_rule_id):
     return IMPL.watch_rule_get(context, watch_rule_id)
 
@@ -270,6 +291,10 @@ def watch_rule_get_all(context):
     return IMPL.watch_rule_get_all(context)
 
 
+def watch_rule_get_all_due(context, now):
+    return IMPL.watch_rule_get_all_due(context, now)
+
+
 def watch_rule_get_all_by_stack(context, stack_id):
     return IMPL.watch_rule_get_all_by_stack(context, stack_id)
 
@@ -298,6 +323,10 @@ def watch_data_get_all_by_watch_rule_id(context, watch_rule_id):
     return IMPL.watch_data_get_all_by_watch_rule_id(context, watch_rule_id)
 
 
+def watch_data_delete_older_than(context, watch_rule_id, cutoff):
+    return IMPL.watch_data_delete_older_than(context, watch_rule_id, cutoff)
+
+
 def software_config_create(context, values):
     return IMPL.software_config_create(context, values)
 
@@ -397,6 +426,10 @@ def sync_point_create(context, values):
     return IMPL.sync_point_create(context, values)
 
 
+def sync_point_create_batch(context, values_list):
+    return IMPL.sync_point_create_batch(context, values_list)
+
+
 def sync_point_get(context, entity_id, traversal_id, is_update):
     return IMPL.sync_point_get(context, entity_id, traversal_id, is_update)
 
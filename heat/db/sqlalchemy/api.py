@@ -12,10 +12,13 @@
 #    under the License.
 
 '''Implementation of SQLAlchemy backend.'''
+import collections
 import datetime
 import sys
+import uuid
 
 from oslo_config import cfg
+from oslo_db import exception as db_exception
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils
 from oslo_utils import encodeutils
@@ -33,11 +36,11 @@ from heat.common.i18n import _
 from heat.db.sqlalchemy import filters as db_filters
 from heat.db.sqlalchemy import migration
 from heat.db.sqlalchemy import models
+from heat.db.sqlalchemy import utils as db_utils
 from heat.rpc import api as rpc_api
 
 CONF = cfg.CONF
 CONF.import_opt('hidden_stack_tags', 'heat.common.config')
-CONF.import_opt('max_events_per_stack', 'heat.common.config')
 CONF.import_group('profiler', 'heat.common.config')
 
 _facade = None
@@ -98,7 +101,38 @@ def raw_template_get(context, template_id):
     return result
 
 
+def _raw_template_blob(context, template, files):
+    '''
+    Return the blob storing a template and its files.
+
+    A blob is created only if no template with the same contents has been
+    stored before.
+    '''
+    files = files or {}
+    digest = db_utils.template_digest(template, files)
+    session = _session(context)
+
+    def get_blob():
+        return session.query(models.RawTemplateBlob).filter_by(
+            digest=digest).first()
+
+    blob_ref = get_blob()
+    if blob_ref is None:
+        blob_ref = models.RawTemplateBlob(digest=digest, template=template,
+                                          files=files)
+        try:
+            blob_ref.save(session)
+        except db_exception.DBDuplicateEntry:
+            # Stored concurrently by another request
+            blob_ref = get_blob()
+    return blob_ref
+
+
 def raw_template_create(context, values):
+    values = dict(values)
+    values['blob'] = _raw_template_blob(context,
+                                        values.pop('template', None),
+                                        values.pop('files', None))
     raw_template_ref = models.RawTemplate()
     raw_template_ref.update(values)
     raw_template_ref.save(_session(context))
@@ -111,6 +145,11 @@ def raw_template_update(context, template_id, values):
     values = dict((k, v) for k, v in values.items()
                   if getattr(raw_template_ref, k) != v)
 
+    if 'template' in values or 'files' in values:
+        template = values.pop('template', raw_template_ref.template)
+        files = values.pop('files', raw_template_ref.files)
+        values['blob'] = _raw_template_blob(context, template, files)
+
     if values:
         raw_template_ref.update_and_save(values)
 
@@ -314,6 +353,26 @@ def resource_create(context, values):
     return resource_ref
 
 
+def resource_create_batch(context, values_list):
+    session = _session(context)
+    resource_refs = []
+    with session.begin():
+        for values in values_list:
+            resource_ref = models.Resource()
+            resource_ref.update(values)
+            session.add(resource_ref)
+            resource_refs.append(resource_ref)
+    return resource_refs
+
+
+def resource_update_batch(context, values_by_id):
+    session = _session(context)
+    with session.begin():
+        for resource_id, values in six.iteritems(values_by_id):
+            session.query(models.Resource).filter_by(
+                id=resource_id).update(values, synchronize_session='evaluate')
+
+
 def resource_get_all_by_stack(context, stack_id):
     results = model_query(
         context, models.Resource
@@ -367,6 +426,20 @@ def stack_get(context, stack_id, show_deleted=False, tenant_safe=True,
     return result
 
 
+def stack_get_status(context, stack_id, show_deleted=False):
+    query = model_query(context, models.Stack).options(
+        orm.load_only('action', 'status', 'status_reason', 'updated_at',
+                      'deleted_at'))
+    result = query.filter_by(id=stack_id).first()
+
+    deleted_ok = show_deleted or context.show_deleted
+    if result is None or result.deleted_at is not None and not deleted_ok:
+        raise exception.NotFound(_('Stack with id %s not found') % stack_id)
+
+    return (result.action, result.status, result.status_reason,
+            result.updated_at)
+
+
 def stack_get_all_by_owner_id(context, owner_id):
     results = soft_delete_aware_query(
         context, models.Stack).filter_by(owner_id=owner_id).all()
@@ -504,6 +577,12 @@ def stack_count_all(context, filters=None, tenant_safe=True,
 
 
 def stack_create(context, values):
+    owner_id = values.get('owner_id')
+    if owner_id and not values.get('root_stack_id'):
+        owner = model_query(context, models.Stack).get(owner_id)
+        if owner is not None:
+            values = dict(values,
+                          root_stack_id=owner.root_stack_id or owner.id)
     stack_ref = models.Stack()
     stack_ref.update(values)
     stack_ref.save(_session(context))
@@ -587,6 +666,8 @@ def stack_lock_release(stack_id, engine_id):
 
 def stack_get_root_id(context, stack_id):
     s = stack_get(context, stack_id)
+    if s.root_stack_id is not None:
+        return s.root_stack_id
     while s.owner_id:
         s = stack_get(context, s.owner_id)
     return s.id
@@ -595,24 +676,40 @@ def stack_get_root_id(context, stack_id):
 def stack_count_total_resources(context, stack_id):
 
     # start with a stack_get to confirm the context can access the stack
-    if stack_id is None or stack_get(context, stack_id) is None:
+    if stack_id is None:
+        return 0
+    stack = stack_get(context, stack_id)
+    if stack is None:
         return 0
 
-    def nested_stack_ids(sid):
-        yield sid
-        for child in stack_get_all_by_owner_id(context, sid):
-            for stack in nested_stack_ids(child.id):
-                yield stack
+    query = model_query(context, models.Resource).join(
+        models.Stack, models.Resource.stack_id == models.Stack.id)
+    if not context.show_deleted:
+        query = query.filter(models.Stack.deleted_at.is_(None))
 
-    stack_ids = list(nested_stack_ids(stack_id))
+    if stack.owner_id is None:
+        # Every stack in the tree is either the root or records it
+        return query.filter(sqlalchemy.or_(
+            models.Stack.id == stack_id,
+            models.Stack.root_stack_id == stack_id)).count()
 
-    # count all resources which belong to the stacks
-    results = model_query(
-        context, models.Resource
-    ).filter(
-        models.Resource.stack_id.in_(stack_ids)
-    ).count()
-    return results
+    # For a nested stack, find its descendants among the stacks sharing its
+    # root stack, which are all retrieved in a single query
+    root_id = stack.root_stack_id or stack_get_root_id(context, stack_id)
+    children = collections.defaultdict(list)
+    for sid, owner_id in soft_delete_aware_query(
+            context, models.Stack.id, models.Stack.owner_id).filter(
+                models.Stack.root_stack_id == root_id):
+        children[owner_id].append(sid)
+
+    stack_ids = []
+    to_visit = [stack_id]
+    while to_visit:
+        sid = to_visit.pop()
+        stack_ids.append(sid)
+        to_visit.extend(children[sid])
+
+    return query.filter(models.Stack.id.in_(stack_ids)).count()
 
 
 def user_creds_create(context):
@@ -766,19 +863,38 @@ def _delete_event_rows(context, stack_id, limit):
     return q.delete(synchronize_session='fetch')
 
 
+def event_delete_oldest_by_stack(context, stack_id, limit):
+    return _delete_event_rows(context, stack_id, limit)
+
+
 def event_create(context, values):
-    if 'stack_id' in values and cfg.CONF.max_events_per_stack:
-        if ((event_count_all_by_stack(context, values['stack_id']) >=
-             cfg.CONF.max_events_per_stack)):
-            # prune
-            _delete_event_rows(
-                context, values['stack_id'], cfg.CONF.event_purge_batch_size)
     event_ref = models.Event()
     event_ref.update(values)
     event_ref.save(_session(context))
     return event_ref
 
 
+def event_create_batch(context, values_list):
+    if not values_list:
+        return
+    rows = []
+    for values in values_list:
+        row = dict(values)
+        row.setdefault('uuid', str(uuid.uuid4()))
+        row.setdefault('created_at', timeutils.utcnow())
+        reason = row.get('resource_status_reason')
+        row['resource_status_reason'] = reason and reason[:255] or ''
+        rows.append(row)
+    # All rows in a multi-row insert must supply the same columns
+    keys = set().union(*rows)
+    for row in rows:
+        for key in keys:
+            row.setdefault(key, None)
+    session = _session(context)
+    with session.begin():
+        session.execute(models.Event.__table__.insert(), rows)
+
+
 def watch_rule_get(context, watch_rule_id):
     result = model_query(context, models.WatchRule).get(watch_rule_id)
     return result
@@ -795,6 +911,23 @@ def watch_rule_get_all(context):
     return results
 
 
+def watch_rule_get_all_due(context, now):
+    results = model_query(context, models.WatchRule).filter(
+        ~models.WatchRule.state.in_([
+            rpc_api.WATCH_STATE_SUSPENDED,
+            rpc_api.WATCH_STATE_CEILOMETER_CONTROLLED])).filter(
+        sqlalchemy.or_(models.WatchRule.last_evaluated.is_(None),
+                       models.WatchRule.last_evaluated <= now)).all()
+
+    def is_due(wr):
+        if wr.last_evaluated is None:
+            return True
+        period = int(wr.rule.get('Period', wr.rule.get('period', 0)))
+        return wr.last_evaluated + datetime.timedelta(seconds=period) <= now
+
+    return [wr for wr in results if is_due(wr)]
+
+
 def watch_rule_get_all_by_stack(context, stack_id):
     results = model_query(
         context, models.WatchRule).filter_by(stack_id=stack_id).all()
@@ -854,6 +987,13 @@ def watch_data_get_all_by_watch_rule_id(context, watch_rule_id):
     return results
 
 
+def watch_data_delete_older_than(context, watch_rule_id, cutoff):
+    return model_query(context, models.WatchData).filter(
+        models.WatchData.watch_rule_id == watch_rule_id,
+        models.WatchData.created_at < cutoff).delete(
+            synchronize_session=False)
+
+
 def software_config_create(context, values):
     obj_ref = models.SoftwareConfig()
     obj_ref.update(values)
@@ -1075,6 +1215,16 @@ def purge_deleted(age, granularity='days'):
         user_creds_del = user_creds.delete().where(user_creds.c.id == s[2])
         engine.execute(user_creds_del)
 
+    # Purge the contents of templates that are no longer referenced
+    raw_template_blob = sqlalchemy.Table('raw_template_blob', meta,
+                                         autoload=True)
+    referenced = sqlalchemy.select([raw_template.c.blob_id]).where(
+        raw_template.c.blob_id.isnot(None))
+    blob_del = raw_template_blob.delete().where(sqlalchemy.and_(
+        raw_template_blob.c.created_at < time_line,
+        ~raw_template_blob.c.id.in_(referenced)))
+    engine.execute(blob_del)
+
     # Purge deleted services
     service = sqlalchemy.Table('service', meta, autoload=True)
     stmt = (sqlalchemy.select([service.c.id]).
@@ -1101,6 +1251,19 @@ def sync_point_create(context, values):
     return sync_point_ref
 
 
+def sync_point_create_batch(context, values_list):
+    now = timeutils.utcnow()
+    rows = [dict(values, entity_id=str(values['entity_id']), created_at=now)
+            for values in values_list]
+    if not rows:
+        return []
+    session = _session(context)
+    with session.begin():
+        session.execute(models.SyncPoint.__table__.insert(), rows)
+    return [(row['entity_id'], row['traversal_id'], row['is_update'])
+            for row in rows]
+
+
 def sync_point_get(context, entity_id, traversal_id, is_update):
     entity_id = str(entity_id)
     return model_query(context, models.SyncPoint).get(
@@ -0,0 +1,46 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData(bind=migrate_engine)
+
+    stack = sqlalchemy.Table('stack', meta, autoload=True)
+    root_stack_id = sqlalchemy.Column('root_stack_id',
+                                      sqlalchemy.String(36))
+    root_stack_id.create(stack)
+
+    root_index = sqlalchemy.Index('ix_stack_root_stack_id',
+                                  stack.c.root_stack_id)
+    root_index.create(migrate_engine)
+
+    # Populate the root stack of every nested stack
+    stmt = sqlalchemy.select([stack.c.id, stack.c.owner_id])
+    owners = dict((row.id, row.owner_id)
+                  for row in migrate_engine.execute(stmt))
+
+    def get_root(stack_id):
+        seen = set()
+        while owners.get(stack_id) and stack_id not in seen:
+            seen.add(stack_id)
+            stack_id = owners[stack_id]
+        return stack_id
+
+    for stack_id, owner_id in owners.items():
+        if owner_id is None:
+            continue
+        update = stack.update().where(
+            stack.c.id == stack_id).values(root_stack_id=get_root(owner_id))
+        migrate_engine.execute(update)
@@ -0,0 +1,113 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import migrate
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+import sqlalchemy
+
+from heat.db.sqlalchemy import types as heat_db_types
+from heat.db.sqlalchemy import utils as migrate_utils
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData(bind=migrate_engine)
+
+    blob = sqlalchemy.Table(
+        'raw_template_blob', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
+                          nullable=False),
+        sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('digest', sqlalchemy.String(64), nullable=False,
+                          unique=True),
+        sqlalchemy.Column('template', heat_db_types.Json),
+        sqlalchemy.Column('files', heat_db_types.Json),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    blob.create()
+
+    raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
+    get_blob_id = _blob_store(migrate_engine, blob)
+
+    if migrate_engine.name == 'sqlite':
+        _upgrade_sqlite(migrate_engine, meta, raw_template, get_blob_id)
+        return
+
+    blob_id = sqlalchemy.Column('blob_id', sqlalchemy.Integer)
+    blob_id.create(raw_template)
+
+    stmt = sqlalchemy.select([raw_template.c.id,
+                              raw_template.c.template,
+                              raw_template.c.files])
+    for row in migrate_engine.execute(stmt).fetchall():
+        update = raw_template.update().where(
+            raw_template.c.id == row.id).values(
+                blob_id=get_blob_id(row.template, row.files))
+        migrate_engine.execute(update)
+
+    fkey = migrate.ForeignKeyConstraint(columns=[raw_template.c.blob_id],
+                                        refcolumns=[blob.c.id],
+                                        name='raw_template_blob_ref')
+    fkey.create()
+    raw_template.c.template.drop()
+    raw_template.c.files.drop()
+
+
+def _upgrade_sqlite(migrate_engine, meta, raw_template, get_blob_id):
+    newcols = [
+        sqlalchemy.Column('blob_id', sqlalchemy.Integer,
+                          sqlalchemy.ForeignKey('raw_template_blob.id',
+                                                name='raw_template_blob_ref')),
+    ]
+    ignorecols = [raw_template.c.template.name, raw_template.c.files.name]
+    new_raw_template = migrate_utils.clone_table('new_raw_template',
+                                                 raw_template, meta,
+                                                 newcols=newcols,
+                                                 ignorecols=ignorecols)
+
+    colnames = [c.name for c in new_raw_template.columns
+                if c.name != 'blob_id']
+    for row in list(raw_template.select().execute()):
+        values = dict((colname, getattr(row, colname))
+                      for colname in colnames)
+        values['blob_id'] = get_blob_id(row.template, row.files)
+        migrate_engine.execute(new_raw_template.insert(values))
+
+    raw_template.drop()
+    new_raw_template.rename('raw_template')
+
+
+def _blob_store(migrate_engine, blob):
+    """
+    Return a function that stores serialised template contents in a blob.
+
+    Each distinct template is stored only once; the function returns the ID
+    of the blob holding the given contents.
+    """
+    blob_ids = {}
+    now = timeutils.utcnow()
+
+    def get_blob_id(template_text, files_text):
+        template = jsonutils.loads(template_text) if template_text else None
+        files = jsonutils.loads(files_text) if files_text else {}
+        digest = migrate_utils.template_digest(template, files)
+        if digest not in blob_ids:
+            result = migrate_engine.execute(blob.insert().values(
+                digest=digest, template=template, files=files,
+                created_at=now))
+            blob_ids[digest] = result.inserted_primary_key[0]
+        return blob_ids[digest]
+
+    return get_blob_id
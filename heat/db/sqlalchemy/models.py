@@ -91,14 +91,37 @@ class StateAware(object):
     status_reason = sqlalchemy.Column('status_reason', sqlalchemy.Text)
 
 
+class RawTemplateBlob(BASE, HeatBase):
+    """
+    Represents the contents of a template and its files, which are stored
+    once and shared by every raw template with the same contents.
+    """
+
+    __tablename__ = 'raw_template_blob'
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    digest = sqlalchemy.Column(sqlalchemy.String(64), nullable=False,
+                               unique=True)
+    template = sqlalchemy.Column(types.Json)
+    files = sqlalchemy.Column(types.Json)
+
+
 class RawTemplate(BASE, HeatBase):
     """Represents an unparsed template which should be in JSON format."""
 
     __tablename__ = 'raw_template'
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
-    template = sqlalchemy.Column(types.Json)
-    files = sqlalchemy.Column(types.Json)
     environment = sqlalchemy.Column('environment', types.Json)
+    blob_id = sqlalchemy.Column(sqlalchemy.Integer,
+                                sqlalchemy.ForeignKey('raw_template_blob.id'))
+    blob = relationship(RawTemplateBlob, lazy='joined')
+
+    @property
+    def template(self):
+        return self.blob.template if self.blob is not None else None
+
+    @property
+    def files(self):
+        return self.blob.files if self.blob is not None else None
 
 
 class StackTag(BASE, HeatBase):
@@ -144,6 +167,7 @@ class Stack(BASE, HeatBase, SoftDelete, StateAware):
     __table_args__ = (
         sqlalchemy.Index('ix_stack_name', 'name', mysql_length=255),
         sqlalchemy.Index('ix_stack_tenant', 'tenant', mysql_length=255),
+        sqlalchemy.Index('ix_stack_root_stack_id', 'root_stack_id'),
     )
 
     id = sqlalchemy.Column(sqlalchemy.String(36), primary_key=True,
@@ -167,6 +191,7 @@ class Stack(BASE, HeatBase, SoftDelete, StateAware):
         sqlalchemy.Integer,
         sqlalchemy.ForeignKey('user_creds.id'))
     owner_id = sqlalchemy.Column(sqlalchemy.String(36))
+    root_stack_id = sqlalchemy.Column(sqlalchemy.String(36))
     parent_resource_name = sqlalchemy.Column(sqlalchemy.String(255))
     timeout = sqlalchemy.Column(sqlalchemy.Integer)
     disable_rollback = sqlalchemy.Column(sqlalchemy.Boolean, nullable=False)
@@ -179,6 +204,9 @@ class Stack(BASE, HeatBase, SoftDelete, StateAware):
     current_traversal = sqlalchemy.Column('current_traversal',
                                           sqlalchemy.String(36))
     current_deps = sqlalchemy.Column('current_deps', types.Json)
+    outputs = sqlalchemy.Column('outputs', types.Json)
+    outputs_encrypted = sqlalchemy.Column('outputs_encrypted',
+                                          sqlalchemy.Boolean)
 
     # Override timestamp column to store the correct value: it should be the
     # time the create/update call was issued, not the time the DB entry is
@@ -13,6 +13,9 @@
 
 # SQLAlchemy helper functions
 
+import hashlib
+
+from oslo_serialization import jsonutils
 import sqlalchemy
 
 
@@ -83,3 +86,14 @@ def migrate_data(migrate_engine,
     table.drop()
 
     new_table.rename(table_name)
+
+
+def template_digest(template, files):
+    """
+    Return the digest by which a template and its files are stored.
+
+    The digest is calculated over a canonical serialisation of the data, so
+    that identical templates share a digest regardless of key order.
+    """
+    content = jsonutils.dumps([template, files], sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
@@ -89,16 +89,27 @@ def format_stack_outputs(stack, outputs):
     '''
     Return a representation of the given output template for the given stack
     that matches the API output expectations.
+
+    The output values stored when the last stack action finished are used
+    where available, so that the backend services are not queried again.
     '''
+    stored = stack.stored_outputs or {}
+
     def format_stack_output(k):
+        if k in stored:
+            value = stored[k].get('value')
+            error_msg = stored[k].get('error_msg')
+        else:
+            value = stack.output(k)
+            error_msg = outputs[k].get('error_msg')
         output = {
             rpc_api.OUTPUT_DESCRIPTION: outputs[k].get('Description',
                                                        'No description given'),
             rpc_api.OUTPUT_KEY: k,
-            rpc_api.OUTPUT_VALUE: stack.output(k)
+            rpc_api.OUTPUT_VALUE: value
         }
-        if outputs[k].get('error_msg'):
-            output.update({rpc_api.OUTPUT_ERROR: outputs[k].get('error_msg')})
+        if error_msg:
+            output.update({rpc_api.OUTPUT_ERROR: error_msg})
         return output
 
     return [format_stack_output(key) for key in outputs]
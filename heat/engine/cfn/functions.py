@@ -178,6 +178,11 @@ class GetAtt(function.Function):
         return itertools.chain(super(GetAtt, self).dep_attrs(resource_name),
                                attrs)
 
+    def all_dep_attrs(self):
+        attr = (function.resolve(self._resource_name),
+                function.resolve(self._attribute))
+        return itertools.chain(super(GetAtt, self).all_dep_attrs(), [attr])
+
     def dependencies(self, path):
         return itertools.chain(super(GetAtt, self).dependencies(path),
                                [self._resource(path)])
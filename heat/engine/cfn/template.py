@@ -166,6 +166,7 @@ class CfnTemplate(template.Template):
                     for name, data in resources.items())
 
     def add_resource(self, definition, name=None):
+        self._copy_on_write()
         if name is None:
             name = definition.name
         hot_tmpl = definition.render_hot()
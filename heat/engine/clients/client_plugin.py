@@ -12,6 +12,7 @@
 #    under the License.
 
 import abc
+import collections
 
 from keystoneclient import auth
 from keystoneclient.auth.identity import v2
@@ -19,10 +20,19 @@ from keystoneclient.auth.identity import v3
 from keystoneclient import exceptions
 from keystoneclient import session
 from oslo_config import cfg
+from oslo_utils import timeutils
 import six
 
 from heat.common import context
 from heat.common.i18n import _
+from heat.common import stats
+
+cfg.CONF.import_opt('client_lookup_cache_ttl', 'heat.common.config')
+
+# Maximum number of name-to-ID lookups remembered by each client plugin
+MAX_CACHED_LOOKUPS = 1000
+
+counters = stats.get_counters('client_lookup')
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -41,6 +51,7 @@ class ClientPlugin(object):
         self.clients = context.clients
         self._client = None
         self._keystone_session_obj = None
+        self._lookups = collections.OrderedDict()
 
     @property
     def _keystone_session(self):
@@ -146,6 +157,46 @@ class ClientPlugin(object):
         cfg.CONF.import_opt(option, 'heat.common.config', group='clients')
         return getattr(cfg.CONF.clients, option)
 
+    def _cached_lookup(self, kind, name, find):
+        '''
+        Return the ID of the named entity of the given kind.
+
+        The ID is found by calling find with the name, unless it was found by
+        an earlier lookup less than client_lookup_cache_ttl seconds ago. Since
+        each request context has its own client plugins, lookups are only
+        shared within a request. Failed lookups are not cached.
+        '''
+        key = (kind, name)
+        ttl = cfg.CONF.client_lookup_cache_ttl
+        entry = self._lookups.pop(key, None)
+        if entry is not None and not timeutils.is_older_than(entry[0], ttl):
+            self._lookups[key] = entry
+            counters.incr('hits')
+            counters.incr('hits.%s' % kind)
+            return entry[1]
+
+        counters.incr('misses')
+        counters.incr('misses.%s' % kind)
+        entity_id = find(name)
+        if ttl > 0:
+            self._lookups[key] = (timeutils.utcnow(), entity_id)
+            while len(self._lookups) > MAX_CACHED_LOOKUPS:
+                self._lookups.popitem(last=False)
+        return entity_id
+
+    def invalidate_lookups(self, kind=None):
+        '''
+        Forget the cached lookups of the given kind, or all of them.
+
+        This should be called after creating, renaming or deleting an entity
+        that may have been looked up by name.
+        '''
+        if kind is None:
+            self._lookups.clear()
+            return
+        for key in [k for k in self._lookups if k[0] == kind]:
+            del self._lookups[key]
+
     def is_client_exception(self, ex):
         '''Returns True if the current exception comes from the client.'''
         if self.exceptions_module:
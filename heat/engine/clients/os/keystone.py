@@ -37,6 +37,9 @@ class KeystoneClientPlugin(client_plugin.ClientPlugin):
         return isinstance(ex, exceptions.Conflict)
 
     def get_role_id(self, role):
+        return self._cached_lookup('role', role, self._find_role_id)
+
+    def _find_role_id(self, role):
         try:
             role_obj = self.client().client.roles.get(role)
             return role_obj.id
@@ -49,6 +52,9 @@ class KeystoneClientPlugin(client_plugin.ClientPlugin):
         raise exception.EntityNotFound(entity='KeystoneRole', name=role)
 
     def get_project_id(self, project):
+        return self._cached_lookup('project', project, self._find_project_id)
+
+    def _find_project_id(self, project):
         try:
             project_obj = self.client().client.projects.get(project)
             return project_obj.id
@@ -62,6 +68,9 @@ class KeystoneClientPlugin(client_plugin.ClientPlugin):
                                        name=project)
 
     def get_domain_id(self, domain):
+        return self._cached_lookup('domain', domain, self._find_domain_id)
+
+    def _find_domain_id(self, domain):
         try:
             domain_obj = self.client().client.domains.get(domain)
             return domain_obj.id
@@ -74,6 +83,9 @@ class KeystoneClientPlugin(client_plugin.ClientPlugin):
         raise exception.EntityNotFound(entity='KeystoneDomain', name=domain)
 
     def get_group_id(self, group):
+        return self._cached_lookup('group', group, self._find_group_id)
+
+    def _find_group_id(self, group):
         try:
             group_obj = self.client().client.groups.get(group)
             return group_obj.id
@@ -86,6 +98,9 @@ class KeystoneClientPlugin(client_plugin.ClientPlugin):
         raise exception.EntityNotFound(entity='KeystoneGroup', name=group)
 
     def get_service_id(self, service):
+        return self._cached_lookup('service', service, self._find_service_id)
+
+    def _find_service_id(self, service):
         try:
             service_obj = self.client().client.services.get(service)
             return service_obj.id
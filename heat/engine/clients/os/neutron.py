@@ -72,8 +72,11 @@ class NeutronClientPlugin(client_plugin.ClientPlugin):
         return isinstance(ex, exceptions.NeutronClientNoUniqueMatch)
 
     def find_neutron_resource(self, props, key, key_type):
-        return neutronV20.find_resourceid_by_name_or_id(
-            self.client(), key_type, props.get(key))
+        def find(name_or_id):
+            return neutronV20.find_resourceid_by_name_or_id(
+                self.client(), key_type, name_or_id)
+
+        return self._cached_lookup(key_type, props.get(key), find)
 
     def _resolve(self, props, key, id_key, key_type):
         if props.get(key):
@@ -104,31 +107,36 @@ class NeutronClientPlugin(client_plugin.ClientPlugin):
         Args:
         security_groups: List of security group names or UUIDs
         '''
+        all_groups = []
+
+        def find(sg):
+            if not all_groups:
+                response = self.client().list_security_groups()
+                all_groups.extend(response['security_groups'])
+            same_name_groups = [g for g in all_groups if g['name'] == sg]
+            groups = [g['id'] for g in same_name_groups]
+            if len(groups) == 0:
+                raise exception.PhysicalResourceNotFound(resource_id=sg)
+            elif len(groups) == 1:
+                return groups[0]
+            else:
+                # for admin roles, can get the other users'
+                # securityGroups, so we should match the tenant_id with
+                # the groups, and return the own one
+                own_groups = [g['id'] for g in same_name_groups
+                              if g['tenant_id'] == self.context.tenant_id]
+                if len(own_groups) == 1:
+                    return own_groups[0]
+                else:
+                    raise exception.PhysicalResourceNameAmbiguity(name=sg)
+
         seclist = []
-        all_groups = None
         for sg in security_groups:
             if uuidutils.is_uuid_like(sg):
                 seclist.append(sg)
             else:
-                if not all_groups:
-                    response = self.client().list_security_groups()
-                    all_groups = response['security_groups']
-                same_name_groups = [g for g in all_groups if g['name'] == sg]
-                groups = [g['id'] for g in same_name_groups]
-                if len(groups) == 0:
-                    raise exception.PhysicalResourceNotFound(resource_id=sg)
-                elif len(groups) == 1:
-                    seclist.append(groups[0])
-                else:
-                    # for admin roles, can get the other users'
-                    # securityGroups, so we should match the tenant_id with
-                    # the groups, and return the own one
-                    own_groups = [g['id'] for g in same_name_groups
-                                  if g['tenant_id'] == self.context.tenant_id]
-                    if len(own_groups) == 1:
-                        seclist.append(own_groups[0])
-                    else:
-                        raise exception.PhysicalResourceNameAmbiguity(name=sg)
+                seclist.append(self._cached_lookup('security_group', sg,
+                                                   find))
         return seclist
 
 
@@ -237,6 +237,9 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         :returns: the id of :flavor:
         :raises: exception.FlavorMissing
         '''
+        return self._cached_lookup('flavor', flavor, self._find_flavor_id)
+
+    def _find_flavor_id(self, flavor):
         flavor_id = None
         flavor_list = self.client().flavors.list()
         for o in flavor_list:
@@ -79,6 +79,10 @@ class Node(object):
         '''Return True if this node is both a leaf and a stem.'''
         return (not self) and self.stem()
 
+    def __contains__(self, target):
+        '''Return True if this node requires the specified key.'''
+        return target in self.require
+
     def __len__(self):
         '''Count the number of keys required by this node.'''
         return len(self.require)
@@ -163,18 +167,32 @@ class Graph(collections.defaultdict):
         '''
         Return a topologically sorted iterator over a dependency graph.
 
-        This is a destructive operation for the graph.
+        This uses Kahn's algorithm, keeping a count of the unsatisfied
+        requirements of each node and a queue of the nodes that are ready, so
+        that the sort is linear in the number of nodes and edges. The graph
+        itself is not modified.
         '''
-        for iteration in six.moves.xrange(len(graph)):
-            for key, node in six.iteritems(graph):
-                if not node:
-                    yield key
-                    del graph[key]
-                    break
-            else:
-                # There are nodes remaining, but none without
-                # dependencies: a cycle
-                raise CircularDependencyException(cycle=six.text_type(graph))
+        unsatisfied = dict((key, len(node)) for key, node in
+                           six.iteritems(graph))
+        ready = collections.deque(key for key, count in
+                                  six.iteritems(unsatisfied) if not count)
+
+        while ready:
+            key = ready.popleft()
+            yield key
+            del unsatisfied[key]
+
+            for rqr in graph[key].required_by():
+                if rqr in unsatisfied and key in graph[rqr]:
+                    unsatisfied[rqr] -= 1
+                    if not unsatisfied[rqr]:
+                        ready.append(rqr)
+
+        if unsatisfied:
+            # There are nodes remaining, but none without
+            # dependencies: a cycle
+            remaining = Graph(dict((key, graph[key]) for key in unsatisfied))
+            raise CircularDependencyException(cycle=six.text_type(remaining))
 
 
 class Dependencies(object):
@@ -187,12 +205,14 @@ class Dependencies(object):
         '''
         edges = edges or []
         self._graph = Graph()
+        self._orders = {}
         for e in edges:
             self += e
 
     def __iadd__(self, edge):
         '''Add another edge, in the form of a (requirer, required) tuple.'''
         requirer, required = edge
+        self._orders.clear()
 
         if required is None:
             # Just ensure the node is created by accessing the defaultdict
@@ -203,6 +223,10 @@ class Dependencies(object):
 
         return self
 
+    def __contains__(self, key):
+        '''Return True if the specified node is in the graph.'''
+        return key in self._graph
+
     def required_by(self, last):
         '''
         List the keys that require the specified node.
@@ -249,19 +273,33 @@ class Dependencies(object):
 
         return Dependencies(edges)
 
+    def _cached_order(self, name, calculate):
+        '''
+        Return a cached tuple of nodes, calculating it if necessary.
+
+        The cache is cleared whenever an edge is added to the graph.
+        '''
+        if name not in self._orders:
+            self._orders[name] = tuple(calculate())
+        return self._orders[name]
+
     def leaves(self):
         '''
         Return an iterator over all of the leaf nodes in the graph.
         '''
-        return (requirer for requirer, required in self._graph.items()
-                if not required)
+        def calculate():
+            return (requirer for requirer, node in
+                    six.iteritems(self._graph) if not node)
+        return iter(self._cached_order('leaves', calculate))
 
     def roots(self):
         '''
         Return an iterator over all of the root nodes in the graph.
         '''
-        return (requirer for requirer, required in self.graph(
-            reverse=True).items() if not required)
+        def calculate():
+            return (required for required, node in
+                    six.iteritems(self._graph) if node.stem())
+        return iter(self._cached_order('roots', calculate))
 
     def translate(self, transform):
         '''
@@ -300,10 +338,18 @@ class Dependencies(object):
         else:
             return self._graph.copy()
 
+    def _toposorted(self):
+        '''Return a cached tuple of the nodes in topological order.'''
+        return self._cached_order('forward',
+                                  lambda: Graph.toposort(self._graph))
+
     def __iter__(self):
         '''Return a topologically sorted iterator.'''
-        return Graph.toposort(self.graph())
+        for key in self._toposorted():
+            yield key
 
     def __reversed__(self):
         '''Return a reverse topologically sorted iterator.'''
-        return Graph.toposort(self.graph(reverse=True))
+        for key in self._cached_order('reverse',
+                                      lambda: reversed(self._toposorted())):
+            yield key
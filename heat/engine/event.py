@@ -11,13 +11,171 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
+import eventlet
+from eventlet import semaphore
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
 import six
 
+from heat.common import context as heat_context
 from heat.common import exception
 from heat.common.i18n import _
+from heat.common.i18n import _LE
 from heat.common import identifier
+from heat.common import stats
 from heat.objects import event as event_object
 
+LOG = logging.getLogger(__name__)
+
+cfg.CONF.import_opt('event_purge_batch_size', 'heat.common.config')
+cfg.CONF.import_opt('max_events_per_stack', 'heat.common.config')
+cfg.CONF.import_opt('event_flush_interval', 'heat.common.config')
+
+# Maximum number of stacks for which prune headroom is remembered. Stacks
+# that are forgotten simply have their events counted again on the next write.
+MAX_TRACKED_STACKS = 1000
+
+# Number of events that may be written to each stack before its events need
+# to be counted again, keyed by stack ID
+_headroom = collections.OrderedDict()
+_prunes_in_progress = set()
+
+# Maximum number of queued events written to the database in one insert
+MAX_WRITE_BATCH = 100
+
+_writer = None
+
+counters = stats.get_counters('events')
+
+
+def _prune(stack_id):
+    max_events = cfg.CONF.max_events_per_stack
+    batch_size = max(cfg.CONF.event_purge_batch_size, 1)
+    # Runs in its own thread, so it must not share the database session of
+    # the context that wrote the events
+    context = heat_context.get_admin_context()
+    try:
+        count = event_object.Event.count_all_by_stack(context, stack_id)
+        counters.incr('counts')
+        while count > max_events:
+            deleted = event_object.Event.delete_oldest_by_stack(context,
+                                                                stack_id,
+                                                                batch_size)
+            if not deleted:
+                break
+            counters.incr('pruned', deleted)
+            count -= deleted
+        _headroom[stack_id] = max(max_events - count, 1)
+    except Exception:
+        LOG.exception(_LE('Failed to prune events for stack %s'), stack_id)
+    finally:
+        _prunes_in_progress.discard(stack_id)
+
+
+def _record_event(stack_id, count=1):
+    """Note that events were written, and prune old events if necessary.
+
+    Rather than counting a stack's events on every write, the number of
+    events that may still be written before max_events_per_stack is reached
+    is remembered, and the events are only counted (and the oldest pruned, in
+    batches of event_purge_batch_size) in a background thread once that
+    headroom is used up. Events written by other engines are picked up at the
+    next count, so a stack may briefly exceed the limit.
+    """
+    if not cfg.CONF.max_events_per_stack:
+        return
+
+    headroom = _headroom.pop(stack_id, 0) - count
+    _headroom[stack_id] = headroom
+    while len(_headroom) > MAX_TRACKED_STACKS:
+        _headroom.popitem(last=False)
+
+    if headroom <= 0 and stack_id not in _prunes_in_progress:
+        _prunes_in_progress.add(stack_id)
+        eventlet.spawn_n(_prune, stack_id)
+
+
+class EventWriter(object):
+    """Queues events and writes them to the database in batches.
+
+    Queued events are written at most event_flush_interval seconds after
+    they are added, or as soon as a full batch has accumulated. Batches are
+    written one at a time in the order the events were added, so the events
+    of each stack are always stored in order.
+    """
+
+    def __init__(self):
+        self._queue = collections.deque()
+        self._lock = semaphore.Semaphore()
+        self._timer = None
+
+    def add(self, values):
+        """Queue an event, given as a dict of database values."""
+        self._queue.append(values)
+        if len(self._queue) >= MAX_WRITE_BATCH:
+            self.flush()
+        elif self._timer is None:
+            self._timer = eventlet.spawn_after(cfg.CONF.event_flush_interval,
+                                               self._flush_on_timer)
+
+    def _flush_on_timer(self):
+        self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Write all queued events to the database."""
+        with self._lock:
+            while self._queue:
+                batch_size = min(len(self._queue), MAX_WRITE_BATCH)
+                self._write([self._queue.popleft()
+                             for i in six.moves.range(batch_size)])
+
+    def _write(self, batch):
+        context = heat_context.get_admin_context()
+        try:
+            event_object.Event.create_batch(context, batch)
+        except Exception:
+            LOG.exception(_LE('Failed to write a batch of %d events, writing '
+                              'them one at a time'), len(batch))
+            batch = self._write_each(context, batch)
+        else:
+            counters.incr('batches')
+
+        counters.incr('written', len(batch))
+        stack_counts = collections.Counter(ev['stack_id'] for ev in batch)
+        for stack_id, count in six.iteritems(stack_counts):
+            _record_event(stack_id, count)
+
+    def _write_each(self, context, batch):
+        """Write events one at a time, and return those that were written."""
+        written = []
+        for ev in batch:
+            try:
+                event_object.Event.create(context, ev)
+            except Exception:
+                LOG.exception(_LE('Failed to write event for stack %s'),
+                              ev['stack_id'])
+                counters.incr('write_failures')
+            else:
+                written.append(ev)
+        return written
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        _writer = EventWriter()
+    return _writer
+
+
+def flush():
+    """Write any events queued by this engine to the database."""
+    if _writer is not None:
+        _writer.flush()
+
 
 class Event(object):
     '''Class representing a Resource state change.'''
@@ -66,7 +224,12 @@ class Event(object):
                    ev.resource_type, ev.uuid, ev.created_at, ev.id)
 
     def store(self):
-        '''Store the Event in the database.'''
+        '''
+        Store the Event in the database.
+
+        If event_flush_interval is set, the Event is queued to be written
+        in a batch and its database ID is not known, so None is returned.
+        '''
         ev = {
             'resource_name': self.resource_name,
             'physical_resource_id': self.physical_resource_id,
@@ -84,8 +247,15 @@ class Event(object):
         if self.timestamp is not None:
             ev['created_at'] = self.timestamp
 
+        if cfg.CONF.event_flush_interval > 0:
+            # Queued events are written later, so they are stamped now
+            ev.setdefault('created_at', timeutils.utcnow())
+            _get_writer().add(ev)
+            return None
+
         new_ev = event_object.Event.create(self.context, ev)
         self.id = new_ev.id
+        _record_event(self.stack.id)
         return self.id
 
     def identifier(self):
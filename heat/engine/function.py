@@ -73,6 +73,9 @@ class Function(object):
     def dep_attrs(self, resource_name):
         return dep_attrs(self.args, resource_name)
 
+    def all_dep_attrs(self):
+        return all_dep_attrs(self.args)
+
     def __reduce__(self):
         """
         Return a representation of the function suitable for pickling.
@@ -203,3 +206,25 @@ def dep_attrs(snippet, resource_name):
         attrs = (dep_attrs(value, resource_name) for value in snippet)
         return itertools.chain.from_iterable(attrs)
     return []
+
+
+def all_dep_attrs(snippet):
+    """
+    Return an iterator over all (resource_name, attribute) pairs referenced
+    in a template snippet.
+
+    The snippet should be already parsed to insert Function objects where
+    appropriate.
+    """
+
+    if isinstance(snippet, Function):
+        return snippet.all_dep_attrs()
+
+    elif isinstance(snippet, collections.Mapping):
+        attrs = (all_dep_attrs(value) for value in snippet.items())
+        return itertools.chain.from_iterable(attrs)
+    elif (not isinstance(snippet, six.string_types) and
+          isinstance(snippet, collections.Iterable)):
+        attrs = (all_dep_attrs(value) for value in snippet)
+        return itertools.chain.from_iterable(attrs)
+    return []
@@ -269,6 +269,7 @@ class HOTemplate20130523(template.Template):
                     for name, data in resources.items())
 
     def add_resource(self, definition, name=None):
+        self._copy_on_write()
         if name is None:
             name = definition.name
 
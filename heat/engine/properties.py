@@ -12,12 +12,14 @@
 #    under the License.
 
 import collections
+import copy
 
 from oslo_serialization import jsonutils
 import six
 
 from heat.common import exception
 from heat.common.i18n import _
+from heat.common import stats
 from heat.engine import constraints as constr
 from heat.engine import function
 from heat.engine.hot import parameters as hot_param
@@ -36,6 +38,8 @@ SCHEMA_KEYS = (
     'Immutable',
 )
 
+cache_counters = stats.get_counters('properties_cache')
+
 
 class Schema(constr.Schema):
     """
@@ -350,6 +354,24 @@ class Properties(collections.Mapping):
         if section is not None:
             self.error_prefix.append(section)
         self.context = context
+        self._cache = None
+
+    def enable_cache(self):
+        """
+        Cache resolved property values until the cache is reset.
+
+        Resolving a property and coercing it to its schema type is repeated on
+        every access, which is wasteful when the same property is read many
+        times between changes to the stack. Maps and lists are copied when
+        they are returned, so that callers cannot modify the cached values.
+        """
+        if self._cache is None:
+            self._cache = {}
+
+    def reset_cache(self):
+        """Discard any cached property values."""
+        if self._cache is not None:
+            self._cache = {}
 
     @staticmethod
     def schema_from_params(params_snippet):
@@ -453,7 +475,19 @@ class Properties(collections.Mapping):
             return None
 
     def __getitem__(self, key):
-        return self._get_property_value(key)
+        if self._cache is None:
+            return self._get_property_value(key)
+
+        try:
+            value = self._cache[key]
+        except KeyError:
+            cache_counters.incr('misses')
+            value = self._cache[key] = self._get_property_value(key)
+        else:
+            cache_counters.incr('hits')
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
 
     def __len__(self):
         return len(self.props)
@@ -132,6 +132,14 @@ class Resource(object):
     # no signal actions
     no_signal_actions = (SUSPEND, DELETE)
 
+    # Typical number of seconds taken to complete each action, used to
+    # decide how often to poll for completion
+    expected_durations = {}
+
+    # The kind of name-to-ID lookup cached by the default client plugin that
+    # is made stale by actions on this resource, if any
+    client_lookup_kind = None
+
     def __new__(cls, name, definition, stack):
         '''Create a new Resource of the appropriate class for its type.'''
 
@@ -239,16 +247,25 @@ class Resource(object):
         self._stackref = weakref.ref(stack)
 
     @classmethod
-    def load(cls, context, resource_id, data):
+    def load(cls, context, resource_id, data, templates=None):
+        '''
+        Load a resource, and the stack it belongs to, from the database.
+
+        If a dict of templates keyed by ID is passed, the templates of the
+        resource and the stack are taken from it where possible, and added to
+        it otherwise.
+        '''
         # FIXME(sirushtim): Import this in global space.
         from heat.engine import stack as stack_mod
         db_res = resource_objects.Resource.get_obj(context, resource_id)
         # TODO(sirushtim): Load stack from cache
-        stack = stack_mod.Stack.load(context, db_res.stack_id)
+        stack = stack_mod.Stack.load(context, db_res.stack_id,
+                                     templates=templates)
         # NOTE(sirushtim): Because on delete/cleanup operations, we simply
         # update with another template, the stack object won't have the
         # template of the previous stack-run.
-        tmpl = template.Template.load(context, db_res.current_template_id)
+        tmpl = template.Template.load(context, db_res.current_template_id,
+                                      templates=templates)
         stack_res = tmpl.resource_definitions(stack)[db_res.name]
         resource = cls(db_res.name, stack_res, stack)
         resource._load_data(db_res)
@@ -276,6 +293,23 @@ class Resource(object):
                             'replaced_by': self.replaced_by})
         return new_rs.id
 
+    @property
+    def properties(self):
+        return self._properties
+
+    @properties.setter
+    def properties(self, props):
+        '''
+        Set the resource properties.
+
+        Resolved property values are cached if cache_resolved_properties is
+        set, whichever way the properties are replaced.
+        '''
+        if (cfg.CONF.cache_resolved_properties and
+                isinstance(props, properties.Properties)):
+            props.enable_cache()
+        self._properties = props
+
     def reparse(self):
         self.properties = self.t.properties(self.properties_schema,
                                             self.context)
@@ -485,6 +519,9 @@ class Resource(object):
     def dep_attrs(self, resource_name):
         return self.t.dep_attrs(resource_name)
 
+    def all_dep_attrs(self):
+        return self.t.all_dep_attrs()
+
     def add_dependencies(self, deps):
         for dep in self.t.dependencies(self.stack):
             deps += (self, dep)
@@ -576,12 +613,16 @@ class Resource(object):
 
         Calls the handle_<ACTION>() method for the given action and then calls
         the check_<ACTION>_complete() method with the result in a loop until it
-        returns True. If the methods are not provided, the call is omitted.
+        returns True, at the intervals given by polling_policy(). If the
+        methods are not provided, the call is omitted.
 
         Any args provided are passed to the handler.
 
         If a prefix is supplied, the handler method handle_<PREFIX>_<ACTION>()
         is called instead.
+
+        Once the action has run, any cached client lookups of the kind given
+        by client_lookup_kind are invalidated.
         '''
         handler_action = action.lower()
         check = getattr(self, 'check_%s_complete' % handler_action, None)
@@ -591,11 +632,29 @@ class Resource(object):
         handler = getattr(self, 'handle_%s' % handler_action, None)
 
         if callable(handler):
-            handler_data = handler(*args)
-            yield
-            if callable(check):
-                while not check(handler_data):
+            try:
+                handler_data = handler(*args)
+                if callable(check):
+                    poller = self.polling_policy(action).poll(
+                        lambda: check(handler_data), name=self.type())
+                    for step in poller:
+                        yield
+                else:
                     yield
+            finally:
+                if self.client_lookup_kind is not None:
+                    self.client_plugin().invalidate_lookups(
+                        self.client_lookup_kind)
+
+    def polling_policy(self, action):
+        '''
+        Return the policy for polling the check_<ACTION>_complete() method.
+
+        The interval between checks is based on the duration hint for the
+        action in expected_durations, if any.
+        '''
+        duration = self.expected_durations.get(action.upper())
+        return scheduler.PollingPolicy.for_duration(duration)
 
     @scheduler.wrappertask
     def _do_action(self, action, pre_func=None, resource_data=None):
@@ -1076,37 +1135,54 @@ class Resource(object):
             except Exception as ex:
                 LOG.warn(_LW('db error %s'), ex)
 
-    def _store(self, metadata=None):
-        '''Create the resource in the database.'''
-
+    def _store_values(self, metadata=None):
+        '''Return the values with which to create the resource in the DB.'''
         properties_data_encrypted, properties_data = \
             resource_objects.Resource.encrypt_properties_data(
                 self._stored_properties_data)
-        try:
-            rs = {'action': self.action,
-                  'status': self.status,
-                  'status_reason': self.status_reason,
-                  'stack_id': self.stack.id,
-                  'nova_instance': self.resource_id,
-                  'name': self.name,
-                  'rsrc_metadata': metadata,
-                  'properties_data': properties_data,
-                  'properties_data_encrypted': properties_data_encrypted,
-                  'needed_by': self.needed_by,
-                  'requires': self.requires,
-                  'replaces': self.replaces,
-                  'replaced_by': self.replaced_by,
-                  'current_template_id': self.current_template_id,
-                  'stack_name': self.stack.name}
+        return {'action': self.action,
+                'status': self.status,
+                'status_reason': self.status_reason,
+                'stack_id': self.stack.id,
+                'nova_instance': self.resource_id,
+                'name': self.name,
+                'rsrc_metadata': metadata,
+                'properties_data': properties_data,
+                'properties_data_encrypted': properties_data_encrypted,
+                'needed_by': self.needed_by,
+                'requires': self.requires,
+                'replaces': self.replaces,
+                'replaced_by': self.replaced_by,
+                'current_template_id': self.current_template_id,
+                'stack_name': self.stack.name}
+
+    def _stored(self, db_rsrc, metadata=None):
+        '''Record the identity of the resource's newly-created DB row.'''
+        self.id = db_rsrc.id
+        self.uuid = db_rsrc.uuid
+        self.created_time = db_rsrc.created_at
+        self._rsrc_metadata = metadata
+
+    def _store(self, metadata=None):
+        '''Create the resource in the database.'''
 
+        rs = self._store_values(metadata)
+        try:
             new_rs = resource_objects.Resource.create(self.context, rs)
-            self.id = new_rs.id
-            self.uuid = new_rs.uuid
-            self.created_time = new_rs.created_at
-            self._rsrc_metadata = metadata
+            self._stored(new_rs, metadata)
         except Exception as ex:
             LOG.error(_LE('DB error %s'), ex)
 
+    @classmethod
+    def store_all(cls, context, resources):
+        '''Create several resources in the database in one transaction.'''
+        if not resources:
+            return
+        db_rsrcs = resource_objects.Resource.create_batch(
+            context, [rsrc._store_values() for rsrc in resources])
+        for rsrc, db_rsrc in zip(resources, db_rsrcs):
+            rsrc._stored(db_rsrc)
+
     def _add_event(self, action, status, reason):
         '''Add a state change event to the database.'''
         ev = event.Event(self.context, self.stack, action, status, reason,
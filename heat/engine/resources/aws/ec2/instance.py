@@ -724,7 +724,9 @@ class Instance(resource.Resource):
         Refresh the metadata if new_metadata is None
         '''
         if new_metadata is None:
-            self.metadata_set(self.t.metadata())
+            metadata = self.t.metadata()
+            if metadata != self.metadata_get():
+                self.metadata_set(metadata)
 
     def validate(self):
         '''
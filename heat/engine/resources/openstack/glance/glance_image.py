@@ -101,6 +101,8 @@ class GlanceImage(resource.Resource):
 
     default_client_name = 'glance'
 
+    client_lookup_kind = 'image'
+
     def handle_create(self):
         args = dict((k, v) for k, v in self.properties.items()
                     if v is not None)
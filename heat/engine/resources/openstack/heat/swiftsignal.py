@@ -11,6 +11,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import weakref
+
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import timeutils
@@ -20,6 +23,7 @@ from six.moves.urllib import parse
 from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LI
+from heat.common import stats
 from heat.engine import attributes
 from heat.engine.clients.os import swift
 from heat.engine import constraints
@@ -29,6 +33,14 @@ from heat.engine import support
 
 LOG = logging.getLogger(__name__)
 
+# Maximum age in seconds of a container listing shared between the
+# SwiftSignal resources in a stack
+POLL_INTERVAL = 1
+
+_pollers = weakref.WeakValueDictionary()
+
+counters = stats.get_counters('swift_signal')
+
 
 class SwiftSignalFailure(exception.Error):
     def __init__(self, wait_cond):
@@ -49,6 +61,89 @@ class SwiftSignalTimeout(exception.Error):
         super(SwiftSignalTimeout, self).__init__(message)
 
 
+def _parse_signal(body):
+    """
+    Parse the body of a signal object.
+
+    Returns None for the initial object written when the handle is created.
+    If the body is not valid JSON, the exception to raise is returned, so
+    that only the SwiftSignal waiting on that handle fails.
+    """
+    if body == swift.IN_PROGRESS:
+        return None
+    if body == "":
+        return {}
+    try:
+        return jsonutils.loads(body)
+    except ValueError:
+        return exception.Error(_("Failed to parse JSON data: %s") % body)
+
+
+class SignalPoller(object):
+    """
+    Poller for the Swift container shared by the signal handles in a stack.
+
+    All of the SwiftSignal resources in a stack share a poller, so that the
+    container is listed once per polling interval rather than once per
+    resource. Objects are fetched only when they first appear or their etag
+    changes, and the parsed signals are kept for subsequent polls.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.generation = 0
+        self.polled_at = None
+        self.objects = None
+        self._cache = {}
+
+    def is_stale(self, generation):
+        """
+        Return True if a caller that last saw the given generation of the
+        listing should poll again.
+        """
+        return (generation == self.generation or
+                timeutils.is_older_than(self.polled_at, POLL_INTERVAL))
+
+    def poll(self, client_plugin):
+        """List the container and fetch any new or changed signal objects."""
+        client = client_plugin.client()
+        self.generation += 1
+        self.polled_at = timeutils.utcnow()
+        counters.incr('listings')
+
+        try:
+            index = client.get_container(self.container)[1]
+        except Exception as exc:
+            client_plugin.ignore_not_found(exc)
+            index = None
+
+        if not index:  # Swift objects were deleted by user
+            self._cache = {}
+            self.objects = None
+            return
+
+        cache = {}
+        objects = []
+        for obj in index:
+            name, etag = obj['name'], obj.get('hash')
+            if name in self._cache and self._cache[name][0] == etag:
+                signal = self._cache[name][1]
+            else:
+                try:
+                    body = client.get_object(self.container, name)[1]
+                except Exception as exc:
+                    client_plugin.ignore_not_found(exc)
+                    continue
+                counters.incr('fetches')
+                signal = _parse_signal(body)
+
+            cache[name] = (etag, signal)
+            objects.append((name, signal))
+
+        self._cache = cache
+        self.objects = objects
+
+
 class SwiftSignalHandle(resource.Resource):
 
     support_status = support.SupportStatus(version='2014.2')
@@ -203,6 +298,8 @@ class SwiftSignal(resource.Resource):
         super(SwiftSignal, self).__init__(name, json_snippet, stack)
         self._obj_name = None
         self._url = None
+        self._poller = None
+        self._poll_generation = 0
 
     @property
     def url(self):
@@ -233,66 +330,48 @@ class SwiftSignal(resource.Resource):
         started_at = timeutils.utcnow()
         return started_at, float(self.properties[self.TIMEOUT])
 
+    def _signal_poller(self):
+        if self._poller is None:
+            self._poller = _pollers.get(self.stack.id)
+            if self._poller is None:
+                self._poller = SignalPoller(self.stack.id)
+                _pollers[self.stack.id] = self._poller
+        return self._poller
+
     def get_signals(self):
-        try:
-            container = self.client().get_container(self.stack.id)
-        except Exception as exc:
-            self.client_plugin().ignore_not_found(exc)
-            return
+        poller = self._signal_poller()
+        if poller.is_stale(self._poll_generation):
+            poller.poll(self.client_plugin())
+        self._poll_generation = poller.generation
 
-        index = container[1]
-        if not index:  # Swift objects were deleted by user
+        if poller.objects is None:
             return None
 
-        # Remove objects in that are for other handle resources, since
-        # multiple SwiftSignalHandle resources in the same stack share
-        # a container
-        filtered = [obj for obj in index if self.obj_name in obj['name']]
-
-        # Fetch objects from Swift and filter results
-        obj_bodies = []
-        for obj in filtered:
-            try:
-                signal = self.client().get_object(self.stack.id, obj['name'])
-            except Exception as exc:
-                self.client_plugin().ignore_not_found(exc)
-                continue
-
-            body = signal[1]
-            if body == swift.IN_PROGRESS:  # Ignore the initial object
-                continue
-            if body == "":
-                obj_bodies.append({})
-                continue
-            try:
-                obj_bodies.append(jsonutils.loads(body))
-            except ValueError:
-                raise exception.Error(_("Failed to parse JSON data: %s") %
-                                      body)
-
-        # Set default values on each signal
-        signals = []
+        signals = collections.OrderedDict()
         signal_num = 1
-        for signal in obj_bodies:
-
-            # Remove previous signals with the same ID
-            sig_id = self.UNIQUE_ID
-            ids = [s.get(sig_id) for s in signals if sig_id in s]
-            if ids and sig_id in signal and ids.count(signal[sig_id]) > 0:
-                [signals.remove(s) for s in signals
-                 if s.get(sig_id) == signal[sig_id]]
+        for name, body in poller.objects:
+            # Ignore objects that are for other handle resources, since
+            # multiple SwiftSignalHandle resources in the same stack share
+            # a container
+            if self.obj_name not in name or body is None:
+                continue
+            if isinstance(body, Exception):
+                raise body
 
             # Make sure all fields are set, since all are optional
+            signal = dict(body)
             signal.setdefault(self.DATA, None)
-            unique_id = signal.setdefault(sig_id, signal_num)
+            unique_id = signal.setdefault(self.UNIQUE_ID, signal_num)
             reason = 'Signal %s received' % unique_id
             signal.setdefault(self.REASON, reason)
             signal.setdefault(self.STATUS, self.STATUS_SUCCESS)
 
-            signals.append(signal)
+            # Remove any previous signal with the same ID
+            signals.pop(unique_id, None)
+            signals[unique_id] = signal
             signal_num += 1
 
-        return signals
+        return list(signals.values())
 
     def get_status(self):
         return [s[self.STATUS] for s in self.get_signals()]
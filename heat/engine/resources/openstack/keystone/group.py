@@ -26,6 +26,8 @@ class KeystoneGroup(role_assignments.KeystoneRoleAssignment):
         version='2015.1',
         message=_('Supported versions: keystone v3'))
 
+    client_lookup_kind = 'group'
+
     PROPERTIES = (
         NAME, DOMAIN, DESCRIPTION
     ) = (
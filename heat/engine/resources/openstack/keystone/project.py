@@ -27,6 +27,8 @@ class KeystoneProject(resource.Resource):
 
     default_client_name = 'keystone'
 
+    client_lookup_kind = 'project'
+
     PROPERTIES = (
         NAME, DOMAIN, DESCRIPTION, ENABLED
     ) = (
@@ -26,6 +26,8 @@ class KeystoneRole(resource.Resource):
 
     default_client_name = 'keystone'
 
+    client_lookup_kind = 'role'
+
     PROPERTIES = (
         NAME
     ) = (
@@ -26,6 +26,8 @@ class KeystoneService(resource.Resource):
 
     default_client_name = 'keystone'
 
+    client_lookup_kind = 'service'
+
     PROPERTIES = (
         NAME, DESCRIPTION, TYPE
     ) = (
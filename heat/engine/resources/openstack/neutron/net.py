@@ -19,6 +19,8 @@ from heat.engine import support
 
 
 class Net(neutron.NeutronResource):
+    client_lookup_kind = 'network'
+
     PROPERTIES = (
         NAME, VALUE_SPECS, ADMIN_STATE_UP, TENANT_ID, SHARED,
         DHCP_AGENT_IDS, PORT_SECURITY_ENABLED,
@@ -226,6 +226,7 @@ class NetworkGateway(neutron.NeutronResource):
         if self.DEVICES in prop_diff:
             self.handle_delete()
             self.properties.data.update(props)
+            self.properties.reset_cache()
             self.handle_create()
             return
         else:
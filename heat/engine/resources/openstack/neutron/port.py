@@ -29,6 +29,8 @@ LOG = logging.getLogger(__name__)
 
 class Port(neutron.NeutronResource):
 
+    client_lookup_kind = 'port'
+
     PROPERTIES = (
         NETWORK_ID, NETWORK, NAME, VALUE_SPECS,
         ADMIN_STATE_UP, FIXED_IPS, MAC_ADDRESS,
@@ -25,6 +25,8 @@ from heat.engine import support
 
 class Router(neutron.NeutronResource):
 
+    client_lookup_kind = 'router'
+
     PROPERTIES = (
         NAME, EXTERNAL_GATEWAY, VALUE_SPECS, ADMIN_STATE_UP,
         L3_AGENT_ID, L3_AGENT_IDS, DISTRIBUTED, HA,
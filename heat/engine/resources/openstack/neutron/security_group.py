@@ -23,6 +23,8 @@ class SecurityGroup(neutron.NeutronResource):
 
     support_status = support.SupportStatus(version='2014.1')
 
+    client_lookup_kind = 'security_group'
+
     PROPERTIES = (
         NAME, DESCRIPTION, RULES,
     ) = (
@@ -24,6 +24,8 @@ from heat.engine import support
 
 class Subnet(neutron.NeutronResource):
 
+    client_lookup_kind = 'subnet'
+
     PROPERTIES = (
         NETWORK_ID, NETWORK, CIDR, VALUE_SPECS, NAME, IP_VERSION,
         DNS_NAMESERVERS, GATEWAY_IP, ENABLE_DHCP, ALLOCATION_POOLS,
@@ -503,6 +503,11 @@ class Server(stack_user.StackUser):
 
     default_client_name = 'nova'
 
+    expected_durations = {
+        resource.Resource.CREATE: 60,
+        resource.Resource.DELETE: 20,
+    }
+
     def __init__(self, name, json_snippet, stack):
         super(Server, self).__init__(name, json_snippet, stack)
         if self.user_data_software_config():
@@ -1178,8 +1183,10 @@ class Server(stack_user.StackUser):
             # are not specified in the template (e.g the deployments data)
             meta = self.metadata_get(refresh=True) or {}
             tmpl_meta = self.t.metadata()
-            meta.update(tmpl_meta)
-            self.metadata_set(meta)
+            new_meta = dict(meta)
+            new_meta.update(tmpl_meta)
+            if new_meta != meta:
+                self.metadata_set(new_meta)
 
     @staticmethod
     def _check_maximum(count, maximum, msg):
@@ -117,6 +117,11 @@ class SaharaCluster(resource.Resource):
 
     default_client_name = 'sahara'
 
+    expected_durations = {
+        resource.Resource.CREATE: 600,
+        resource.Resource.DELETE: 120,
+    }
+
     def _validate_depr_keys(self, properties, key, depr_key):
         value = properties.get(key)
         depr_value = properties.get(depr_key)
@@ -276,6 +276,11 @@ class OSDBInstance(resource.Resource):
 
     default_client_name = 'trove'
 
+    expected_durations = {
+        resource.Resource.CREATE: 300,
+        resource.Resource.DELETE: 60,
+    }
+
     def __init__(self, name, json_snippet, stack):
         super(OSDBInstance, self).__init__(name, json_snippet, stack)
         self._href = None
@@ -32,7 +32,9 @@ from heat.engine import environment
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import stack as parser
+from heat.engine import status_waiter
 from heat.engine import template
+from heat.objects import stack as stack_object
 from heat.rpc import api as rpc_api
 
 LOG = logging.getLogger(__name__)
@@ -52,6 +54,7 @@ class StackResource(resource.Resource):
     def __init__(self, name, json_snippet, stack):
         super(StackResource, self).__init__(name, json_snippet, stack)
         self._nested = None
+        self._status_waiter = None
         self.resource_info = None
 
     def validate(self):
@@ -329,21 +332,48 @@ class StackResource(resource.Resource):
     def check_create_complete(self, cookie=None):
         return self._check_status_complete(resource.Resource.CREATE)
 
+    def _get_status_waiter(self, action):
+        key = (self.resource_id, action)
+        if self._status_waiter is None or self._status_waiter[0] != key:
+            self._close_status_waiter()
+            waiter = status_waiter.StatusWaiter(self.resource_id)
+            self._status_waiter = (key, waiter)
+        return self._status_waiter[1]
+
+    def _close_status_waiter(self):
+        if self._status_waiter is not None:
+            self._status_waiter[1].close()
+            self._status_waiter = None
+
     def _check_status_complete(self, action, show_deleted=False,
                                cookie=None):
+        if self.resource_id is None:
+            return True
+
+        # Only query the nested stack's status when it has been notified as
+        # changed (or the fallback interval has passed), and then only read
+        # the state columns rather than loading the whole stack.
+        if not self._get_status_waiter(action).should_check():
+            return False
+
         try:
-            nested = self.nested(force_reload=True, show_deleted=show_deleted)
+            status_data = stack_object.Stack.get_status(
+                self.context, self.resource_id, show_deleted=show_deleted)
         except exception.NotFound:
             if action == resource.Resource.DELETE:
+                self._close_status_waiter()
                 return True
             # It's possible the engine handling the create hasn't persisted
             # the stack to the DB when we first start polling for state
             return False
 
-        if nested is None:
-            return True
+        # Any locally cached nested stack is now out of date
+        self._nested = None
 
-        if nested.action != action:
+        nested_action, nested_status, status_reason, updated_time = (
+            status_data)
+
+        if nested_action != action:
             return False
 
         # Has the action really started?
@@ -362,21 +392,23 @@ class StackResource(resource.Resource):
         if cookie is not None:
             prev_state = cookie['previous']['state']
             prev_updated_at = cookie['previous']['updated_at']
-            if (prev_updated_at == nested.updated_time and
-                    prev_state == nested.state):
+            if (prev_updated_at == updated_time and
+                    tuple(prev_state) == (nested_action, nested_status)):
                 return False
 
-        if nested.status == resource.Resource.IN_PROGRESS:
+        if nested_status == resource.Resource.IN_PROGRESS:
             return False
-        elif nested.status == resource.Resource.COMPLETE:
+
+        self._close_status_waiter()
+        if nested_status == resource.Resource.COMPLETE:
             return True
-        elif nested.status == resource.Resource.FAILED:
-            raise exception.ResourceFailure(nested.status_reason, self,
+        elif nested_status == resource.Resource.FAILED:
+            raise exception.ResourceFailure(status_reason, self,
                                             action=action)
         else:
             raise resource.ResourceUnknownStatus(
-                resource_status=nested.status,
-                status_reason=nested.status_reason,
+                resource_status=nested_status,
+                status_reason=status_reason,
                 result=_('Stack unknown status'))
 
     def check_adopt_complete(self, cookie=None):
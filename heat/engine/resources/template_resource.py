@@ -190,9 +190,8 @@ class TemplateResource(stack_resource.StackResource):
                 t_data = jsonutils.dumps(self.nested().t.t)
 
         if t_data is not None:
-            self.stack.t.files[self.template_name] = t_data
-            self.stack.t.env.register_class(self.resource_type,
-                                            self.template_name)
+            self.stack.t.register_template_file(self.resource_type,
+                                                self.template_name, t_data)
             return t_data
         if reported_excp is None:
             reported_excp = ValueError(_('Unknown error retrieving %s') %
@@ -270,7 +269,9 @@ class TemplateResource(stack_resource.StackResource):
         Refresh the metadata if new_metadata is None
         '''
         if new_metadata is None:
-            self.metadata_set(self.t.metadata())
+            metadata = self.t.metadata()
+            if metadata != self.metadata_get():
+                self.metadata_set(metadata)
 
     def handle_update(self, json_snippet, tmpl_diff, prop_diff):
         return self.update_with_template(self.child_template(),
@@ -24,6 +24,11 @@ class BaseVolume(resource.Resource):
 
     default_client_name = 'cinder'
 
+    expected_durations = {
+        resource.Resource.CREATE: 20,
+        resource.Resource.DELETE: 20,
+    }
+
     def handle_create(self):
         backup_id = self.properties.get(self.BACKUP_ID)
         cinder = self.client()
@@ -152,6 +152,21 @@ class ResourceDefinitionCore(object):
                                function.dep_attrs(self._metadata,
                                                   resource_name))
 
+    def all_dep_attrs(self):
+        """
+        Return an iterator over all (resource_name, attribute) pairs referenced
+        in this resource's properties and metadata fields.
+        """
+        return itertools.chain(function.all_dep_attrs(self._properties),
+                               function.all_dep_attrs(self._metadata))
+
+    def metadata_dep_attrs(self):
+        """
+        Return an iterator over all (resource_name, attribute) pairs referenced
+        in this resource's metadata field.
+        """
+        return function.all_dep_attrs(self._metadata)
+
     def dependencies(self, stack):
         """
         Return the Resource objects in the given stack on which this depends.
@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
 import itertools
 import sys
@@ -26,9 +27,12 @@ from six import reraise as raise_
 
 from heat.common.i18n import _
 from heat.common.i18n import _LI
+from heat.common import stats
 
 LOG = logging.getLogger(__name__)
 
+counters = stats.get_counters('scheduler')
+
 
 # Whether TaskRunner._sleep actually does an eventlet sleep when called.
 ENABLE_SLEEP = True
@@ -345,6 +349,67 @@ def wrappertask(task):
     return wrapper
 
 
+class PollingPolicy(object):
+    """
+    A schedule for polling a task to find out whether it has completed.
+
+    The task is checked immediately, and then at intervals that grow
+    exponentially from `initial` up to `maximum`. Intervals are measured in
+    scheduler steps, each of which normally lasts about a second.
+    """
+
+    def __init__(self, initial=1, factor=2, maximum=1):
+        self.initial = initial
+        self.factor = factor
+        self.maximum = max(initial, maximum)
+
+    @classmethod
+    def for_duration(cls, duration):
+        """
+        Return a policy for a task expected to take the given number of
+        seconds to complete.
+
+        The interval between checks grows to about a tenth of the expected
+        duration. If no duration is given, the task is checked on every step.
+        """
+        if not duration:
+            return cls()
+        return cls(maximum=max(1, int(duration // 10)))
+
+    def intervals(self):
+        """Iterate over the number of steps to wait between checks."""
+        interval = self.initial
+        while True:
+            yield interval
+            interval = min(interval * self.factor, self.maximum)
+
+    def poll(self, check, name=None):
+        """
+        Return a task that calls `check` according to this policy until it
+        returns True.
+
+        Checks and skipped steps are counted in the scheduler metrics, under
+        the given name if one is supplied.
+        """
+        def count(key):
+            counters.incr(key)
+            if name is not None:
+                counters.incr('%s.%s' % (key, name))
+
+        count('polls')
+        if check():
+            return
+
+        for interval in self.intervals():
+            for i in range(interval - 1):
+                count('polls_skipped')
+                yield
+            yield
+            count('polls')
+            if check():
+                return
+
+
 class DependencyTaskGroup(object):
     """
     A task which manages a group of subtasks that have ordering dependencies.
@@ -352,7 +417,7 @@ class DependencyTaskGroup(object):
 
     def __init__(self, dependencies, task=lambda o: o(),
                  reverse=False, name=None, error_wait_time=None,
-                 aggregate_exceptions=False):
+                 aggregate_exceptions=False, max_active=None):
         """
         Initialise with the task dependencies and (optionally) a task to run on
         each.
@@ -370,11 +435,20 @@ class DependencyTaskGroup(object):
         will not be cancelled in the event of an error (operations downstream
         of the error will be cancelled). Once all chains are complete, any
         errors will be rolled up into an ExceptionGroup exception.
+
+        If max_active is specified, no more than that number of subtasks will
+        be run at the same time; further subtasks that are ready to start
+        wait until one of the running subtasks completes.
         """
         self._runners = dict((o, TaskRunner(task, o)) for o in dependencies)
         self._graph = dependencies.graph(reverse=reverse)
+        self._ready_queue = collections.deque(k for k, n in
+                                              six.iteritems(self._graph)
+                                              if not n)
+        self._active = collections.OrderedDict()
         self.error_wait_time = error_wait_time
         self.aggregate_exceptions = aggregate_exceptions
+        self.max_active = max_active
 
         if name is None:
             name = '(%s) %s' % (getattr(task, '__name__',
@@ -390,7 +464,7 @@ class DependencyTaskGroup(object):
     def __call__(self):
         """Return a co-routine which runs the task group."""
         raised_exceptions = []
-        while any(six.itervalues(self._runners)):
+        while self._pending():
             try:
                 for k, r in self._ready():
                     r.start()
@@ -399,7 +473,7 @@ class DependencyTaskGroup(object):
 
                 for k, r in self._running():
                     if r.step():
-                        del self._graph[k]
+                        self._complete(k)
             except Exception:
                 exc_info = sys.exc_info()
                 if self.aggregate_exceptions:
@@ -429,26 +503,175 @@ class DependencyTaskGroup(object):
             node_runner = self._runners[dependent_node]
             self._cancel_recursively(dependent_node, node_runner)
 
+        self._active.pop(key, None)
+        del self._graph[key]
+
+    def _pending(self):
+        """
+        Return True if any subtasks remain to be started or run to completion.
+
+        A subtask that has finished but has not yet been stepped is only of
+        interest if it still has dependents waiting to run.
+        """
+        def waiting(key, runner):
+            return runner or any(self._runners[d]
+                                 for d in self._graph[key].required_by())
+
+        return (any(self._runners[k] for k in self._ready_queue) or
+                any(waiting(k, r) for k, r in six.iteritems(self._active)))
+
+    def _complete(self, key):
+        """
+        Remove a finished subtask from the graph and queue any subtasks that
+        were waiting only on it.
+        """
+        del self._active[key]
+        dependents = list(self._graph[key].required_by())
         del self._graph[key]
 
+        for dependent in dependents:
+            if not self._graph[dependent]:
+                self._ready_queue.append(dependent)
+
     def _ready(self):
         """
         Iterate over all subtasks that are ready to start - i.e. all their
         dependencies have been satisfied but they have not yet been started.
+
+        Subtasks are moved from the ready queue to the set of active subtasks
+        as they are returned.
         """
-        for k, n in six.iteritems(self._graph):
-            if not n:
-                runner = self._runners[k]
-                if runner and not runner.started():
-                    yield k, runner
+        while self._ready_queue:
+            if self.max_active and len(self._active) >= self.max_active:
+                return
+
+            k = self._ready_queue.popleft()
+            runner = self._runners[k]
+            if runner and not runner.started():
+                self._active[k] = runner
+                yield k, runner
 
     def _running(self):
         """
         Iterate over all subtasks that are currently running - i.e. they have
         been started but have not yet completed.
         """
-        running = lambda k_r: k_r[0] in self._graph and k_r[1].started()
-        return six.moves.filter(running, six.iteritems(self._runners))
+        return list(six.iteritems(self._active))
+
+
+class ConcurrencyLimiter(object):
+    """
+    Limits the number of tasks that are in progress at any one time.
+
+    Tasks are grouped by owner (e.g. the stack they belong to). Each free
+    slot goes to the waiting owner that currently holds the fewest slots, so
+    that a single owner with a large number of tasks cannot starve the
+    others.
+
+    When a limit is set, the number of slots available (the window) is
+    halved each time a task reports that it was throttled by a remote API,
+    and grows again by one each time a task completes successfully, up to
+    the limit.
+    """
+
+    def __init__(self, limit=None):
+        """
+        Initialise with the maximum number of tasks in progress. A limit of
+        None or 0 means that tasks are never limited, even when throttled.
+        """
+        self.limit = limit or None
+        self.window = self.limit
+        self.in_use = 0
+        self._held = collections.defaultdict(int)
+        self._waiting = collections.OrderedDict()
+        self._granted = set()
+
+    def _dispatch(self):
+        """Allocate free slots to the waiting owners holding the fewest."""
+        while self._waiting and (self.window is None or
+                                 self.in_use < self.window):
+            owner = min(self._waiting, key=lambda o: self._held[o])
+            tickets = self._waiting.pop(owner)
+            self._granted.add(tickets.popleft())
+            self._held[owner] += 1
+            self.in_use += 1
+            if tickets:
+                self._waiting[owner] = tickets
+
+    def acquire(self, owner):
+        """
+        Return a task that completes when a slot is allocated to the owner.
+
+        Once the task is complete, the caller must call release() with the
+        same owner.
+        """
+        ticket = object()
+        self._waiting.setdefault(owner, collections.deque()).append(ticket)
+        try:
+            self._dispatch()
+            while ticket not in self._granted:
+                counters.incr('waits')
+                yield
+                self._dispatch()
+            self._granted.remove(ticket)
+            ticket = None
+        finally:
+            if ticket is not None:
+                self._abandon(owner, ticket)
+
+    def _abandon(self, owner, ticket):
+        """Give up a place in the queue, or a slot allocated to it."""
+        if ticket in self._granted:
+            self._granted.remove(ticket)
+            self.release(owner, success=False)
+            return
+
+        tickets = self._waiting.get(owner)
+        if tickets is not None:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._waiting[owner]
+
+    def release(self, owner, success=True):
+        """Return an owner's slot, widening the window on success."""
+        self.in_use -= 1
+        self._held[owner] -= 1
+        if not self._held[owner]:
+            del self._held[owner]
+        if success and self.window is not None:
+            if self.limit is None or self.window < self.limit:
+                self.window += 1
+        self._dispatch()
+
+    def throttle(self):
+        """Halve the window after a task was throttled by a remote API."""
+        if self.limit is None:
+            return
+        self.window = max(1, min(self.in_use, self.window) // 2)
+        counters.incr('throttled')
+        LOG.info(_LI('Concurrency limit reduced to %d'), self.window)
+
+    @wrappertask
+    def limit_task(self, owner, task, is_over_limit=None):
+        """
+        Run a task once a slot is allocated to the owner.
+
+        If is_over_limit is supplied, it is called with any exception raised
+        by the task and should return True if the exception indicates that a
+        remote API was over its rate limit.
+        """
+        yield self.acquire(owner)
+
+        success = False
+        try:
+            yield task
+            success = True
+        except Exception as ex:
+            if is_over_limit is not None and is_over_limit(ex):
+                self.throttle()
+            raise
+        finally:
+            self.release(owner, success)
 
 
 class PollingTaskGroup(object):
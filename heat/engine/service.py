@@ -45,11 +45,13 @@ from heat.engine import environment
 from heat.engine import event as evt
 from heat.engine import parameter_groups
 from heat.engine import properties
+from heat.engine import resource as rsrc_module
 from heat.engine import resources
 from heat.engine import service_software_config
 from heat.engine import service_stack_watch
 from heat.engine import stack as parser
 from heat.engine import stack_lock
+from heat.engine import status_waiter
 from heat.engine import template as templatem
 from heat.engine import watchrule
 from heat.engine import worker
@@ -72,6 +74,10 @@ cfg.CONF.import_opt('convergence_engine', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of stack user authorizations to remember for serving
+# resource metadata without loading the stack
+MAX_CACHED_METADATA_ACCESS = 1000
+
 
 class ThreadGroupManager(object):
 
@@ -221,7 +227,11 @@ class EngineListener(service.Service):
     engines to communicate with each other for multi-engine support.
     '''
 
-    ACTIONS = (STOP_STACK, SEND) = ('stop_stack', 'send')
+    ACTIONS = (
+        STOP_STACK, SEND, STATE_CHANGED,
+    ) = (
+        'stop_stack', 'send', 'state_changed',
+    )
 
     def __init__(self, host, engine_id, thread_group_mgr):
         super(EngineListener, self).__init__()
@@ -253,6 +263,10 @@ class EngineListener(service.Service):
         stack_id = stack_identity['stack_id']
         self.thread_group_mgr.send(stack_id, message)
 
+    def state_changed(self, ctxt, stack_id):
+        '''Wake any tasks in this engine waiting on the given stack.'''
+        status_waiter.notify(stack_id)
+
 
 @profiler.trace_cls("rpc")
 class EngineService(service.Service):
@@ -266,7 +280,7 @@ class EngineService(service.Service):
     by the RPC caller.
     """
 
-    RPC_API_VERSION = '1.10'
+    RPC_API_VERSION = '1.12'
 
     def __init__(self, host, topic, manager=None):
         super(EngineService, self).__init__()
@@ -288,6 +302,7 @@ class EngineService(service.Service):
         self.manage_thread_grp = None
         self._rpc_server = None
         self.software_config = service_software_config.SoftwareConfigService()
+        self._metadata_access = collections.OrderedDict()
 
         if cfg.CONF.instance_user:
             warnings.warn('The "instance_user" option in heat.conf is '
@@ -387,6 +402,9 @@ class EngineService(service.Service):
             self.thread_group_mgr.stop(stack_id, True)
             LOG.info(_LI("Stack %s processing was finished"), stack_id)
 
+        # Write any events still queued by the stacks' resources
+        evt.flush()
+
         self.manage_thread_grp.stop()
         ctxt = context.get_admin_context()
         service_objects.Service.delete(ctxt, self.service_id)
@@ -449,13 +467,19 @@ class EngineService(service.Service):
         return s
 
     @context.request_context
-    def show_stack(self, cnxt, stack_identity):
+    def show_stack(self, cnxt, stack_identity, live_outputs=False):
         """
         Return detailed information about one or all stacks.
 
+        The stack outputs are normally those resolved and stored when the
+        last stack action finished.
+
         :param cnxt: RPC context.
         :param stack_identity: Name of the stack you want to show, or None
             to show all
+        :param live_outputs: If True, resolve the stack outputs again
+            instead of returning the stored values. The new values are not
+            stored, since the stack is not locked.
         """
         if stack_identity is not None:
             db_stack = self._get_stack(cnxt, stack_identity, show_deleted=True)
@@ -463,7 +487,12 @@ class EngineService(service.Service):
         else:
             stacks = parser.Stack.load_all(cnxt)
 
-        return [api.format_stack(stack) for stack in stacks]
+        def format_stack(stack):
+            if live_outputs:
+                stack.stored_outputs = None
+            return api.format_stack(stack)
+
+        return [format_stack(stack) for stack in stacks]
 
     def get_revision(self, cnxt):
         return cfg.CONF.revision['heat_revision']
@@ -1170,6 +1199,49 @@ class EngineService(service.Service):
         return api.format_stack_resource(stack[resource_name],
                                          with_attr=with_attr)
 
+    @context.request_context
+    def resource_metadata(self, cnxt, stack_identity, resource_name):
+        '''
+        Return the metadata of a resource.
+
+        This is polled by servers, so the metadata of a created resource is
+        read from its stored record without loading the stack. The stack is
+        only loaded the first time a stack user is authorized to access the
+        resource while the stack is in its current state, or when the stored
+        record found is not the resource's current one.
+        '''
+        s = self._get_stack(cnxt, stack_identity)
+
+        stack_user = cfg.CONF.heat_stack_user_role in cnxt.roles
+        access_key = (s.id, s.updated_at, resource_name,
+                      cnxt.user_id, cnxt.aws_creds)
+        if not stack_user or access_key in self._metadata_access:
+            rs = resource_objects.Resource.get_by_name_and_stack(
+                cnxt, resource_name, s.id)
+            # A convergence stack may also have rows for resources that have
+            # been replaced, or that belong to a previous template
+            if (rs is not None and rs.action != rsrc_module.Resource.INIT and
+                    rs.replaced_by is None and
+                    (not s.convergence or
+                     rs.current_template_id == s.raw_template_id)):
+                return rs.rsrc_metadata
+
+        stack = parser.Stack.load(cnxt, stack=s)
+
+        if stack_user:
+            if not self._authorize_stack_user(cnxt, stack, resource_name):
+                LOG.warn(_LW("Access denied to resource %s"), resource_name)
+                raise exception.Forbidden()
+            self._metadata_access[access_key] = True
+            while len(self._metadata_access) > MAX_CACHED_METADATA_ACCESS:
+                self._metadata_access.popitem(last=False)
+
+        if resource_name not in stack:
+            raise exception.ResourceNotFound(resource_name=resource_name,
+                                             stack_name=stack.name)
+
+        return stack[resource_name].metadata_get()
+
     @context.request_context
     def resource_signal(self, cnxt, stack_identity, resource_name, details,
                         sync_call=False):
@@ -1183,14 +1255,12 @@ class EngineService(service.Service):
             LOG.debug("signaling resource %s:%s" % (stack.name, rsrc.name))
             rsrc.signal(details)
 
-            # Refresh the metadata for all other resources, since signals can
-            # update metadata which is used by other resources, e.g
-            # when signalling a WaitConditionHandle resource, and other
+            # Refresh the metadata of the resources that refer to it, since
+            # signals can update metadata which is used by other resources,
+            # e.g when signalling a WaitConditionHandle resource, and other
             # resources may refer to WaitCondition Fn::GetAtt Data
-            for r in stack.dependencies:
-                if (r.name != rsrc.name and r.id is not None and
-                        r.action != r.INIT):
-                    r.metadata_update()
+            for r in stack.metadata_dependents(rsrc):
+                r.metadata_update()
 
         s = self._get_stack(cnxt, stack_identity)
 
@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import eventlet
 from oslo_log import log as logging
 from oslo_utils import timeutils
 import six
@@ -18,7 +19,6 @@ import six
 from heat.common import context
 from heat.common.i18n import _LE
 from heat.common.i18n import _LW
-from heat.engine import stack
 from heat.engine import watchrule
 from heat.objects import stack as stack_object
 from heat.objects import watch_rule as watch_rule_object
@@ -27,9 +27,17 @@ from heat.rpc import api as rpc_api
 LOG = logging.getLogger(__name__)
 
 
+# Key of the thread group in which the watch rule evaluator runs
+WATCH_TASK_GROUP = 'watch_rule_evaluator'
+
+# Number of watch rules evaluated between yields to other greenthreads
+EVALUATION_BATCH_SIZE = 50
+
+
 class StackWatch(object):
     def __init__(self, thread_group_mgr):
         self.thread_group_mgr = thread_group_mgr
+        self._started = False
 
     def start_watch_task(self, stack_id, cnxt):
 
@@ -55,60 +63,57 @@ class StackWatch(object):
 
             return start_watch_thread
 
-        if stack_has_a_watchrule(stack_id):
-            self.thread_group_mgr.add_timer(
-                stack_id,
-                self.periodic_watcher_task,
-                sid=stack_id)
-
-    def check_stack_watches(self, sid):
-        # Retrieve the stored credentials & create context
-        # Require tenant_safe=False to the stack_get to defeat tenant
-        # scoping otherwise we fail to retrieve the stack
-        LOG.debug("Periodic watcher task for stack %s" % sid)
-        admin_context = context.get_admin_context()
-        db_stack = stack_object.Stack.get_by_id(admin_context,
-                                                sid,
-                                                tenant_safe=False,
-                                                eager_load=True)
-        if not db_stack:
-            LOG.error(_LE("Unable to retrieve stack %s for periodic task"),
-                      sid)
-            return
-        stk = stack.Stack.load(admin_context, stack=db_stack,
-                               use_stored_context=True)
+        if stack_has_a_watchrule(stack_id) and not self._started:
+            # A single periodic task evaluates the rules of every stack
+            self.thread_group_mgr.add_timer(WATCH_TASK_GROUP,
+                                            self.periodic_watcher_task)
+            self._started = True
 
-        # recurse into any nested stacks.
-        children = stack_object.Stack.get_all_by_owner_id(admin_context, sid)
-        for child in children:
-            self.check_stack_watches(child.id)
+    def check_watches(self):
+        """Evaluate every watch rule whose period has elapsed.
 
-        # Get all watchrules for this stack and evaluate them
+        Only the rules that are due are retrieved, and a rule's stack is only
+        loaded when the rule has actions to run.
+        """
+        LOG.debug("Periodic watcher task")
+        admin_context = context.get_admin_context()
         try:
-            wrs = watch_rule_object.WatchRule.get_all_by_stack(admin_context,
-                                                               sid)
+            wrs = watch_rule_object.WatchRule.get_all_due(admin_context,
+                                                          timeutils.utcnow())
         except Exception as ex:
             LOG.warn(_LW('periodic_task db error watch rule removed? %(ex)s'),
                      ex)
             return
 
+        for i, wr in enumerate(wrs):
+            if i and not i % EVALUATION_BATCH_SIZE:
+                eventlet.sleep(0)
+            try:
+                self._evaluate(admin_context, wr)
+            except Exception:
+                LOG.exception(_LE('Failed to evaluate watch rule %s'),
+                              wr.name)
+
+    def _evaluate(self, admin_context, wr):
+
         def run_alarm_action(stk, actions, details):
             for action in actions:
                 action(details=details)
             for res in six.itervalues(stk):
                 res.metadata_update()
 
-        for wr in wrs:
-            rule = watchrule.WatchRule.load(stk.context, watch=wr)
-            actions = rule.evaluate()
-            if actions:
-                self.thread_group_mgr.start(sid, run_alarm_action, stk,
-                                            actions, rule.get_details())
+        # Any actions are run with the credentials stored for the stack
+        rule = watchrule.WatchRule.load(admin_context, watch=wr,
+                                        use_stored_context=True)
+        actions = rule.evaluate()
+        if actions:
+            self.thread_group_mgr.start(rule.stack_id, run_alarm_action,
+                                        rule.load_stack(), actions,
+                                        rule.get_details())
 
-    def periodic_watcher_task(self, sid):
+    def periodic_watcher_task(self):
         """
-        Periodic task, created for each stack, triggers watch-rule
-        evaluation for all rules defined for the stack
-        sid = stack ID
+        Periodic task, created once per engine, triggers watch-rule
+        evaluation for all rules that are due in every stack
         """
-        self.check_stack_watches(sid)
+        self.check_watches()
@@ -16,6 +16,7 @@ import copy
 import datetime
 import itertools
 import re
+import types
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -41,6 +42,7 @@ from heat.engine import parameter_groups as param_groups
 from heat.engine import resource
 from heat.engine import resources
 from heat.engine import scheduler
+from heat.engine import status_waiter
 from heat.engine import sync_point
 from heat.engine import template as tmpl
 from heat.engine import update
@@ -48,15 +50,31 @@ from heat.objects import raw_template as raw_template_object
 from heat.objects import resource as resource_objects
 from heat.objects import snapshot as snapshot_object
 from heat.objects import stack as stack_object
+from heat.objects import stack_lock as stack_lock_object
 from heat.objects import stack_tag as stack_tag_object
 from heat.objects import user_creds as ucreds_object
 from heat.rpc import api as rpc_api
+from heat.rpc import listener_client
 from heat.rpc import worker_client as rpc_worker_client
 
 cfg.CONF.import_opt('error_wait_time', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_resource_actions', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_resource_actions_per_stack',
+                    'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
+_action_limiter = None
+
+
+def resource_action_limiter():
+    '''Return the limiter shared by resource actions in this engine.'''
+    global _action_limiter
+    if _action_limiter is None:
+        _action_limiter = scheduler.ConcurrencyLimiter(
+            cfg.CONF.max_concurrent_resource_actions)
+    return _action_limiter
+
 
 class ForcedCancel(BaseException):
     """Exception raised to cancel task execution."""
@@ -90,7 +108,7 @@ class Stack(collections.Mapping):
                  use_stored_context=False, username=None,
                  nested_depth=0, strict_validate=True, convergence=False,
                  current_traversal=None, tags=None, prev_raw_template_id=None,
-                 current_deps=None, cache_data=None):
+                 current_deps=None, cache_data=None, stored_outputs=None):
 
         '''
         Initialise from a context, name, Template object and (optionally)
@@ -100,6 +118,9 @@ class Stack(collections.Mapping):
         Creating a stack with cache_data creates a lightweight stack which
         will not load any resources from the database and resolve the
         functions from the cache_data specified.
+
+        The stored_outputs are the output values that were resolved and
+        stored in the database when the last stack action finished.
         '''
 
         def _validate_stack_name(name):
@@ -142,6 +163,7 @@ class Stack(collections.Mapping):
         self.prev_raw_template_id = prev_raw_template_id
         self.current_deps = current_deps
         self.cache_data = cache_data
+        self.stored_outputs = stored_outputs
         self._worker_client = None
 
         if use_stored_context:
@@ -327,6 +349,33 @@ class Stack(collections.Mapping):
                                       for out in six.itervalues(outputs)))
         return set(itertools.chain.from_iterable(attr_lists))
 
+    def metadata_dependents(self, resource):
+        '''
+        Return the resources whose metadata may change when the specified
+        resource changes.
+
+        These are the created resources whose metadata refers to an attribute
+        of the resource, or of any resource that requires it (directly or
+        indirectly), since attributes may be derived from the state of the
+        resources a resource depends on.
+        '''
+        deps = self.dependencies
+        changed = set()
+        pending = [resource]
+        while pending:
+            current = pending.pop()
+            if current.name not in changed:
+                changed.add(current.name)
+                pending.extend(deps.required_by(current))
+
+        def refers_to_changed(res):
+            return any(name in changed
+                       for name, attr in res.t.metadata_dep_attrs())
+
+        return [res for res in deps
+                if (res.name != resource.name and res.id is not None and
+                    res.action != res.INIT and refers_to_changed(res))]
+
     @staticmethod
     def _get_dependencies(resources):
         '''Return the dependency graph for a list of resources.'''
@@ -338,8 +387,14 @@ class Stack(collections.Mapping):
 
     @classmethod
     def load(cls, context, stack_id=None, stack=None, show_deleted=True,
-             use_stored_context=False, force_reload=False, cache_data=None):
-        '''Retrieve a Stack from the database.'''
+             use_stored_context=False, force_reload=False, cache_data=None,
+             templates=None):
+        '''
+        Retrieve a Stack from the database.
+
+        If a dict of templates keyed by ID is passed, the stack's template is
+        taken from it where possible, and added to it otherwise.
+        '''
         if stack is None:
             stack = stack_object.Stack.get_by_id(
                 context,
@@ -355,7 +410,7 @@ class Stack(collections.Mapping):
 
         return cls._from_db(context, stack,
                             use_stored_context=use_stored_context,
-                            cache_data=cache_data)
+                            cache_data=cache_data, templates=templates)
 
     @classmethod
     def load_all(cls, context, limit=None, marker=None, sort_keys=None,
@@ -383,9 +438,10 @@ class Stack(collections.Mapping):
 
     @classmethod
     def _from_db(cls, context, stack, resolve_data=True,
-                 use_stored_context=False, cache_data=None):
+                 use_stored_context=False, cache_data=None, templates=None):
         template = tmpl.Template.load(
-            context, stack.raw_template_id, stack.raw_template)
+            context, stack.raw_template_id, stack.raw_template,
+            templates=templates)
         tags = None
         if stack.tags:
             tags = [t.tag for t in stack.tags]
@@ -406,7 +462,8 @@ class Stack(collections.Mapping):
                    username=stack.username, convergence=stack.convergence,
                    current_traversal=stack.current_traversal, tags=tags,
                    prev_raw_template_id=stack.prev_raw_template_id,
-                   current_deps=stack.current_deps, cache_data=cache_data)
+                   current_deps=stack.current_deps, cache_data=cache_data,
+                   stored_outputs=stack.outputs)
 
     def get_kwargs_for_cloning(self, keep_status=False, only_db=False):
         """Get common kwargs for calling Stack() for cloning.
@@ -716,9 +773,32 @@ class Stack(collections.Mapping):
                       'status': status,
                       'name': self.name,
                       'reason': reason})
+            self.stored_outputs = None
             stack.update_and_save({'action': action,
                                    'status': status,
-                                   'status_reason': reason})
+                                   'status_reason': reason,
+                                   'outputs': None})
+            self._notify_state_change()
+
+    def _notify_state_change(self):
+        '''
+        Wake any tasks waiting on a change in the state of this stack.
+
+        Tasks in this engine are notified directly. When a nested stack
+        finishes an action, the engine running the action on the parent
+        stack (which holds the parent's stack lock) is also notified through
+        its engine listener, since that is where the parent resource will be
+        waiting.
+        '''
+        status_waiter.notify(self.id)
+
+        if self.owner_id is None or self.status == self.IN_PROGRESS:
+            return
+
+        engine_id = stack_lock_object.StackLock.get_engine_id(self.owner_id)
+        if engine_id is not None:
+            listener_client.EngineListenerClient(
+                engine_id).notify_state_change(self.context, self.id)
 
     @property
     def state(self):
@@ -771,6 +851,29 @@ class Stack(collections.Mapping):
 
         return {'resource_data': data['resources'].get(resource.name)}
 
+    def _limit_resource_action(self, rsrc, task):
+        '''
+        Return a resource action task that waits for a slot in the engine's
+        resource action limiter before running.
+
+        Nested stack resources are not limited, since the resources in the
+        nested stack need slots of their own to make progress.
+        '''
+        if (not isinstance(task, types.GeneratorType) or
+                hasattr(rsrc, 'nested')):
+            return task
+
+        def is_over_limit(ex):
+            if isinstance(ex, exception.ResourceFailure):
+                ex = ex.exc
+            if ex is None or rsrc.default_client_name is None:
+                return False
+            plugin = rsrc.client_plugin()
+            return plugin is not None and plugin.is_over_limit(ex)
+
+        return resource_action_limiter().limit_task(self.id, task,
+                                                    is_over_limit)
+
     @scheduler.wrappertask
     def stack_task(self, action, reverse=False, post_func=None,
                    error_wait_time=None,
@@ -815,14 +918,15 @@ class Stack(collections.Mapping):
             # action specific argument list, otherwise an empty arg list
             handle_kwargs = getattr(self,
                                     '_%s_kwargs' % action_l, lambda x: {})
-            return handle(**handle_kwargs(r))
+            return self._limit_resource_action(r, handle(**handle_kwargs(r)))
 
         action_task = scheduler.DependencyTaskGroup(
             self.dependencies,
             resource_action,
             reverse,
             error_wait_time=error_wait_time,
-            aggregate_exceptions=aggregate_exceptions)
+            aggregate_exceptions=aggregate_exceptions,
+            max_active=cfg.CONF.max_concurrent_resource_actions_per_stack)
 
         try:
             yield action_task()
@@ -845,6 +949,7 @@ class Stack(collections.Mapping):
 
         if callable(post_func):
             post_func()
+        self._store_outputs_when_complete()
         lifecycle_plugin_utils.do_post_ops(self.context, self, None, action,
                                            (self.status == self.FAILED))
 
@@ -965,14 +1070,11 @@ class Stack(collections.Mapping):
         LOG.info(_LI('convergence_dependencies: %s'),
                  self.convergence_dependencies)
 
-        # create sync_points for resources in DB
-        for rsrc_id, is_update in self.convergence_dependencies:
-            sync_point.create(self.context, rsrc_id,
-                              self.current_traversal, is_update,
-                              self.id)
-        # create sync_point entry for stack
-        sync_point.create(
-            self.context, self.id, self.current_traversal, True, self.id)
+        # create sync_points for resources in DB, and an entry for the stack
+        sync_point.create_all(
+            self.context,
+            itertools.chain(self.convergence_dependencies, [(self.id, True)]),
+            self.current_traversal, self.id)
 
         # Store list of edges
         self.current_deps = {
@@ -980,13 +1082,14 @@ class Stack(collections.Mapping):
                       self.convergence_dependencies.graph().edges()]}
         self.store()
 
+        leaves = []
         for rsrc_id, is_update in self.convergence_dependencies.leaves():
             LOG.info(_LI("Triggering resource %(rsrc_id)s "
                          "for %(is_update)s update"),
                      {'rsrc_id': rsrc_id, 'is_update': is_update})
-            self.worker_client.check_resource(self.context, rsrc_id,
-                                              self.current_traversal,
-                                              {}, is_update)
+            leaves.append((rsrc_id, is_update, {}))
+        self.worker_client.check_resources(self.context, self.id,
+                                           self.current_traversal, leaves)
 
     def _update_or_store_resources(self):
         try:
@@ -998,21 +1101,20 @@ class Stack(collections.Mapping):
             self.ext_rsrcs_db = {res.id: res
                                  for res_name, res in ext_rsrcs_db.items()}
 
+        # Index the existing resources by name and template, so that each
+        # resource in the new template can be matched in constant time
+        existing_by_tmpl = {}
+        for ext_rsrc in six.itervalues(self.ext_rsrcs_db or {}):
+            key = (ext_rsrc.name, ext_rsrc.current_template_id)
+            existing_by_tmpl.setdefault(key, ext_rsrc)
+
         def get_existing_rsrc_db(rsrc_name):
-            candidate = None
-            if self.ext_rsrcs_db:
-                for id, ext_rsrc in self.ext_rsrcs_db.items():
-                    if ext_rsrc.name != rsrc_name:
-                        continue
-                    if ext_rsrc.current_template_id == self.t.id:
-                        # Rollback where the previous resource still exists
-                        candidate = ext_rsrc
-                        break
-                    elif (ext_rsrc.current_template_id ==
-                            self.prev_raw_template_id):
-                        # Current resource is otherwise a good candidate
-                        candidate = ext_rsrc
-                        break
+            # Rollback where the previous resource still exists
+            candidate = existing_by_tmpl.get((rsrc_name, self.t.id))
+            if candidate is None:
+                # Current resource is otherwise a good candidate
+                candidate = existing_by_tmpl.get((rsrc_name,
+                                                  self.prev_raw_template_id))
             return candidate
 
         curr_name_translated_dep = self.dependencies.translate(lambda res:
@@ -1028,20 +1130,28 @@ class Stack(collections.Mapping):
             needed_by = old_requirers | new_requirers
             res.needed_by = list(needed_by)
 
+        new_rsrcs = []
+        existing_rsrcs = []
         for rsrc in reversed(self.dependencies):
             existing_rsrc_db = get_existing_rsrc_db(rsrc.name)
             if existing_rsrc_db is None:
-                update_needed_by(rsrc)
                 rsrc.current_template_id = self.t.id
-                rsrc._store()
+                new_rsrcs.append(rsrc)
                 rsrcs[rsrc.name] = rsrc
             else:
-                update_needed_by(existing_rsrc_db)
-                resource.Resource.set_needed_by(
-                    existing_rsrc_db, existing_rsrc_db.needed_by
-                )
+                existing_rsrcs.append(existing_rsrc_db)
                 rsrcs[existing_rsrc_db.name] = existing_rsrc_db
 
+        # Create all of the new resources in one transaction, so that their
+        # IDs are known when recording which resources need each resource
+        resource.Resource.store_all(self.context, new_rsrcs)
+
+        needed_by = {}
+        for res in itertools.chain(new_rsrcs, existing_rsrcs):
+            update_needed_by(res)
+            needed_by[res.id] = {'needed_by': res.needed_by}
+        resource_objects.Resource.update_batch(self.context, needed_by)
+
     def _convergence_dependencies(self, existing_resources,
                                   curr_template_dep):
         dep = curr_template_dep.translate(lambda res: (res.id, True))
@@ -1171,6 +1281,7 @@ class Stack(collections.Mapping):
         notification.send(self)
         self._add_event(self.action, self.status, self.status_reason)
         self.store()
+        self._store_outputs_when_complete()
 
         lifecycle_plugin_utils.do_post_ops(self.context, self,
                                            newstack, action,
@@ -1477,6 +1588,44 @@ class Stack(collections.Mapping):
             self.outputs[key]['error_msg'] = six.text_type(ex)
             return None
 
+    def resolve_outputs(self):
+        '''
+        Resolve the values of all of the stack outputs.
+
+        Returns a dict mapping each output name to its value and the error
+        message, if any, from resolving it.
+        '''
+        values = {}
+        for key in self.outputs:
+            value = self.output(key)
+            values[key] = {'value': value,
+                           'error_msg': self.outputs[key].get('error_msg')}
+        return values
+
+    def store_outputs(self):
+        '''
+        Resolve the values of all of the stack outputs and store them in the
+        database, replacing those stored when the last action finished.
+        '''
+        self.stored_outputs = self.resolve_outputs()
+        if self.id is not None:
+            encrypted, outputs = stack_object.Stack.encrypt_outputs(
+                self.stored_outputs)
+            stack_object.Stack.update_by_id(self.context, self.id,
+                                            {'outputs': outputs,
+                                             'outputs_encrypted': encrypted})
+
+    def _store_outputs_when_complete(self):
+        '''
+        Store the output values once an action on the stack has finished.
+
+        Resolving the outputs may call backend APIs, so it is done only after
+        the new state has been saved, and only for top-level stacks.
+        '''
+        if (self.status != self.IN_PROGRESS and self.action != self.DELETE and
+                self.owner_id is None):
+            self.store_outputs()
+
     def restart_resource(self, resource_name):
         '''
         stop resource_name and all that depend on it
@@ -1559,6 +1708,7 @@ class Stack(collections.Mapping):
         # of other resources, so ensure that attributes are re-calculated
         for res in six.itervalues(self.resources):
             res.attributes.reset_resolved_values()
+            res.properties.reset_cache()
 
     def has_cache_data(self):
         if self.cache_data is not None:
@@ -1590,6 +1740,7 @@ class Stack(collections.Mapping):
 
         reason = 'Stack %s completed successfully' % self.action
         self.state_set(self.action, self.COMPLETE, reason)
+        self._store_outputs_when_complete()
         self.purge_db()
 
     def purge_db(self):
@@ -0,0 +1,83 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Notification of stack state changes to tasks in this engine waiting on them.
+
+A task that waits for a stack to finish an action (e.g. a nested stack
+resource waiting on its child stack) registers a StatusWaiter for the stack.
+When the stack changes state, either in this engine or in another engine
+that notifies this one through the engine listener, the waiter is flagged so
+that the next check of the stack's status goes to the database. Checks that
+have not been notified are skipped, apart from a periodic fallback check
+that guards against lost notifications.
+"""
+
+import collections
+import weakref
+
+from heat.common import stats
+
+# Number of consecutive un-notified checks after which a waiter checks the
+# database anyway
+FALLBACK_POLL_STEPS = 10
+
+_waiters = collections.defaultdict(weakref.WeakSet)
+
+counters = stats.get_counters('status_waiter')
+
+
+class StatusWaiter(object):
+    '''Tracks whether a stack may have changed state since it was checked.'''
+
+    def __init__(self, stack_id, fallback_steps=FALLBACK_POLL_STEPS):
+        self.stack_id = stack_id
+        self.fallback_steps = fallback_steps
+        self._changed = True
+        self._skipped = 0
+        _waiters[stack_id].add(self)
+
+    def notify(self):
+        '''Flag that the stack has changed state.'''
+        self._changed = True
+
+    def should_check(self):
+        '''
+        Return True if the stack's status should be checked now.
+
+        This is the case if the stack has been notified as changed since the
+        last check, or if the fallback interval has elapsed.
+        '''
+        if self._changed or self._skipped >= self.fallback_steps:
+            self._changed = False
+            self._skipped = 0
+            counters.incr('checks')
+            return True
+
+        self._skipped += 1
+        counters.incr('skipped')
+        return False
+
+    def close(self):
+        '''Stop waiting for changes to the stack.'''
+        waiters = _waiters.get(self.stack_id)
+        if waiters is not None:
+            waiters.discard(self)
+            if not waiters:
+                del _waiters[self.stack_id]
+
+
+def notify(stack_id):
+    '''Notify any tasks waiting on the given stack that its state changed.'''
+    for waiter in list(_waiters.get(stack_id, ())):
+        waiter.notify()
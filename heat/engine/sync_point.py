@@ -12,10 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
+
+import eventlet
+from eventlet import event
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import excutils
 import six
 
 from heat.common.i18n import _
+from heat.common import stats
 from heat.objects import sync_point as sync_point_object
 
 LOG = logging.getLogger(__name__)
@@ -23,6 +30,31 @@ LOG = logging.getLogger(__name__)
 
 KEY_SEPERATOR = ':'
 
+# Initial and maximum delay (in seconds) between retries of a conflicting
+# sync point update
+RETRY_BACKOFF_BASE = 0.01
+RETRY_BACKOFF_MAX = 2.0
+
+# Data waiting to be written to each sync point that is currently being
+# updated by this engine, keyed by (entity_id, traversal_id, is_update)
+_pending_updates = {}
+
+counters = stats.get_counters('sync_point')
+
+
+class _PendingUpdate(object):
+    """Data handed over to the thread updating a sync point.
+
+    Threads that hand over data wait on the done event, which returns True
+    once the data is written (and propagated, if the node is ready), False if
+    it was never written and must be added again, or raises the exception
+    that the write failed with.
+    """
+
+    def __init__(self, data):
+        self.data = dict(data)
+        self.done = event.Event()
+
 
 def _dump_list(items, separator=', '):
     return separator.join(map(str, items))
@@ -43,6 +75,18 @@ def create(context, entity_id, traversal_id, is_update, stack_id):
     return sync_point_object.SyncPoint.create(context, values)
 
 
+def create_all(context, entities, traversal_id, stack_id):
+    """
+    Creates sync point entries in DB for a list of (entity_id, is_update)
+    pairs, in a single transaction.
+    """
+    values_list = [{'entity_id': entity_id, 'traversal_id': traversal_id,
+                    'is_update': is_update, 'atomic_key': 0,
+                    'stack_id': stack_id, 'input_data': {}}
+                   for entity_id, is_update in entities]
+    return sync_point_object.SyncPoint.create_batch(context, values_list)
+
+
 def get(context, entity_id, traversal_id, is_update):
     """
     Retrieves a sync point entry from DB.
@@ -87,29 +131,98 @@ def serialize_input_data(input_data):
     return {'input_data': [[list(i), j] for i, j in six.iteritems(input_data)]}
 
 
-def sync(cnxt, entity_id, current_traversal, is_update, propagate,
-         predecessors, new_data):
-    rows_updated = None
-    sync_point = None
-    input_data = None
-    while not rows_updated:
-        # TODO(sirushtim): Add a conf option to add no. of retries
+def _retry_delay(attempt):
+    """Return a randomised, exponentially increasing retry delay."""
+    limit = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, limit)
+
+
+def _update(cnxt, entity_id, current_traversal, is_update, new_data):
+    """
+    Merge new data into a sync point and return the combined input data.
+
+    Conflicting updates from other engines are retried with a randomised
+    exponential backoff, up to the configured retry limit.
+    """
+    key = (entity_id, current_traversal, is_update)
+    retry_limit = cfg.CONF.sync_point_retry_limit
+
+    for attempt in six.moves.xrange(retry_limit + 1):
+        if attempt:
+            counters.incr('retries')
+            eventlet.sleep(_retry_delay(attempt))
+
         sync_point = get(cnxt, entity_id, current_traversal, is_update)
         input_data = dict(deserialize_input_data(sync_point.input_data))
         input_data.update(new_data)
         rows_updated = update_input_data(
             cnxt, entity_id, current_traversal, is_update,
             sync_point.atomic_key, serialize_input_data(input_data))
+        if rows_updated:
+            counters.incr('updates')
+            if attempt:
+                LOG.debug('[%s] Sync point updated after %d retries',
+                          make_key(*key), attempt)
+            return input_data
+
+    counters.incr('failures')
+    raise SyncPointUpdateFailed(key, retry_limit)
+
 
-    waiting = predecessors - set(input_data)
-    key = make_key(entity_id, current_traversal, is_update)
-    if waiting:
-        LOG.debug('[%s] Waiting %s: Got %s; still need %s',
-                  key, entity_id, _dump_list(input_data), _dump_list(waiting))
+def sync(cnxt, entity_id, current_traversal, is_update, propagate,
+         predecessors, new_data):
+    """
+    Add new data to a sync point and propagate it if the node is ready.
+
+    If this engine is already in the middle of updating the same sync point
+    (e.g. for a different predecessor), the new data is handed over to the
+    thread doing that update, which writes all of the data it has collected
+    in a single update. The handing over thread waits for that update, and
+    fails if it fails. This keeps the number of conflicting writes to a
+    sync point with many predecessors roughly proportional to the number of
+    engines, rather than to the number of predecessors.
+    """
+    sync_key = (entity_id, current_traversal, is_update)
+    key = make_key(*sync_key)
+
+    if sync_key in _pending_updates:
+        counters.incr('coalesced')
+        LOG.debug('[%s] Coalescing update of %s with one in progress',
+                  key, entity_id)
+        pending = _pending_updates[sync_key]
+        pending.data.update(new_data)
+        if pending.done.wait():
+            return
+        # The update in progress failed before this data was written
+        return sync(cnxt, entity_id, current_traversal, is_update,
+                    propagate, predecessors, new_data)
+
+    pending = _PendingUpdate(new_data)
+    try:
+        while pending.data:
+            queued = _PendingUpdate({})
+            _pending_updates[sync_key] = queued
+            input_data = _update(cnxt, entity_id, current_traversal,
+                                 is_update, pending.data)
+
+            waiting = predecessors - set(input_data)
+            if waiting:
+                LOG.debug('[%s] Waiting %s: Got %s; still need %s',
+                          key, entity_id, _dump_list(input_data),
+                          _dump_list(waiting))
+            else:
+                LOG.debug('[%s] Ready %s: Got %s',
+                          key, entity_id, _dump_list(input_data))
+                propagate(entity_id, serialize_input_data(input_data))
+            pending.done.send(True)
+            pending = queued
+    except Exception as exc:
+        with excutils.save_and_reraise_exception():
+            del _pending_updates[sync_key]
+            pending.done.send_exception(exc)
+            queued.done.send(False)
     else:
-        LOG.debug('[%s] Ready %s: Got %s',
-                  key, entity_id, _dump_list(input_data))
-        propagate(entity_id, serialize_input_data(input_data))
+        del _pending_updates[sync_key]
 
 
 class SyncPointNotFound(Exception):
@@ -117,3 +230,12 @@ class SyncPointNotFound(Exception):
     def __init__(self, sync_point):
         msg = _("Sync Point %s not found") % (sync_point, )
         super(Exception, self).__init__(six.text_type(msg))
+
+
+class SyncPointUpdateFailed(Exception):
+    '''Raised when a sync point could not be updated within the retries.'''
+    def __init__(self, sync_point, retries):
+        msg = _("Sync Point %(sync_point)s could not be updated after "
+                "%(retries)d retries") % {'sync_point': sync_point,
+                                          'retries': retries}
+        super(Exception, self).__init__(six.text_type(msg))
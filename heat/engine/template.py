@@ -15,14 +15,20 @@ import abc
 import collections
 import copy
 import functools
+import itertools
 
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
 import six
 from stevedore import extension
 
 from heat.common import exception
 from heat.common.i18n import _
+from heat.common import stats
 from heat.engine import environment
+from heat.engine import function
 from heat.objects import raw_template as template_object
 
 LOG = logging.getLogger(__name__)
@@ -87,6 +93,77 @@ def get_template_class(template_data):
         raise exception.InvalidTemplateVersion(explanation=explanation)
 
 
+# Templates updated more recently than this many seconds ago are not cached,
+# since another update within the resolution of the updated_at timestamp (or
+# the clock skew between engines) would not be detected.
+TEMPLATE_CACHE_SETTLE_TIME = 60
+
+
+class TemplateCache(object):
+    '''
+    An LRU cache of templates loaded from the database, keyed by ID.
+
+    Each entry records the updated_at time of the raw template it was loaded
+    from, so that a template updated by any engine is reloaded. The cache is
+    bounded both by the number of templates and by their approximate size.
+    '''
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self.counters = stats.get_counters('template_cache')
+
+    def get(self, template_id, updated_at):
+        '''Return the cached template, or None if it is missing or stale.'''
+        entry = self._entries.pop(template_id, None)
+        if entry is not None:
+            if entry[0] == updated_at:
+                self._entries[template_id] = entry
+                self.counters.incr('hits')
+                return entry[1]
+            self._size -= entry[2]
+        self.counters.incr('misses')
+        return None
+
+    def put(self, template_id, updated_at, tmpl):
+        '''Add a template to the cache, evicting others if necessary.'''
+        max_templates = cfg.CONF.template_cache_size
+        if max_templates <= 0 or template_id is None:
+            return
+        if updated_at is not None:
+            age = timeutils.delta_seconds(updated_at, timeutils.utcnow())
+            if age < TEMPLATE_CACHE_SETTLE_TIME:
+                return
+
+        size = len(jsonutils.dumps([tmpl.t, tmpl.files]))
+        max_size = cfg.CONF.template_cache_max_size * 1024 * 1024
+        if size > max_size:
+            return
+
+        self.invalidate(template_id)
+        while self._entries and (len(self._entries) >= max_templates or
+                                 self._size + size > max_size):
+            old_id, old_entry = self._entries.popitem(last=False)
+            self._size -= old_entry[2]
+            self.counters.incr('evictions')
+        self._entries[template_id] = (updated_at, tmpl, size)
+        self._size += size
+
+    def invalidate(self, template_id):
+        '''Remove a template from the cache.'''
+        entry = self._entries.pop(template_id, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    def clear(self):
+        '''Remove all templates from the cache.'''
+        self._entries.clear()
+        self._size = 0
+
+
+_template_cache = TemplateCache()
+
+
 class Template(collections.Mapping):
     '''A stack template.'''
 
@@ -117,18 +194,84 @@ class Template(collections.Mapping):
         self.env = env or environment.Environment({})
         self.version = get_version(self.t,
                                    list(six.iterkeys(_template_classes)))
+        self._dep_attrs = None
+        self._origin = None
+        self._shared = False
+        self._env_shared = False
 
     def __deepcopy__(self, memo):
         return Template(copy.deepcopy(self.t, memo), files=self.files,
                         env=self.env)
 
     @classmethod
-    def load(cls, context, template_id, t=None):
-        '''Retrieve a Template with the given ID from the database.'''
+    def load(cls, context, template_id, t=None, templates=None):
+        '''
+        Retrieve a Template with the given ID from the database.
+
+        Templates are cached by the engine, so that the environment and the
+        index of dependent attributes are not rebuilt each time the same
+        template is loaded. The template returned shares its data,
+        environment and index with the cached copy until they are modified,
+        and has its own copy of the files.
+
+        If a dict of templates keyed by ID is passed, the template is copied
+        from it where possible, and the loaded template is added to it
+        otherwise.
+        '''
+        if templates is not None and template_id in templates:
+            return templates[template_id].shared_copy()
         if t is None:
             t = template_object.RawTemplate.get_by_id(context, template_id)
-        env = environment.Environment(t.environment)
-        return cls(t.template, template_id=template_id, files=t.files, env=env)
+        cached = _template_cache.get(template_id, t.updated_at)
+        if cached is None:
+            env = environment.Environment(t.environment)
+            cached = cls(t.template, template_id=template_id, files=t.files,
+                         env=env)
+            _template_cache.put(template_id, t.updated_at, cached)
+        if templates is not None:
+            templates[template_id] = cached
+        return cached.shared_copy()
+
+    def shared_copy(self):
+        '''
+        Return a copy of the template that shares its data with this one.
+
+        The template data, environment and index of dependent attributes are
+        shared until the copy modifies them; the files are copied.
+        '''
+        tmpl = type(self)(self.t, template_id=self.id,
+                          files=dict(self.files), env=self.env)
+        tmpl._origin = self
+        tmpl._shared = True
+        tmpl._env_shared = True
+        return tmpl
+
+    def _copy_on_write(self):
+        '''
+        Prepare to modify the resources in the template.
+
+        If the template data is shared with the engine's template cache, a
+        private copy is taken first.
+        '''
+        self._dep_attrs = None
+        self._origin = None
+        if self._shared:
+            self.t = copy.deepcopy(self.t)
+            self._shared = False
+
+    def register_template_file(self, resource_type, template_name, data):
+        '''
+        Add a template file and register it as a resource type.
+
+        If the environment is shared with the engine's template cache, a
+        private copy is taken first.
+        '''
+        self.files[template_name] = data
+        if self._env_shared:
+            self.env = environment.Environment(
+                copy.deepcopy(self.env.user_env_as_dict()))
+            self._env_shared = False
+        self.env.register_class(resource_type, template_name)
 
     def store(self, context=None):
         '''Store the Template in the database and return its ID.'''
@@ -142,6 +285,7 @@ class Template(collections.Mapping):
             self.id = new_rt.id
         else:
             template_object.RawTemplate.update_by_id(context, self.id, rt)
+            _template_cache.invalidate(self.id)
         return self.id
 
     def __iter__(self):
@@ -212,8 +356,39 @@ class Template(collections.Mapping):
 
     def remove_resource(self, name):
         '''Remove a resource from the template.'''
+        self._copy_on_write()
         self.t.get(self.RESOURCES, {}).pop(name)
 
+    def dep_attrs(self, stack, resource_name):
+        '''
+        Return the set of attributes of the named resource that are referenced
+        by other resources or outputs in the template.
+
+        An index of referenced attributes for every resource is built in a
+        single pass over the stack's resources and outputs the first time it
+        is needed, and is kept with the template until a resource is added
+        or removed. Copies of a cached template share the index.
+        '''
+        if self._dep_attrs is None and self._origin is not None:
+            self._dep_attrs = self._origin._dep_attrs
+        if self._dep_attrs is None:
+            attr_pairs = itertools.chain(
+                itertools.chain.from_iterable(
+                    res.all_dep_attrs()
+                    for res in six.itervalues(stack.resources)),
+                itertools.chain.from_iterable(
+                    function.all_dep_attrs(out.get('Value', ''))
+                    for out in six.itervalues(stack.outputs)))
+
+            dep_attrs = collections.defaultdict(set)
+            for res_name, attr in attr_pairs:
+                dep_attrs[res_name].add(attr)
+            self._dep_attrs = dep_attrs
+            if self._origin is not None:
+                self._origin._dep_attrs = dep_attrs
+
+        return set(self._dep_attrs.get(resource_name, ()))
+
     def parse(self, stack, snippet):
         return parse(self.functions, stack, snippet)
 
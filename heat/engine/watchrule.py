@@ -56,7 +56,7 @@ class WatchRule(object):
 
     def __init__(self, context, watch_name, rule, stack_id=None,
                  state=NODATA, wid=None, watch_data=None,
-                 last_evaluated=timeutils.utcnow()):
+                 last_evaluated=timeutils.utcnow(), use_stored_context=False):
         self.context = context
         self.now = timeutils.utcnow()
         self.name = watch_name
@@ -70,13 +70,21 @@ class WatchRule(object):
             period = int(rule['period'])
         self.timeperiod = datetime.timedelta(seconds=period)
         self.id = wid
-        self.watch_data = watch_data or []
+        self.watch_data = list(watch_data or [])
         self.last_evaluated = last_evaluated
+        self.use_stored_context = use_stored_context
+        self._stack = None
 
     @classmethod
-    def load(cls, context, watch_name=None, watch=None):
+    def load(cls, context, watch_name=None, watch=None,
+             use_stored_context=False):
         '''
         Load the watchrule object, either by name or via an existing DB object
+
+        If use_stored_context is True, the stack on which the rule's actions
+        are run is loaded with the stack's stored context rather than the
+        given one, so that e.g. an admin context can be used to evaluate the
+        rules of any stack.
         '''
         if watch is None:
             try:
@@ -95,7 +103,8 @@ class WatchRule(object):
                        state=watch.state,
                        wid=watch.id,
                        watch_data=watch.watch_data,
-                       last_evaluated=watch.last_evaluated)
+                       last_evaluated=watch.last_evaluated,
+                       use_stored_context=use_stored_context)
 
     def store(self):
         '''
@@ -137,96 +146,52 @@ class WatchRule(object):
         else:
             return False
 
-    def do_Maximum(self):
-        data = 0
-        have_data = False
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            if not have_data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-                have_data = True
-            if float(d.data[self.rule['MetricName']]['Value']) > data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
+    def _period_samples(self):
+        cutoff = self.now - self.timeperiod
+        return [d for d in self.watch_data if d.created_at >= cutoff]
 
-        if not have_data:
-            return self.NODATA
+    def _period_values(self):
+        '''
+        Return the metric values of the samples within the current period,
+        parsing each sample only once.
+        '''
+        metric = self.rule['MetricName']
+        return [float(d.data[metric]['Value'])
+                for d in self._period_samples()]
 
+    def _threshold_state(self, data):
         if self.do_data_cmp(data,
                             float(self.rule['Threshold'])):
             return self.ALARM
         else:
             return self.NORMAL
 
-    def do_Minimum(self):
-        data = 0
-        have_data = False
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            if not have_data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-                have_data = True
-            elif float(d.data[self.rule['MetricName']]['Value']) < data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-
-        if not have_data:
+    def do_Maximum(self):
+        values = self._period_values()
+        if not values:
             return self.NODATA
+        return self._threshold_state(max(values))
 
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+    def do_Minimum(self):
+        values = self._period_values()
+        if not values:
+            return self.NODATA
+        return self._threshold_state(min(values))
 
     def do_SampleCount(self):
         '''
         count all samples within the specified period
         '''
-        data = 0
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            data = data + 1
-
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+        return self._threshold_state(len(self._period_samples()))
 
     def do_Average(self):
-        data = 0
-        samples = 0
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            samples = samples + 1
-            data = data + float(d.data[self.rule['MetricName']]['Value'])
-
-        if samples == 0:
+        values = self._period_values()
+        if not values:
             return self.NODATA
-
-        data = data / samples
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+        return self._threshold_state(sum(values) / len(values))
 
     def do_Sum(self):
-        data = 0
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                LOG.debug('ignoring %s' % str(d.data))
-                continue
-            data = data + float(d.data[self.rule['MetricName']]['Value'])
-
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+        return self._threshold_state(sum(self._period_values()))
 
     def get_alarm_state(self):
         fn = getattr(self, 'do_%s' % self.rule['Statistic'])
@@ -252,8 +217,21 @@ class WatchRule(object):
 
         self.last_evaluated = self.now
         self.store()
+        self._prune_watch_data()
         return actions
 
+    def _prune_watch_data(self):
+        '''
+        Delete the samples that are too old to affect future evaluations.
+        '''
+        if self.id is None or not self.timeperiod:
+            return
+        cutoff = self.now - self.timeperiod
+        watch_data_objects.WatchData.delete_older_than(self.context, self.id,
+                                                       cutoff)
+        self.watch_data = [d for d in self.watch_data
+                           if d.created_at >= cutoff]
+
     def rule_actions(self, new_state):
         LOG.info(_LI('WATCH: stack:%(stack)s, watch_name:%(watch_name)s, '
                      'new_state:%(new_state)s'), {'stack': self.stack_id,
@@ -263,11 +241,7 @@ class WatchRule(object):
         if self.ACTION_MAP[new_state] not in self.rule:
             LOG.info(_LI('no action for new state %s'), new_state)
         else:
-            s = stack_object.Stack.get_by_id(
-                self.context,
-                self.stack_id,
-                eager_load=True)
-            stk = stack.Stack.load(self.context, stack=s)
+            stk = self.load_stack()
             if (stk.action != stk.DELETE
                     and stk.status == stk.COMPLETE):
                 for refid in self.rule[self.ACTION_MAP[new_state]]:
@@ -277,6 +251,21 @@ class WatchRule(object):
                          new_state)
         return actions
 
+    def load_stack(self):
+        '''
+        Return the stack to which the rule belongs, loading it only once.
+        '''
+        if self._stack is None:
+            s = stack_object.Stack.get_by_id(
+                self.context,
+                self.stack_id,
+                tenant_safe=not self.use_stored_context,
+                eager_load=True)
+            self._stack = stack.Stack.load(
+                self.context, stack=s,
+                use_stored_context=self.use_stored_context)
+        return self._stack
+
     def _to_ceilometer(self, data):
         clients = self.context.clients
         sample = {}
@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+
+from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
 from oslo_service import service
@@ -24,6 +27,7 @@ from heat.common import exception
 from heat.common.i18n import _LE
 from heat.common.i18n import _LI
 from heat.common import messaging as rpc_messaging
+from heat.common import stats
 from heat.engine import dependencies
 from heat.engine import resource
 from heat.engine import stack as parser
@@ -35,6 +39,30 @@ from heat.rpc import worker_client as rpc_client
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of traversals for which an engine caches a TraversalContext
+MAX_CACHED_TRAVERSALS = 100
+
+counters = stats.get_counters('traversal_context')
+
+
+class TraversalContext(object):
+    '''
+    Data shared by every check of a resource within one stack traversal.
+
+    The dependency graph is built from the stack's stored edge list only once
+    per traversal, and the templates of the stack and of the traversal's
+    resources are loaded only once, instead of for every node in the graph.
+    Each check gets its own copy of a template, which shares the data, the
+    environment and the index of dependent attributes with the cached one.
+    '''
+
+    def __init__(self, stack_id, traversal_id, current_deps):
+        self.stack_id = stack_id
+        self.traversal_id = traversal_id
+        self.deps = load_dependencies(current_deps)
+        self.graph = self.deps.graph()
+        self.templates = {}
+
 
 @profiler.trace_cls("rpc")
 class WorkerService(service.Service):
@@ -46,7 +74,7 @@ class WorkerService(service.Service):
     or expect replies from these messages.
     """
 
-    RPC_API_VERSION = '1.1'
+    RPC_API_VERSION = '1.2'
 
     def __init__(self,
                  host,
@@ -61,6 +89,7 @@ class WorkerService(service.Service):
 
         self._rpc_client = None
         self._rpc_server = None
+        self._traversals = collections.OrderedDict()
 
     def start(self):
         target = oslo_messaging.Target(
@@ -85,8 +114,57 @@ class WorkerService(service.Service):
         except Exception as e:
             LOG.error(_LE("WorkerService is failed to stop, %s"), e)
 
+        # Send any resource checks still waiting to be batched
+        if self._rpc_client is not None:
+            self._rpc_client.flush()
+
         super(WorkerService, self).stop()
 
+    def _traversal_context(self, stack, traversal_id):
+        '''
+        Return the cached TraversalContext for a traversal of a stack.
+
+        Contexts are keyed by traversal ID, which is unique across stacks.
+        Only the latest traversal of each stack is kept; starting a new one
+        discards any context left over from the previous traversal.
+        '''
+        tc = self._traversals.pop(traversal_id, None)
+        if tc is None:
+            counters.incr('misses')
+            for old_id in [tid for tid, old in six.iteritems(self._traversals)
+                           if old.stack_id == stack.id]:
+                del self._traversals[old_id]
+            tc = TraversalContext(stack.id, traversal_id, stack.current_deps)
+            while len(self._traversals) >= MAX_CACHED_TRAVERSALS:
+                self._traversals.popitem(last=False)
+        else:
+            counters.incr('hits')
+        self._traversals[traversal_id] = tc
+        return tc
+
+    def _cached_templates(self, traversal_id):
+        '''
+        Return the templates cached for a traversal.
+
+        If nothing is cached, an empty dict is returned, to be filled with the
+        templates that are loaded.
+        '''
+        tc = self._traversals.get(traversal_id)
+        if tc is None:
+            return {}
+        return tc.templates
+
+    def _send_queued_checks(self):
+        '''
+        Send the resource checks queued while processing a resource.
+
+        If the checks are configured to linger, so that they can be batched
+        with those triggered by other resources, they are left for the RPC
+        client to send later.
+        '''
+        if cfg.CONF.convergence_check_batch_linger <= 0:
+            self._rpc_client.flush()
+
     def _try_steal_engine_lock(self, cnxt, resource_id):
         rs_obj = resource_objects.Resource.get_obj(cnxt,
                                                    resource_id)
@@ -142,19 +220,23 @@ class WorkerService(service.Service):
             cache_data = {in_data.get(
                 'name'): in_data for in_data in data.values()
                 if in_data is not None}
-            rsrc, stack = resource.Resource.load(cnxt, resource_id, cache_data)
+            templates = self._cached_templates(current_traversal)
+            rsrc, stack = resource.Resource.load(cnxt, resource_id,
+                                                 cache_data,
+                                                 templates=templates)
         except (exception.ResourceNotFound, exception.NotFound):
             return
         tmpl = stack.t
 
         if current_traversal != rsrc.stack.current_traversal:
             LOG.debug('[%s] Traversal cancelled; stopping.', current_traversal)
+            self._traversals.pop(current_traversal, None)
             return
 
-        current_deps = ([tuple(i), (tuple(j) if j is not None else None)]
-                        for i, j in rsrc.stack.current_deps['edges'])
-        deps = dependencies.Dependencies(edges=current_deps)
-        graph = deps.graph()
+        traversal = self._traversal_context(stack, current_traversal)
+        traversal.templates.update(templates)
+        deps = traversal.deps
+        graph = traversal.graph
 
         if is_update:
             if (rsrc.replaced_by is not None and
@@ -212,11 +294,16 @@ class WorkerService(service.Service):
             graph_key = (rsrc.replaces, is_update)
 
         try:
-            for req, fwd in deps.required_by(graph_key):
-                propagate_check_resource(
-                    cnxt, self._rpc_client, req, current_traversal,
-                    set(graph[(req, fwd)]), graph_key,
-                    input_data if fwd else None, fwd)
+            try:
+                for req, fwd in deps.required_by(graph_key):
+                    propagate_check_resource(
+                        cnxt, self._rpc_client, req, current_traversal,
+                        set(graph[(req, fwd)]), graph_key,
+                        input_data if fwd else None, fwd, stack.id)
+            finally:
+                # Checks already queued must still be sent if propagating to
+                # a later node fails, or they would never be sent at all
+                self._send_queued_checks()
 
             check_stack_complete(cnxt, rsrc.stack, current_traversal,
                                  rsrc.id, deps, is_update)
@@ -232,9 +319,7 @@ class WorkerService(service.Service):
                 return
 
             current_traversal = stack.current_traversal
-            current_deps = ([tuple(i), (tuple(j) if j is not None else None)]
-                            for i, j in stack.current_deps['edges'])
-            deps = dependencies.Dependencies(edges=current_deps)
+            deps = load_dependencies(stack.current_deps)
             key = sync_point.make_key(resource_id, current_traversal,
                                       is_update)
             predecessors = deps.graph()[key]
@@ -249,12 +334,29 @@ class WorkerService(service.Service):
             except sync_point.sync_points.NotFound:
                 pass
 
+    @context.request_context
+    def check_resources(self, cnxt, stack_id, current_traversal, resources):
+        '''
+        Process a batch of nodes in the dependency graph of a stack.
+
+        The resources are given as (resource_id, is_update, data) tuples, and
+        each is checked in its own thread.
+        '''
+        for resource_id, is_update, data in resources:
+            self.thread_group_mgr.start(stack_id, self.check_resource,
+                                        cnxt, resource_id, current_traversal,
+                                        data, is_update)
+
+
+def load_dependencies(current_deps):
+    '''Return a Dependencies object from a stack's stored edge list.'''
+    edges = ([tuple(i), (tuple(j) if j is not None else None)]
+             for i, j in current_deps['edges'])
+    return dependencies.Dependencies(edges=edges)
+
 
 def construct_input_data(rsrc):
-    attributes = rsrc.stack.get_dep_attrs(
-        six.itervalues(rsrc.stack.resources),
-        rsrc.stack.outputs,
-        rsrc.name)
+    attributes = rsrc.stack.t.dep_attrs(rsrc.stack, rsrc.name)
     resolved_attributes = {attr: rsrc.FnGetAtt(attr) for attr in attributes}
     input_data = {'id': rsrc.id,
                   'name': rsrc.name,
@@ -286,13 +388,16 @@ def check_stack_complete(cnxt, stack, current_traversal, sender_id, deps,
 
 def propagate_check_resource(cnxt, rpc_client, next_res_id,
                              current_traversal, predecessors, sender_key,
-                             sender_data, is_update):
+                             sender_data, is_update, stack_id):
     '''
     Trigger processing of a node if all of its dependencies are satisfied.
+
+    The check is queued with the RPC client, to be sent in a batch with any
+    others that become ready at around the same time.
     '''
     def do_check(entity_id, data):
-        rpc_client.check_resource(cnxt, entity_id, current_traversal,
-                                  data, is_update)
+        rpc_client.queue_check_resource(cnxt, stack_id, current_traversal,
+                                        entity_id, data, is_update)
 
     sync_point.sync(cnxt, next_res_id, current_traversal,
                     is_update, do_check, predecessors,
@@ -74,7 +74,15 @@ class Event(base.VersionedObject, base.VersionedObjectDictCompat):
     def count_all_by_stack(cls, context, stack_id):
         return db_api.event_count_all_by_stack(context, stack_id)
 
+    @classmethod
+    def delete_oldest_by_stack(cls, context, stack_id, limit):
+        return db_api.event_delete_oldest_by_stack(context, stack_id, limit)
+
     @classmethod
     def create(cls, context, values):
         return cls._from_db_object(context, cls(),
                                    db_api.event_create(context, values))
+
+    @classmethod
+    def create_batch(cls, context, values_list):
+        db_api.event_create_batch(context, values_list)
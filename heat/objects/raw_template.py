@@ -40,6 +40,7 @@ class RawTemplate(
         'files': heat_fields.JsonField(nullable=True),
         'template': heat_fields.JsonField(),
         'environment': heat_fields.JsonField(),
+        'updated_at': fields.DateTimeField(nullable=True),
     }
 
     @staticmethod
@@ -118,6 +118,16 @@ class Resource(
         return cls._from_db_object(cls(context), context,
                                    db_api.resource_create(context, values))
 
+    @classmethod
+    def create_batch(cls, context, values_list):
+        return [cls._from_db_object(cls(context), context, resource_db)
+                for resource_db in db_api.resource_create_batch(context,
+                                                                values_list)]
+
+    @classmethod
+    def update_batch(cls, context, values_by_id):
+        db_api.resource_update_batch(context, values_by_id)
+
     @classmethod
     def delete(cls, context, resource_id):
         resource_db = db_api.resource_get(context, resource_id)
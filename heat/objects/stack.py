@@ -17,9 +17,13 @@
 Stack object
 """
 
+from oslo_config import cfg
+from oslo_serialization import jsonutils
+from oslo_utils import encodeutils
 from oslo_versionedobjects import base
 from oslo_versionedobjects import fields
 
+from heat.common import crypt
 from heat.common import exception
 from heat.common.i18n import _
 from heat.db import api as db_api
@@ -27,6 +31,8 @@ from heat.objects import fields as heat_fields
 from heat.objects import raw_template
 from heat.objects import stack_tag
 
+cfg.CONF.import_opt('encrypt_parameters_and_properties', 'heat.common.config')
+
 
 class Stack(
     base.VersionedObject,
@@ -43,6 +49,7 @@ class Stack(
         'disable_rollback': fields.BooleanField(),
         'nested_depth': fields.IntegerField(),
         'owner_id': fields.StringField(nullable=True),
+        'root_stack_id': fields.StringField(nullable=True),
         'stack_user_project_id': fields.StringField(nullable=True),
         'tenant': fields.StringField(nullable=True),
         'timeout': fields.IntegerField(nullable=True),
@@ -56,6 +63,8 @@ class Stack(
         'convergence': fields.BooleanField(),
         'current_traversal': fields.StringField(),
         'current_deps': heat_fields.JsonField(),
+        'outputs': heat_fields.JsonField(nullable=True),
+        'outputs_encrypted': fields.BooleanField(default=False),
         'prev_raw_template_id': fields.IntegerField(),
         'prev_raw_template': fields.ObjectField('RawTemplate'),
         'tags': fields.ObjectField('StackTagList'),
@@ -77,10 +86,30 @@ class Stack(
                     stack['tags'] = None
             else:
                 stack[field] = db_stack.__dict__.get(field)
+
+        if stack.outputs_encrypted and stack.outputs:
+            outputs = {}
+            for key, output in stack.outputs.items():
+                decrypt_function = getattr(crypt, output[0], None)
+                decrypted_value = decrypt_function(output[1])
+                outputs[key] = jsonutils.loads(decrypted_value)
+            stack.outputs = outputs
+
         stack._context = context
         stack.obj_reset_changes()
         return stack
 
+    @staticmethod
+    def encrypt_outputs(outputs):
+        if cfg.CONF.encrypt_parameters_and_properties and outputs:
+            result = {}
+            for key, output in outputs.items():
+                output_string = jsonutils.dumps(output)
+                encoded_value = encodeutils.safe_encode(output_string)
+                result[key] = crypt.encrypt(encoded_value)
+            return (True, result)
+        return (False, outputs)
+
     @classmethod
     def get_root_id(cls, context, stack_id):
         return db_api.stack_get_root_id(context, stack_id)
@@ -93,6 +122,16 @@ class Stack(
         stack = cls._from_db_object(context, cls(context), db_stack)
         return stack
 
+    @classmethod
+    def get_status(cls, context, stack_id, show_deleted=False):
+        """Return (action, status, status_reason, updated_at) for a stack.
+
+        Only the state columns are loaded, so this is much cheaper than
+        loading the whole stack.
+        """
+        return db_api.stack_get_status(context, stack_id,
+                                       show_deleted=show_deleted)
+
     @classmethod
     def get_by_name_and_owner_id(cls, context, stack_name, owner_id):
         db_stack = db_api.stack_get_by_name_and_owner_id(
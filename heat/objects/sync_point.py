@@ -66,6 +66,10 @@ class SyncPoint(base.VersionedObject,
         sync_point_db = db_api.sync_point_create(context, values)
         return cls._from_db_object(context, cls(), sync_point_db)
 
+    @classmethod
+    def create_batch(cls, context, values_list):
+        return db_api.sync_point_create_batch(context, values_list)
+
     @classmethod
     def update_input_data(cls,
                           context,
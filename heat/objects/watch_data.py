@@ -64,3 +64,8 @@ class WatchData(base.VersionedObject, base.VersionedObjectDictCompat):
         return (cls._from_db_object(context, cls(), db_data)
                 for db_data in db_api.watch_data_get_all_by_watch_rule_id(
                     context, watch_rule_id))
+
+    @classmethod
+    def delete_older_than(cls, context, watch_rule_id, cutoff):
+        return db_api.watch_data_delete_older_than(context, watch_rule_id,
+                                                   cutoff)
@@ -70,6 +70,11 @@ class WatchRule(base.VersionedObject, base.VersionedObjectDictCompat):
         return [cls._from_db_object(context, cls(), db_rule)
                 for db_rule in db_api.watch_rule_get_all(context)]
 
+    @classmethod
+    def get_all_due(cls, context, now):
+        return [cls._from_db_object(context, cls(), db_rule)
+                for db_rule in db_api.watch_rule_get_all_due(context, now)]
+
     @classmethod
     def get_all_by_stack(cls, context, stack_id):
         return [cls._from_db_object(context, cls(), db_rule)
@@ -31,6 +31,8 @@ class EngineClient(object):
         1.4 - Add support for service list
         1.9 - Add template_type option to generate_template()
         1.10 - Add support for software config list
+        1.11 - Add resource_metadata()
+        1.12 - Add live_outputs option to show_stack()
     '''
 
     BASE_RPC_API_VERSION = '1.0'
@@ -168,15 +170,19 @@ class EngineClient(object):
                                              not_tags_any=not_tags_any),
                          version='1.8')
 
-    def show_stack(self, ctxt, stack_identity):
+    def show_stack(self, ctxt, stack_identity, live_outputs=False):
         """
         Return detailed information about one or all stacks.
         :param ctxt: RPC context.
         :param stack_identity: Name of the stack you want to show, or None to
         show all
+        :param live_outputs: Resolve the stack outputs again, rather than
+        returning the values stored when the last stack action finished
         """
         return self.call(ctxt, self.make_msg('show_stack',
-                                             stack_identity=stack_identity))
+                                             stack_identity=stack_identity,
+                                             live_outputs=live_outputs),
+                         version='1.12')
 
     def preview_stack(self, ctxt, stack_name, template, params, files, args):
         """
@@ -400,6 +406,18 @@ class EngineClient(object):
                              'find_physical_resource',
                              physical_resource_id=physical_resource_id))
 
+    def resource_metadata(self, ctxt, stack_identity, resource_name):
+        """
+        Get the metadata of a particular resource.
+        :param ctxt: RPC context.
+        :param stack_identity: Name of the stack.
+        :param resource_name: the Resource.
+        """
+        return self.call(ctxt, self.make_msg('resource_metadata',
+                                             stack_identity=stack_identity,
+                                             resource_name=resource_name),
+                         version='1.11')
+
     def describe_stack_resources(self, ctxt, stack_identity, resource_name):
         """
         Get detailed resource information about one or more resources.
@@ -48,3 +48,7 @@ class EngineListenerClient(object):
             return self._client.call(ctxt, 'listening')
         except messaging.MessagingTimeout:
             return False
+
+    def notify_state_change(self, ctxt, stack_id):
+        '''Tell the engine that the state of a stack has changed.'''
+        self._client.cast(ctxt, 'state_changed', stack_id=stack_id)
@@ -17,6 +17,11 @@
 Client side of the heat worker RPC API.
 """
 
+import collections
+
+import eventlet
+from oslo_config import cfg
+
 from heat.common import messaging
 from heat.rpc import worker_api
 
@@ -28,6 +33,7 @@ class WorkerClient(object):
 
         1.0 - Initial version.
         1.1 - Added check_resource.
+        1.2 - Added check_resources.
     '''
 
     BASE_RPC_API_VERSION = '1.0'
@@ -36,6 +42,8 @@ class WorkerClient(object):
         self._client = messaging.get_rpc_client(
             topic=worker_api.TOPIC,
             version=self.BASE_RPC_API_VERSION)
+        self._queued = collections.OrderedDict()
+        self._flush_timer = None
 
     @staticmethod
     def make_msg(method, **kwargs):
@@ -55,3 +63,59 @@ class WorkerClient(object):
             'check_resource', resource_id=resource_id,
             current_traversal=current_traversal, data=data,
             is_update=is_update))
+
+    def check_resources(self, ctxt, stack_id, current_traversal, resources):
+        '''
+        Trigger checks of a number of resources in a traversal of a stack.
+
+        The resources are given as (resource_id, is_update, data) tuples, and
+        are sent in batches of up to convergence_check_batch_size.
+        '''
+        batch_size = max(cfg.CONF.convergence_check_batch_size, 1)
+        resources = list(resources)
+        for start in range(0, len(resources), batch_size):
+            batch = resources[start:start + batch_size]
+            if len(batch) == 1:
+                resource_id, is_update, data = batch[0]
+                self.check_resource(ctxt, resource_id, current_traversal,
+                                    data, is_update)
+            else:
+                self.cast(ctxt, self.make_msg(
+                    'check_resources', stack_id=stack_id,
+                    current_traversal=current_traversal, resources=batch),
+                    version='1.2')
+
+    def queue_check_resource(self, ctxt, stack_id, current_traversal,
+                             resource_id, data, is_update):
+        '''
+        Queue a check of a resource to be sent in a batch with others.
+
+        Queued checks are sent when flush() is called, when a full batch has
+        been queued, or after convergence_check_batch_linger seconds,
+        whichever is soonest.
+        '''
+        key = (stack_id, current_traversal)
+        if key not in self._queued:
+            self._queued[key] = (ctxt, [])
+        resources = self._queued[key][1]
+        resources.append((resource_id, is_update, data))
+
+        linger = cfg.CONF.convergence_check_batch_linger
+        if len(resources) >= cfg.CONF.convergence_check_batch_size:
+            del self._queued[key]
+            self.check_resources(ctxt, stack_id, current_traversal,
+                                 resources)
+        elif linger > 0 and self._flush_timer is None:
+            self._flush_timer = eventlet.spawn_after(linger,
+                                                     self._flush_on_timer)
+
+    def _flush_on_timer(self):
+        self._flush_timer = None
+        self.flush()
+
+    def flush(self):
+        '''Send any checks that have been queued.'''
+        while self._queued:
+            (stack_id, traversal), (ctxt, resources) = self._queued.popitem(
+                last=False)
+            self.check_resources(ctxt, stack_id, traversal, resources)
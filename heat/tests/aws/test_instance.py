@@ -1230,6 +1230,7 @@ class InstancesTest(common.HeatTestCase):
     def _test_security_groups(self, instance, security_groups, sg='one',
                               all_uuids=False, get_secgroup_raises=None):
         fake_groups_list, props = self._get_fake_properties(sg)
+        instance.client_plugin('neutron').invalidate_lookups()
 
         nclient = neutronclient.Client()
         self.m.StubOutWithMock(instance, 'neutron')
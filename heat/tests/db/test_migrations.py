@@ -617,6 +617,80 @@ class HeatMigrationsCheckers(test_migrations.WalkVersionsMixin,
         self.assertColumnNotExists(engine, 'raw_template',
                                    'predecessor')
 
+    def _pre_upgrade_065(self, engine):
+        raw_template = utils.get_table(engine, 'raw_template')
+        templ = dict(id=300, template='{}', files='{}')
+        engine.execute(raw_template.insert(), [templ])
+
+        user_creds = utils.get_table(engine, 'user_creds')
+        user = dict(id=9, username='steve', password='notthis',
+                    tenant='mine', auth_url='bla',
+                    tenant_id=str(uuid.uuid4()),
+                    trust_id='',
+                    trustor_user_id='')
+        engine.execute(user_creds.insert(), [user])
+
+        stack = utils.get_table(engine, 'stack')
+        stack_ids = ['265aaefb-152e-505d-b13a-35d4c816390c',
+                     '2e9deba9-a303-5f29-84d3-c8165647c47e',
+                     '2e9deba9-a304-5f29-84d3-c8165647c47e',
+                     '2e9deba9-a305-5f29-84d3-c8165647c47e']
+        data = [dict(id=sid, name='s%d' % i,
+                     raw_template_id=templ['id'],
+                     user_creds_id=user['id'],
+                     owner_id=None,
+                     username='steve', disable_rollback=True)
+                for i, sid in enumerate(stack_ids)]
+        # Make a nested tree s0->s1->s2 and s0->s3
+        data[1]['owner_id'] = stack_ids[0]
+        data[2]['owner_id'] = stack_ids[1]
+        data[3]['owner_id'] = stack_ids[0]
+        engine.execute(stack.insert(), data)
+        return data
+
+    def _check_065(self, engine, data):
+        self.assertColumnExists(engine, 'stack', 'root_stack_id')
+        self.assertIndexExists(engine, 'stack', 'ix_stack_root_stack_id')
+        stack_table = utils.get_table(engine, 'stack')
+        roots = dict((s.id, s.root_stack_id)
+                     for s in stack_table.select().execute())
+
+        self.assertIsNone(roots[data[0]['id']])
+        for nested in data[1:]:
+            self.assertEqual(data[0]['id'], roots[nested['id']])
+
+    def _pre_upgrade_066(self, engine):
+        raw_template = utils.get_table(engine, 'raw_template')
+        tmpl = '{"heat_template_version": "2013-05-23"}'
+        data = [dict(id=400, template=tmpl, files='{}'),
+                dict(id=401, template=tmpl, files=None),
+                dict(id=402, template=tmpl, files='{"foo": "bar"}')]
+        engine.execute(raw_template.insert(), data)
+        return data
+
+    def _check_066(self, engine, data):
+        self.assertColumnNotExists(engine, 'raw_template', 'template')
+        self.assertColumnNotExists(engine, 'raw_template', 'files')
+        self.assertColumnExists(engine, 'raw_template', 'blob_id')
+        self.assertColumnExists(engine, 'raw_template_blob', 'digest')
+
+        raw_template = utils.get_table(engine, 'raw_template')
+        blob_ids = dict((t.id, t.blob_id)
+                        for t in raw_template.select().execute())
+        self.assertEqual(blob_ids[400], blob_ids[401])
+        self.assertNotEqual(blob_ids[400], blob_ids[402])
+
+        blob = utils.get_table(engine, 'raw_template_blob')
+        contents = dict((b.id, (b.template, b.files))
+                        for b in blob.select().execute())
+        self.assertEqual(('{"heat_template_version": "2013-05-23"}', '{}'),
+                         contents[blob_ids[400]])
+        self.assertEqual('{"foo": "bar"}', contents[blob_ids[402]][1])
+
+    def _check_067(self, engine, data):
+        self.assertColumnExists(engine, 'stack', 'outputs')
+        self.assertColumnExists(engine, 'stack', 'outputs_encrypted')
+
 
 class TestHeatMigrationsMySQL(HeatMigrationsCheckers,
                               test_base.MySQLOpportunisticTestCase):
@@ -399,6 +399,23 @@ class SqlAlchemyTest(common.HeatTestCase):
         st = db_api.stack_get(self.ctx, UUID1, show_deleted=True)
         self.assertEqual(UUID1, st.id)
 
+    def test_stack_get_status(self):
+        stack = self._setup_test_stack('stack', UUID1)[1]
+
+        st = db_api.stack_get_status(self.ctx, UUID1)
+        self.assertEqual((stack.action, stack.status, stack.status_reason,
+                          stack.updated_time), st)
+
+        stack.delete()
+        self.assertRaises(exception.NotFound,
+                          db_api.stack_get_status, self.ctx, UUID1)
+
+        st = db_api.stack_get_status(self.ctx, UUID1, show_deleted=True)
+        self.assertEqual(('DELETE', 'COMPLETE'), st[:2])
+
+        self.assertRaises(exception.NotFound,
+                          db_api.stack_get_status, self.ctx, UUID2)
+
     def test_stack_get_show_deleted_context(self):
         stack = self._setup_test_stack('stack', UUID1)[1]
 
@@ -1489,6 +1506,25 @@ class DBAPIRawTemplateTest(common.HeatTestCase):
         self.assertRaises(exception.NotFound, db_api.raw_template_get,
                           self.ctx, tp.id)
 
+    def test_raw_template_contents_shared(self):
+        tp1 = create_raw_template(self.ctx, environment={'parameters': {}})
+        tp2 = create_raw_template(self.ctx,
+                                  environment={'parameters': {'a': 'b'}})
+        self.assertNotEqual(tp1.id, tp2.id)
+        self.assertEqual(tp1.blob_id, tp2.blob_id)
+        self.assertEqual({'parameters': {'a': 'b'}},
+                         db_api.raw_template_get(self.ctx,
+                                                 tp2.id).environment)
+
+        new_files = {'foo': 'baz'}
+        db_api.raw_template_update(self.ctx, tp2.id, {'files': new_files})
+        updated = db_api.raw_template_get(self.ctx, tp2.id)
+        self.assertNotEqual(tp1.blob_id, updated.blob_id)
+        self.assertEqual(new_files, updated.files)
+        self.assertEqual(tp1.template, updated.template)
+        self.assertEqual({'foo': 'bar'},
+                         db_api.raw_template_get(self.ctx, tp1.id).files)
+
 
 class DBAPIUserCredsTest(common.HeatTestCase):
     def setUp(self):
@@ -1811,6 +1847,22 @@ class DBAPIStackTest(common.HeatTestCase):
         self._deleted_stack_existance(utils.dummy_context(), stacks,
                                       (), (0, 1, 2, 3, 4))
 
+    def test_purge_deleted_template_contents(self):
+        tp_unused = create_raw_template(self.ctx, template={'unused': 1})
+        tp_used = create_raw_template(self.ctx)
+        db_api.raw_template_delete(self.ctx, tp_unused.id)
+        session = db_api.get_session()
+        blobs = session.query(models.RawTemplateBlob)
+        self.assertEqual(2, blobs.count())
+
+        db_api.purge_deleted(age=1, granularity='days')
+        self.assertEqual(2, blobs.count())
+
+        old = datetime.datetime.now() - datetime.timedelta(days=2)
+        blobs.update({'created_at': old})
+        db_api.purge_deleted(age=1, granularity='days')
+        self.assertEqual([tp_used.blob_id], [b.id for b in blobs.all()])
+
     def _deleted_stack_existance(self, ctx, stacks, existing, deleted):
         for s in existing:
             self.assertIsNotNone(db_api.stack_get(ctx, stacks[s].id,
@@ -1838,6 +1890,45 @@ class DBAPIStackTest(common.HeatTestCase):
         self.assertEqual(root.id, db_api.stack_get_root_id(
             self.ctx, child_1.id))
 
+    def test_stack_create_sets_root_stack_id(self):
+        root = create_stack(self.ctx, self.template, self.user_creds,
+                            name='root stack')
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             name='child stack', owner_id=root.id)
+        grandchild = create_stack(self.ctx, self.template, self.user_creds,
+                                  name='grandchild stack', owner_id=child.id)
+
+        self.assertIsNone(root.root_stack_id)
+        self.assertEqual(root.id, child.root_stack_id)
+        self.assertEqual(root.id, grandchild.root_stack_id)
+
+    def test_stack_get_root_id_not_persisted(self):
+        root = create_stack(self.ctx, self.template, self.user_creds,
+                            name='root stack')
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             name='child stack', owner_id=root.id)
+        grandchild = create_stack(self.ctx, self.template, self.user_creds,
+                                  name='grandchild stack', owner_id=child.id)
+        db_api.stack_update(self.ctx, grandchild.id, {'root_stack_id': None})
+
+        self.assertEqual(root.id, db_api.stack_get_root_id(
+            self.ctx, grandchild.id))
+
+    def test_stack_count_total_resources_excludes_deleted(self):
+        root = create_stack(self.ctx, self.template, self.user_creds,
+                            name='root stack')
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             name='child stack', owner_id=root.id)
+        create_resource(self.ctx, root, name='root-0')
+        create_resource(self.ctx, child, name='child-0')
+        self.assertEqual(2, db_api.stack_count_total_resources(self.ctx,
+                                                               root.id))
+
+        db_api.stack_update(self.ctx, child.id,
+                            {'deleted_at': timeutils.utcnow()})
+        self.assertEqual(1, db_api.stack_count_total_resources(self.ctx,
+                                                               root.id))
+
     def test_stack_count_total_resources(self):
 
         def add_resources(stack, count):
@@ -1933,6 +2024,33 @@ class DBAPIResourceTest(common.HeatTestCase):
         self.assertEqual('{"foo": "123"}', json.dumps(ret_res.rsrc_metadata))
         self.assertEqual(self.stack.id, ret_res.stack_id)
 
+    def test_resource_create_batch(self):
+        values = [{'name': 'res%d' % i, 'stack_id': self.stack.id,
+                   'action': 'init', 'status': 'complete'}
+                  for i in range(3)]
+        resources = db_api.resource_create_batch(self.ctx, values)
+
+        self.assertEqual(['res0', 'res1', 'res2'],
+                         [r.name for r in resources])
+        self.assertEqual(sorted(r.id for r in resources),
+                         [r.id for r in resources])
+        for res in resources:
+            ret_res = db_api.resource_get(self.ctx, res.id)
+            self.assertEqual(res.name, ret_res.name)
+            self.assertIsNotNone(ret_res.uuid)
+
+    def test_resource_update_batch(self):
+        res1 = create_resource(self.ctx, self.stack, name='res1')
+        res2 = create_resource(self.ctx, self.stack, name='res2')
+
+        db_api.resource_update_batch(self.ctx,
+                                     {res1.id: {'needed_by': [res2.id]},
+                                      res2.id: {'needed_by': []}})
+
+        self.assertEqual([res2.id],
+                         db_api.resource_get(self.ctx, res1.id).needed_by)
+        self.assertEqual([], db_api.resource_get(self.ctx, res2.id).needed_by)
+
     def test_resource_get(self):
         res = create_resource(self.ctx, self.stack)
         ret_res = db_api.resource_get(self.ctx, res.id)
@@ -2232,6 +2350,53 @@ class DBAPIEventTest(common.HeatTestCase):
         self.assertEqual(1, db_api.event_count_all_by_stack(self.ctx,
                                                             self.stack2.id))
 
+    def test_event_delete_oldest_by_stack(self):
+        self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
+        self.stack2 = create_stack(self.ctx, self.template, self.user_creds)
+        for i in range(3):
+            create_event(self.ctx, stack_id=self.stack1.id,
+                         resource_name='res%d' % i)
+        create_event(self.ctx, stack_id=self.stack2.id)
+
+        self.assertEqual(2, db_api.event_delete_oldest_by_stack(
+            self.ctx, self.stack1.id, 2))
+
+        events = db_api.event_get_all_by_stack(self.ctx, self.stack1.id)
+        self.assertEqual(['res2'], [e.resource_name for e in events])
+        self.assertEqual(1, db_api.event_count_all_by_stack(self.ctx,
+                                                            self.stack2.id))
+
+    def test_event_create_batch(self):
+        self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
+        values = [
+            {'stack_id': self.stack1.id, 'resource_name': 'res1',
+             'resource_status_reason': 'x' * 300,
+             'resource_properties': {'name': 'foo'}},
+            {'stack_id': self.stack1.id, 'resource_name': 'res2',
+             'uuid': UUID2},
+        ]
+        db_api.event_create_batch(self.ctx, values)
+
+        events = sorted(db_api.event_get_all_by_stack(self.ctx,
+                                                      self.stack1.id),
+                        key=lambda e: e.id)
+        self.assertEqual(['res1', 'res2'], [e.resource_name for e in events])
+        self.assertEqual('x' * 255, events[0].resource_status_reason)
+        self.assertEqual({'name': 'foo'}, events[0].resource_properties)
+        self.assertIsNotNone(events[0].uuid)
+        self.assertIsNotNone(events[0].created_at)
+        self.assertEqual('', events[1].resource_status_reason)
+        self.assertEqual(UUID2, events[1].uuid)
+
+    def test_event_create_does_not_prune(self):
+        cfg.CONF.set_override('max_events_per_stack', 1)
+        self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
+        create_event(self.ctx, stack_id=self.stack1.id)
+        create_event(self.ctx, stack_id=self.stack1.id)
+
+        self.assertEqual(2, db_api.event_count_all_by_stack(self.ctx,
+                                                            self.stack1.id))
+
 
 class DBAPIWatchRuleTest(common.HeatTestCase):
     def setUp(self):
@@ -2285,6 +2450,25 @@ class DBAPIWatchRuleTest(common.HeatTestCase):
         wrs = db_api.watch_rule_get_all_by_stack(self.ctx, self.stack1.id)
         self.assertEqual(2, len(wrs))
 
+    def test_watch_rule_get_all_due(self):
+        now = timeutils.utcnow()
+        recent = now - datetime.timedelta(seconds=100)
+        old = now - datetime.timedelta(seconds=400)
+        values = [
+            {'name': 'due', 'last_evaluated': old},
+            {'name': 'not_due', 'last_evaluated': recent},
+            {'name': 'suspended', 'last_evaluated': old,
+             'state': 'SUSPENDED'},
+            {'name': 'ceilometer', 'last_evaluated': old,
+             'state': 'CEILOMETER_CONTROLLED'},
+        ]
+        for val in values:
+            create_watch_rule(self.ctx, self.stack, rule={'Period': '300'},
+                              **val)
+
+        wrs = db_api.watch_rule_get_all_due(self.ctx, now)
+        self.assertEqual(['due'], [wr.name for wr in wrs])
+
     def test_watch_rule_update(self):
         watch_rule = create_watch_rule(self.ctx, self.stack)
         values = {
@@ -2343,6 +2527,26 @@ class DBAPIWatchDataTest(common.HeatTestCase):
         data = [wd.data for wd in watch_data]
         [self.assertIn(val['data'], data) for val in values]
 
+    def test_watch_data_delete_older_than(self):
+        now = timeutils.utcnow()
+        other_rule = create_watch_rule(self.ctx, self.stack,
+                                       name='other_rule')
+        old = now - datetime.timedelta(seconds=600)
+        create_watch_data(self.ctx, self.watch_rule, created_at=old)
+        create_watch_data(self.ctx, self.watch_rule,
+                          data={'foo': 'new'}, created_at=now)
+        create_watch_data(self.ctx, other_rule, created_at=old)
+
+        cutoff = now - datetime.timedelta(seconds=300)
+        self.assertEqual(1, db_api.watch_data_delete_older_than(
+            self.ctx, self.watch_rule.id, cutoff))
+
+        watch_data = db_api.watch_data_get_all_by_watch_rule_id(
+            self.ctx, self.watch_rule.id)
+        self.assertEqual([{'foo': 'new'}], [wd.data for wd in watch_data])
+        self.assertEqual(1, len(db_api.watch_data_get_all_by_watch_rule_id(
+            self.ctx, other_rule.id)))
+
 
 class DBAPIServiceTest(common.HeatTestCase):
     def setUp(self):
@@ -2595,6 +2799,22 @@ class DBAPISyncPointTest(common.HeatTestCase):
         self.assertEqual(sync_point_stack.input_data,
                          ret_sync_point_stack.input_data)
 
+    def test_sync_point_create_batch(self):
+        values = [{'entity_id': res.id, 'stack_id': self.stack.id,
+                   'traversal_id': self.stack.current_traversal,
+                   'is_update': True, 'atomic_key': 0, 'input_data': {}}
+                  for res in self.resources]
+        keys = db_api.sync_point_create_batch(self.ctx, values)
+
+        self.assertEqual([(str(res.id), self.stack.current_traversal, True)
+                          for res in self.resources], keys)
+        for key in keys:
+            ret_sync_point = db_api.sync_point_get(self.ctx, *key)
+            self.assertIsNotNone(ret_sync_point)
+            self.assertEqual(0, ret_sync_point.atomic_key)
+            self.assertEqual({}, ret_sync_point.input_data)
+            self.assertIsNotNone(ret_sync_point.created_at)
+
     def test_sync_point_update(self):
         sync_point = create_sync_point(
             self.ctx, entity_id=str(self.resources[0].id),
@@ -281,6 +281,31 @@ class KeystoneClientPluginRoleTest(common.HeatTestCase):
         self._client.client.roles.list.assert_called_once_with(
             name=self.sample_name)
 
+    @mock.patch.object(client.KeystoneClientPlugin, 'client')
+    def test_get_role_id_cached(self, client_keystone):
+        self._client.client.roles.get.side_effect = (keystone_exceptions
+                                                     .NotFound)
+        self._client.client.roles.list.return_value = [
+            self._get_mock_role()
+        ]
+
+        client_keystone.return_value = self._client
+        client_plugin = client.KeystoneClientPlugin(
+            context=mock.MagicMock()
+        )
+
+        self.assertEqual(self.sample_uuid,
+                         client_plugin.get_role_id(self.sample_name))
+        self.assertEqual(self.sample_uuid,
+                         client_plugin.get_role_id(self.sample_name))
+        self._client.client.roles.list.assert_called_once_with(
+            name=self.sample_name)
+
+        client_plugin.invalidate_lookups('role')
+        self.assertEqual(self.sample_uuid,
+                         client_plugin.get_role_id(self.sample_name))
+        self.assertEqual(2, self._client.client.roles.list.call_count)
+
     @mock.patch.object(client.KeystoneClientPlugin, 'client')
     def test_get_role_id_not_found(self, client_keystone):
         self._client.client.roles.get.side_effect = (keystone_exceptions
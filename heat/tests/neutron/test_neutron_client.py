@@ -47,6 +47,20 @@ class NeutronClientPluginTests(NeutronClientPluginTestCase):
         self.mock_find.assert_called_once_with(self.neutron_client, 'network',
                                                'test_network')
 
+    def test_find_neutron_resource_cached(self):
+        props = {'net': 'test_network'}
+
+        for i in range(2):
+            res = self.neutron_plugin.find_neutron_resource(props, 'net',
+                                                            'network')
+            self.assertEqual(42, res)
+        self.mock_find.assert_called_once_with(self.neutron_client, 'network',
+                                               'test_network')
+
+        self.neutron_plugin.invalidate_lookups('network')
+        self.neutron_plugin.find_neutron_resource(props, 'net', 'network')
+        self.assertEqual(2, self.mock_find.call_count)
+
     def test_resolve_network(self):
         props = {'net': 'test_network'}
 
@@ -123,6 +137,7 @@ class NeutronClientPluginTests(NeutronClientPluginTestCase):
             ]
         }
         self.neutron_client.list_security_groups.return_value = fake_list
+        self.neutron_plugin.invalidate_lookups()
         self.assertEqual(expected_groups,
                          self.neutron_plugin.get_secgroup_uuids(sgs_non_uuid))
         # test there are two securityGroups with same name, and the two
@@ -146,6 +161,7 @@ class NeutronClientPluginTests(NeutronClientPluginTestCase):
             ]
         }
         self.neutron_client.list_security_groups.return_value = fake_list
+        self.neutron_plugin.invalidate_lookups()
         self.assertRaises(exception.PhysicalResourceNameAmbiguity,
                           self.neutron_plugin.get_secgroup_uuids,
                           sgs_non_uuid)
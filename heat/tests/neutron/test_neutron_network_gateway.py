@@ -18,6 +18,7 @@ import mox
 from neutronclient.common import exceptions as qe
 from neutronclient.neutron import v2_0 as neutronV20
 from neutronclient.v2_0 import client as neutronclient
+from oslo_config import cfg
 import six
 
 from heat.common import exception
@@ -92,6 +93,8 @@ class NeutronNetworkGatewayTest(common.HeatTestCase):
                                'disconnect_network_gateway')
         self.m.StubOutWithMock(neutronclient.Client, 'list_networks')
         self.m.StubOutWithMock(neutronV20, 'find_resourceid_by_name_or_id')
+        # the expectations below count every network lookup
+        cfg.CONF.set_override('client_lookup_cache_ttl', 0)
 
     def mock_create_fail_network_not_found_delete_success(self):
         neutronclient.Client.create_network_gateway({
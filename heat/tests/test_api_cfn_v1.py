@@ -212,7 +212,9 @@ class CfnStackControllerTest(common.HeatTestCase):
 
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
-            dummy_req.context, ('show_stack', {'stack_identity': None})
+            dummy_req.context, ('show_stack', {'stack_identity': None,
+                                               'live_outputs': False}),
+            version='1.12'
         ).AndReturn(engine_resp)
 
         self.m.ReplayAll()
@@ -234,7 +236,9 @@ class CfnStackControllerTest(common.HeatTestCase):
 
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
-            dummy_req.context, ('show_stack', {'stack_identity': None})
+            dummy_req.context, ('show_stack', {'stack_identity': None,
+                                               'live_outputs': False}),
+            version='1.12'
         ).AndReturn(engine_resp)
 
         self.m.ReplayAll()
@@ -289,7 +293,9 @@ class CfnStackControllerTest(common.HeatTestCase):
         ).AndReturn(identity)
         rpc_client.EngineClient.call(
             dummy_req.context,
-            ('show_stack', {'stack_identity': identity})
+            ('show_stack', {'stack_identity': identity,
+                            'live_outputs': False}),
+            version='1.12'
         ).AndReturn(engine_resp)
 
         self.m.ReplayAll()
@@ -373,7 +379,9 @@ class CfnStackControllerTest(common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             dummy_req.context,
-            ('show_stack', {'stack_identity': identity})
+            ('show_stack', {'stack_identity': identity,
+                            'live_outputs': False}),
+            version='1.12'
         ).AndReturn(engine_resp)
 
         self.m.ReplayAll()
@@ -427,7 +435,9 @@ class CfnStackControllerTest(common.HeatTestCase):
 
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
-            dummy_req.context, ('show_stack', {'stack_identity': identity})
+            dummy_req.context, ('show_stack', {'stack_identity': identity,
+                                               'live_outputs': False}),
+            version='1.12'
         ).AndRaise(heat_exception.InvalidTenant(target='test',
                                                 actual='test'))
 
@@ -450,7 +460,9 @@ class CfnStackControllerTest(common.HeatTestCase):
             dummy_req.context, ('identify_stack', {'stack_name': stack_name})
         ).AndReturn(identity)
         rpc_client.EngineClient.call(
-            dummy_req.context, ('show_stack', {'stack_identity': identity})
+            dummy_req.context, ('show_stack', {'stack_identity': identity,
+                                               'live_outputs': False}),
+            version='1.12'
         ).AndRaise(AttributeError())
 
         self.m.ReplayAll()
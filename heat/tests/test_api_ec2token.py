@@ -16,6 +16,7 @@ import json
 
 from oslo_config import cfg
 from oslo_utils import importutils
+from oslo_utils import timeutils
 import requests
 import six
 
@@ -32,7 +33,7 @@ class Ec2TokenTest(common.HeatTestCase):
 
     def setUp(self):
         super(Ec2TokenTest, self).setUp()
-        self.m.StubOutWithMock(requests, 'post')
+        self.m.StubOutWithMock(requests.Session, 'post')
 
     def _dummy_GET_request(self, params=None, environ=None):
         # Mangle the params dict into a query string
@@ -235,8 +236,9 @@ class Ec2TokenTest(common.HeatTestCase):
                                  "path": "/v1",
                                  "body_hash": body_hash}})
         req_headers = {'Content-Type': 'application/json'}
-        requests.post(req_url, data=req_creds, verify=verify, cert=cert,
-                      headers=req_headers).AndReturn(DummyHTTPResponse())
+        requests.Session.post(
+            req_url, data=req_creds, verify=verify, cert=cert,
+            headers=req_headers).AndReturn(DummyHTTPResponse())
 
     def test_call_ok(self):
         dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
@@ -413,6 +415,103 @@ class Ec2TokenTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_call_ok_multicloud_last_success_first(self):
+        dummy_conf = {
+            'allowed_auth_uris': [
+                'http://123:5000/v2.0', 'http://456:5000/v2.0'],
+            'multi_cloud': True,
+            'cache_ttl': 0
+        }
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        params = {'AWSAccessKeyId': 'foo', 'Signature': 'xyz'}
+        req_env = {'SERVER_NAME': 'heat',
+                   'SERVER_PORT': '8000',
+                   'PATH_INFO': '/v1'}
+
+        ok_resp = json.dumps({'access': {'metadata': {}, 'token': {
+            'id': 123,
+            'tenant': {'name': 'tenant', 'id': 'abcd1234'}}}})
+        err_msg = "EC2 access key not found."
+        err_resp = json.dumps({'error': {'message': err_msg}})
+
+        # first request fails on the first endpoint
+        self._stub_http_connection(
+            req_url='http://123:5000/v2.0/ec2tokens',
+            response=err_resp,
+            params={'AWSAccessKeyId': 'foo'})
+        self._stub_http_connection(
+            req_url='http://456:5000/v2.0/ec2tokens',
+            response=ok_resp,
+            params={'AWSAccessKeyId': 'foo'})
+
+        # the next request tries the successful endpoint first
+        self._stub_http_connection(
+            req_url='http://456:5000/v2.0/ec2tokens',
+            response=ok_resp,
+            params={'AWSAccessKeyId': 'foo'})
+
+        self.m.ReplayAll()
+        self.assertEqual('woot',
+                         ec2.__call__(self._dummy_GET_request(params,
+                                                              dict(req_env))))
+        self.assertEqual('woot',
+                         ec2.__call__(self._dummy_GET_request(params,
+                                                              dict(req_env))))
+
+        self.m.VerifyAll()
+
+    def test_call_ok_cached(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        params = {'AWSAccessKeyId': 'foo', 'Signature': 'xyz'}
+        req_env = {'SERVER_NAME': 'heat',
+                   'SERVER_PORT': '8000',
+                   'PATH_INFO': '/v1'}
+
+        ok_resp = json.dumps({'access': {'metadata': {}, 'token': {
+            'id': 123,
+            'tenant': {'name': 'tenant', 'id': 'abcd1234'}}}})
+        # only the first of two identical requests goes to keystone
+        self._stub_http_connection(response=ok_resp,
+                                   params={'AWSAccessKeyId': 'foo'})
+        self.m.ReplayAll()
+
+        for i in range(2):
+            dummy_req = self._dummy_GET_request(params, dict(req_env))
+            self.assertEqual('woot', ec2.__call__(dummy_req))
+            self.assertEqual('abcd1234', dummy_req.headers['X-Tenant-Id'])
+
+        self.m.VerifyAll()
+
+    def test_call_cache_expired(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        params = {'AWSAccessKeyId': 'foo', 'Signature': 'xyz'}
+        req_env = {'SERVER_NAME': 'heat',
+                   'SERVER_PORT': '8000',
+                   'PATH_INFO': '/v1'}
+
+        ok_resp = json.dumps({'access': {'metadata': {}, 'token': {
+            'id': 123,
+            'tenant': {'name': 'tenant', 'id': 'abcd1234'}}}})
+        self._stub_http_connection(response=ok_resp,
+                                   params={'AWSAccessKeyId': 'foo'})
+        self._stub_http_connection(response=ok_resp,
+                                   params={'AWSAccessKeyId': 'foo'})
+        self.m.ReplayAll()
+
+        timeutils.set_time_override()
+        self.addCleanup(timeutils.clear_time_override)
+        self.assertEqual('woot',
+                         ec2.__call__(self._dummy_GET_request(params,
+                                                              dict(req_env))))
+        timeutils.advance_time_seconds(61)
+        self.assertEqual('woot',
+                         ec2.__call__(self._dummy_GET_request(params,
+                                                              dict(req_env))))
+
+        self.m.VerifyAll()
+
     def test_call_err_multicloud(self):
         dummy_conf = {
             'allowed_auth_uris': [
@@ -1351,7 +1351,9 @@ class StackControllerTest(ControllerTest, common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('show_stack', {'stack_identity': dict(identity)})
+            ('show_stack', {'stack_identity': dict(identity),
+                            'live_outputs': False}),
+            version='1.12'
         ).AndReturn(engine_resp)
         self.m.ReplayAll()
 
@@ -1392,7 +1394,9 @@ class StackControllerTest(ControllerTest, common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('show_stack', {'stack_identity': dict(identity)})
+            ('show_stack', {'stack_identity': dict(identity),
+                            'live_outputs': False}),
+            version='1.12'
         ).AndRaise(to_remote_error(error))
         self.m.ReplayAll()
 
@@ -1406,6 +1410,44 @@ class StackControllerTest(ControllerTest, common.HeatTestCase):
         self.assertEqual('StackNotFound', resp.json['error']['type'])
         self.m.VerifyAll()
 
+    def test_show_live_outputs(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'show', True)
+        identity = identifier.HeatIdentifier(self.tenant, 'wordpress', '6')
+        req = self._get('/stacks/%(stack_name)s/%(stack_id)s' % identity,
+                        params={'resolve_outputs': 'live'})
+        engine_resp = [{u'stack_identity': dict(identity),
+                        u'stack_name': identity.stack_name,
+                        u'stack_action': u'CREATE',
+                        u'stack_status': u'COMPLETE'}]
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call',
+                                     return_value=engine_resp)
+
+        self.controller.show(req, tenant_id=identity.tenant,
+                             stack_name=identity.stack_name,
+                             stack_id=identity.stack_id)
+
+        mock_call.assert_called_once_with(
+            req.context,
+            ('show_stack', {'stack_identity': dict(identity),
+                            'live_outputs': True}),
+            version='1.12')
+
+    def test_show_invalid_resolve_outputs(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'show', True)
+        identity = identifier.HeatIdentifier(self.tenant, 'wordpress', '6')
+        req = self._get('/stacks/%(stack_name)s/%(stack_id)s' % identity,
+                        params={'resolve_outputs': 'invalid'})
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call')
+
+        ex = self.assertRaises(webob.exc.HTTPBadRequest,
+                               self.controller.show,
+                               req, tenant_id=identity.tenant,
+                               stack_name=identity.stack_name,
+                               stack_id=identity.stack_id)
+        self.assertIn('Invalid value "invalid" for resolve_outputs, valid '
+                      'values are: stored, live.', six.text_type(ex))
+        self.assertFalse(mock_call.called)
+
     def test_show_invalidtenant(self, mock_enforce):
         identity = identifier.HeatIdentifier('wibble', 'wordpress', '6')
 
@@ -2172,6 +2214,32 @@ class StackSerializerTest(common.HeatTestCase):
         self.assertEqual('application/json', response.headers['Content-Type'])
 
 
+class ResourceSerializerTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(ResourceSerializerTest, self).setUp()
+        self.serializer = resources.ResourceSerializer()
+
+    def test_serialize_metadata(self):
+        result = {'metadata': {'ensureRunning': 'true'}}
+        response = webob.Response()
+        self.serializer.metadata(response, result)
+        self.assertEqual(result, json.loads(response.body))
+        self.assertIsNotNone(response.etag)
+
+    def test_serialize_metadata_not_modified(self):
+        result = {'metadata': {'ensureRunning': 'true'}}
+        response = webob.Response()
+        self.serializer.metadata(response, result)
+
+        req = webob.Request.blank('/metadata')
+        req.if_none_match = response.etag
+        self.assertEqual(304, req.get_response(response).status_int)
+
+        req.if_none_match = 'other'
+        self.assertEqual(200, req.get_response(response).status_int)
+
+
 @mock.patch.object(policy.Enforcer, 'enforce')
 class ResourceControllerTest(ControllerTest, common.HeatTestCase):
     '''
@@ -2603,33 +2671,16 @@ class ResourceControllerTest(ControllerTest, common.HeatTestCase):
         res_name = 'WikiDatabase'
         stack_identity = identifier.HeatIdentifier(self.tenant,
                                                    'wordpress', '6')
-        res_identity = identifier.ResourceIdentifier(resource_name=res_name,
-                                                     **stack_identity)
 
         req = self._get(stack_identity._tenant_path())
 
-        engine_resp = {
-            u'description': u'',
-            u'resource_identity': dict(res_identity),
-            u'stack_name': stack_identity.stack_name,
-            u'resource_name': res_name,
-            u'resource_status_reason': None,
-            u'updated_time': u'2012-07-23T13:06:00Z',
-            u'stack_identity': dict(stack_identity),
-            u'resource_action': u'CREATE',
-            u'resource_status': u'COMPLETE',
-            u'physical_resource_id':
-            u'a3455d8c-9f88-404d-a85b-5315293e67de',
-            u'resource_type': u'AWS::EC2::Instance',
-            u'metadata': {u'ensureRunning': u'true'}
-        }
+        engine_resp = {u'ensureRunning': u'true'}
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('describe_stack_resource',
-             {'stack_identity': stack_identity, 'resource_name': res_name,
-              'with_attr': None}),
-            version='1.2'
+            ('resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name}),
+            version='1.11'
         ).AndReturn(engine_resp)
         self.m.ReplayAll()
 
@@ -2657,10 +2708,9 @@ class ResourceControllerTest(ControllerTest, common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('describe_stack_resource',
-             {'stack_identity': stack_identity, 'resource_name': res_name,
-              'with_attr': None}),
-            version='1.2'
+            ('resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name}),
+            version='1.11'
         ).AndRaise(to_remote_error(error))
         self.m.ReplayAll()
 
@@ -2689,10 +2739,9 @@ class ResourceControllerTest(ControllerTest, common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('describe_stack_resource',
-             {'stack_identity': stack_identity, 'resource_name': res_name,
-              'with_attr': None}),
-            version='1.2'
+            ('resource_metadata',
+             {'stack_identity': stack_identity, 'resource_name': res_name}),
+            version='1.11'
         ).AndRaise(to_remote_error(error))
         self.m.ReplayAll()
 
@@ -23,6 +23,7 @@ from manilaclient import exceptions as manila_exc
 import mock
 from neutronclient.common import exceptions as neutron_exc
 from oslo_config import cfg
+from oslo_utils import timeutils
 from saharaclient.api import base as sahara_base
 import six
 from swiftclient import exceptions as swift_exc
@@ -317,6 +318,78 @@ class ClientPluginTest(common.HeatTestCase):
 
         self.assertRaises(TypeError, client_plugin.ClientPlugin, c)
 
+    def test_cached_lookup(self):
+        plugin = FooClientsPlugin(mock.Mock())
+        find = mock.Mock(return_value='1234')
+        hits = client_plugin.counters.get('hits.foo')
+        misses = client_plugin.counters.get('misses.foo')
+
+        self.assertEqual('1234', plugin._cached_lookup('foo', 'bar', find))
+        self.assertEqual('1234', plugin._cached_lookup('foo', 'bar', find))
+        find.assert_called_once_with('bar')
+        self.assertEqual(hits + 1, client_plugin.counters.get('hits.foo'))
+        self.assertEqual(misses + 1,
+                         client_plugin.counters.get('misses.foo'))
+
+    def test_cached_lookup_expired(self):
+        cfg.CONF.set_override('client_lookup_cache_ttl', 10)
+        timeutils.set_time_override()
+        self.addCleanup(timeutils.clear_time_override)
+        plugin = FooClientsPlugin(mock.Mock())
+        find = mock.Mock(side_effect=['1234', '5678'])
+
+        self.assertEqual('1234', plugin._cached_lookup('foo', 'bar', find))
+        timeutils.advance_time_seconds(5)
+        self.assertEqual('1234', plugin._cached_lookup('foo', 'bar', find))
+        timeutils.advance_time_seconds(10)
+        self.assertEqual('5678', plugin._cached_lookup('foo', 'bar', find))
+        self.assertEqual(2, find.call_count)
+
+    def test_cached_lookup_disabled(self):
+        cfg.CONF.set_override('client_lookup_cache_ttl', 0)
+        plugin = FooClientsPlugin(mock.Mock())
+        find = mock.Mock(return_value='1234')
+
+        plugin._cached_lookup('foo', 'bar', find)
+        plugin._cached_lookup('foo', 'bar', find)
+        self.assertEqual(2, find.call_count)
+
+    def test_cached_lookup_not_found(self):
+        plugin = FooClientsPlugin(mock.Mock())
+        find = mock.Mock(side_effect=[exception.EntityNotFound(
+            entity='Foo', name='bar'), '1234'])
+
+        self.assertRaises(exception.EntityNotFound,
+                          plugin._cached_lookup, 'foo', 'bar', find)
+        self.assertEqual('1234', plugin._cached_lookup('foo', 'bar', find))
+        self.assertEqual(2, find.call_count)
+
+    def test_cached_lookup_bounded(self):
+        self.patchobject(client_plugin, 'MAX_CACHED_LOOKUPS', new=2)
+        plugin = FooClientsPlugin(mock.Mock())
+        find = mock.Mock(side_effect=lambda name: name.upper())
+
+        for name in ('a', 'b', 'c', 'b'):
+            plugin._cached_lookup('foo', name, find)
+        self.assertEqual(3, find.call_count)
+        plugin._cached_lookup('foo', 'a', find)
+        self.assertEqual(4, find.call_count)
+
+    def test_invalidate_lookups(self):
+        plugin = FooClientsPlugin(mock.Mock())
+        find = mock.Mock(side_effect=lambda name: name.upper())
+
+        plugin._cached_lookup('foo', 'a', find)
+        plugin._cached_lookup('baz', 'a', find)
+        plugin.invalidate_lookups('foo')
+        plugin._cached_lookup('foo', 'a', find)
+        plugin._cached_lookup('baz', 'a', find)
+        self.assertEqual(3, find.call_count)
+
+        plugin.invalidate_lookups()
+        plugin._cached_lookup('baz', 'a', find)
+        self.assertEqual(4, find.call_count)
+
 
 class TestClientPluginsInitialise(common.HeatTestCase):
 
@@ -0,0 +1,46 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from heat.common import stats
+from heat.tests import common
+
+
+class CountersTest(common.HeatTestCase):
+
+    def test_incr(self):
+        counters = stats.Counters('test')
+        self.assertEqual(0, counters.get('hits'))
+        counters.incr('hits')
+        counters.incr('hits', 2)
+        self.assertEqual(3, counters.get('hits'))
+        self.assertEqual({'hits': 3}, counters.as_dict())
+
+    def test_ratio(self):
+        counters = stats.Counters('test')
+        self.assertEqual(0.0, counters.ratio('hits', 'misses'))
+        counters.incr('hits', 3)
+        counters.incr('misses')
+        self.assertEqual(0.75, counters.ratio('hits', 'misses'))
+
+    def test_reset(self):
+        counters = stats.Counters('test')
+        counters.incr('hits')
+        counters.reset()
+        self.assertEqual({}, counters.as_dict())
+
+    def test_get_counters_shared(self):
+        counters = stats.get_counters('test_shared')
+        self.addCleanup(counters.reset)
+        self.assertIs(counters, stats.get_counters('test_shared'))
+        counters.incr('hits')
+        self.assertEqual({'hits': 1}, stats.get_all()['test_shared'])
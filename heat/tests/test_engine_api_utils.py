@@ -371,6 +371,48 @@ class FormatTest(common.HeatTestCase):
 
         self.assertEqual(expected, info)
 
+    def test_format_stack_outputs_stored(self):
+        tmpl = template.Template({
+            'HeatTemplateFormatVersion': '2012-12-12',
+            'Resources': {
+                'generic': {'Type': 'GenericResourceType'}
+            },
+            'Outputs': {
+                'stored_output': {
+                    'Value': {'Fn::GetAtt': ['generic', 'Foo']}
+                },
+                'failed_output': {
+                    'Value': {'Fn::GetAtt': ['generic', 'Foo']}
+                },
+                'new_output': {
+                    'Value': {'Fn::GetAtt': ['generic', 'Foo']}
+                }
+            }
+        })
+        stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                             tmpl, stack_id=str(uuid.uuid4()),
+                             stored_outputs={
+                                 'stored_output': {'value': 'stored',
+                                                   'error_msg': None},
+                                 'failed_output': {'value': None,
+                                                   'error_msg': 'Failed'}})
+        mock_output = self.patchobject(stack, 'output', return_value='live')
+        info = api.format_stack_outputs(stack, stack.outputs)
+        expected = [{'description': 'No description given',
+                     'output_key': 'stored_output',
+                     'output_value': 'stored'},
+                    {'description': 'No description given',
+                     'output_error': 'Failed',
+                     'output_key': 'failed_output',
+                     'output_value': None},
+                    {'description': 'No description given',
+                     'output_key': 'new_output',
+                     'output_value': 'live'}]
+
+        self.assertEqual(sorted(expected, key=lambda o: o['output_key']),
+                         sorted(info, key=lambda o: o['output_key']))
+        mock_output.assert_called_once_with('new_output')
+
 
 class FormatValidateParameterTest(common.HeatTestCase):
 
@@ -181,7 +181,7 @@ resources:
 '''
 
 
-@mock.patch.object(worker_client.WorkerClient, 'check_resource')
+@mock.patch.object(worker_client.WorkerClient, 'check_resources')
 class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
     def setUp(self):
         super(StackConvergenceCreateUpdateDeleteTest, self).setUp()
@@ -206,12 +206,10 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
         self.assertEqual(stack_db.convergence, True)
         self.assertEqual({'edges': [[[1, True], None]]}, stack_db.current_deps)
         leaves = stack.convergence_dependencies.leaves()
-        expected_calls = []
-        for rsrc_id, is_update in leaves:
-            expected_calls.append(
-                mock.call.worker_client.WorkerClient.check_resource(
-                    stack.context, rsrc_id, stack.current_traversal, {},
-                    is_update))
+        expected_calls = [
+            mock.call.worker_client.WorkerClient.check_resources(
+                stack.context, stack.id, stack.current_traversal,
+                [(rsrc_id, update, {}) for rsrc_id, update in leaves])]
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
     def test_conv_string_five_instance_stack_create(self, mock_cr):
@@ -262,12 +260,10 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             self.assertEqual(stack_db.id, sync_point.stack_id)
 
         leaves = stack.convergence_dependencies.leaves()
-        expected_calls = []
-        for rsrc_id, is_update in leaves:
-            expected_calls.append(
-                mock.call.worker_client.WorkerClient.check_resource(
-                    stack.context, rsrc_id, stack.current_traversal, {},
-                    is_update))
+        expected_calls = [
+            mock.call.worker_client.WorkerClient.check_resources(
+                stack.context, stack.id, stack.current_traversal,
+                [(rsrc_id, update, {}) for rsrc_id, update in leaves])]
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
     def _mock_conv_update_requires(self, stack, conv_deps):
@@ -397,19 +393,17 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             self.assertEqual(stack_db.id, sync_point.stack_id)
 
         leaves = stack.convergence_dependencies.leaves()
-        expected_calls = []
-        for rsrc_id, is_update in leaves:
-            expected_calls.append(
-                mock.call.worker_client.WorkerClient.check_resource(
-                    stack.context, rsrc_id, stack.current_traversal, {},
-                    is_update))
+        expected_calls = [
+            mock.call.worker_client.WorkerClient.check_resources(
+                stack.context, stack.id, stack.current_traversal,
+                [(rsrc_id, update, {}) for rsrc_id, update in leaves])]
 
         leaves = curr_stack.convergence_dependencies.leaves()
-        for rsrc_id, is_update in leaves:
-            expected_calls.append(
-                mock.call.worker_client.WorkerClient.check_resource(
-                    curr_stack.context, rsrc_id, curr_stack.current_traversal,
-                    {}, is_update))
+        expected_calls.append(
+            mock.call.worker_client.WorkerClient.check_resources(
+                curr_stack.context, curr_stack.id,
+                curr_stack.current_traversal,
+                [(rsrc_id, update, {}) for rsrc_id, update in leaves]))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
     def test_conv_empty_template_stack_update_delete(self, mock_cr):
@@ -476,19 +470,17 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             self.assertEqual(stack_db.id, sync_point.stack_id)
 
         leaves = stack.convergence_dependencies.leaves()
-        expected_calls = []
-        for rsrc_id, is_update in leaves:
-            expected_calls.append(
-                mock.call.worker_client.WorkerClient.check_resource(
-                    stack.context, rsrc_id, stack.current_traversal, {},
-                    is_update))
+        expected_calls = [
+            mock.call.worker_client.WorkerClient.check_resources(
+                stack.context, stack.id, stack.current_traversal,
+                [(rsrc_id, update, {}) for rsrc_id, update in leaves])]
 
         leaves = curr_stack.convergence_dependencies.leaves()
-        for rsrc_id, is_update in leaves:
-            expected_calls.append(
-                mock.call.worker_client.WorkerClient.check_resource(
-                    curr_stack.context, rsrc_id, curr_stack.current_traversal,
-                    {}, is_update))
+        expected_calls.append(
+            mock.call.worker_client.WorkerClient.check_resources(
+                curr_stack.context, curr_stack.id,
+                curr_stack.current_traversal,
+                [(rsrc_id, update, {}) for rsrc_id, update in leaves]))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
     def test_mark_complete_purges_db(self, mock_cr):
@@ -2116,6 +2108,25 @@ class StackServiceTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    @tools.stack_context('service_describe_live_outputs_test_stack', False)
+    def test_stack_describe_live_outputs(self):
+        stored = {'foo': {'value': 'bar', 'error_msg': None}}
+        stack_object.Stack.update_by_id(self.ctx, self.stack.id,
+                                        {'status': parser.Stack.COMPLETE,
+                                         'outputs': stored})
+        mock_store = self.patchobject(parser.Stack, 'store_outputs')
+        mock_format = self.patchobject(service.api, 'format_stack')
+
+        self.eng.show_stack(self.ctx, self.stack.identifier())
+        self.assertEqual(stored, mock_format.call_args[0][0].stored_outputs)
+
+        self.eng.show_stack(self.ctx, self.stack.identifier(),
+                            live_outputs=True)
+        self.assertIsNone(mock_format.call_args[0][0].stored_outputs)
+        self.assertFalse(mock_store.called)
+        db_stack = stack_object.Stack.get_by_id(self.ctx, self.stack.id)
+        self.assertEqual(stored, db_stack.outputs)
+
     @tools.stack_context('service_describe_all_test_stack', False)
     def test_stack_describe_all(self):
         sl = self.eng.show_stack(self.ctx, None)
@@ -2321,6 +2332,99 @@ class StackServiceTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    @tools.stack_context('service_resource_metadata_test_stack')
+    def test_resource_metadata(self):
+        self.stack['WebServer'].metadata_set({'foo': 'bar'})
+
+        with mock.patch.object(parser.Stack, 'load') as mock_load:
+            md = self.eng.resource_metadata(self.ctx,
+                                            self.stack.identifier(),
+                                            'WebServer')
+        self.assertEqual({'foo': 'bar'}, md)
+        self.assertFalse(mock_load.called)
+
+    @tools.stack_context('service_resource_metadata_convg_test_stack')
+    def test_resource_metadata_convergence_replaced(self):
+        stack_object.Stack.update_by_id(self.ctx, self.stack.id,
+                                        {'convergence': True})
+        old = resource_objects.Resource.get_by_name_and_stack(
+            self.ctx, 'WebServer', self.stack.id)
+        new = resource_objects.Resource.create(self.ctx, {
+            'name': 'WebServer', 'stack_id': self.stack.id,
+            'action': 'CREATE', 'status': 'COMPLETE',
+            'rsrc_metadata': {'foo': 'new'}, 'replaces': old.id,
+            'current_template_id': self.stack.t.id})
+        old.update_and_save({'replaced_by': new.id,
+                             'rsrc_metadata': {'foo': 'old'}})
+        mock_stack = mock.MagicMock()
+        mock_stack.__contains__.return_value = True
+        mock_stack['WebServer'].metadata_get.return_value = {'foo': 'new'}
+
+        with mock.patch.object(parser.Stack, 'load',
+                               return_value=mock_stack) as mock_load:
+            md = self.eng.resource_metadata(self.ctx,
+                                            self.stack.identifier(),
+                                            'WebServer')
+        # The replaced resource's metadata is never served, whichever row
+        # is found first
+        self.assertEqual({'foo': 'new'}, md)
+        self.assertTrue(mock_load.call_count <= 1)
+
+    @tools.stack_context('service_resource_metadata_noncreated_test_stack',
+                         create_res=False)
+    def test_resource_metadata_noncreated_resource(self):
+        with mock.patch.object(parser.Stack, 'load',
+                               return_value=self.stack) as mock_load:
+            md = self.eng.resource_metadata(self.ctx,
+                                            self.stack.identifier(),
+                                            'WebServer')
+        self.assertEqual(self.stack['WebServer'].metadata_get(), md)
+        self.assertEqual(1, mock_load.call_count)
+
+    @tools.stack_context('service_resource_metadata_nonexist_test_stack')
+    def test_resource_metadata_nonexist_resource(self):
+        with mock.patch.object(parser.Stack, 'load',
+                               return_value=self.stack):
+            ex = self.assertRaises(dispatcher.ExpectedException,
+                                   self.eng.resource_metadata,
+                                   self.ctx, self.stack.identifier(), 'foo')
+        self.assertEqual(exception.ResourceNotFound, ex.exc_info[0])
+
+    @tools.stack_context('service_resource_metadata_user_test_stack')
+    def test_resource_metadata_stack_user(self):
+        self.ctx.roles = [cfg.CONF.heat_stack_user_role]
+        self.stack['WebServer'].metadata_set({'foo': 'bar'})
+
+        with mock.patch.object(parser.Stack, 'load',
+                               return_value=self.stack) as mock_load:
+            with mock.patch.object(service.EngineService,
+                                   '_authorize_stack_user',
+                                   return_value=True) as mock_authorize:
+                for i in range(2):
+                    md = self.eng.resource_metadata(self.ctx,
+                                                    self.stack.identifier(),
+                                                    'WebServer')
+                    self.assertEqual({'foo': 'bar'}, md)
+
+        # The stack is loaded only to authorize the first request
+        self.assertEqual(1, mock_load.call_count)
+        self.assertEqual(1, mock_authorize.call_count)
+
+    @tools.stack_context('service_resource_metadata_user_deny_test_stack')
+    def test_resource_metadata_stack_user_deny(self):
+        self.ctx.roles = [cfg.CONF.heat_stack_user_role]
+
+        with mock.patch.object(parser.Stack, 'load',
+                               return_value=self.stack):
+            with mock.patch.object(service.EngineService,
+                                   '_authorize_stack_user',
+                                   return_value=False):
+                ex = self.assertRaises(dispatcher.ExpectedException,
+                                       self.eng.resource_metadata,
+                                       self.ctx, self.stack.identifier(),
+                                       'WebServer')
+        self.assertEqual(exception.Forbidden, ex.exc_info[0])
+
     @tools.stack_context('service_resources_describe_test_stack')
     def test_stack_resources_describe(self):
         self.m.StubOutWithMock(parser.Stack, 'load')
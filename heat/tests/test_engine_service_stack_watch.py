@@ -71,8 +71,8 @@ class StackServiceWatcherTest(common.HeatTestCase):
         sw.start_watch_task(stack_id, self.ctx)
 
         # assert that add_timer IS called.
-        self.assertEqual([mock.call(stack_id, sw.periodic_watcher_task,
-                                    sid=stack_id)],
+        self.assertEqual([mock.call(service_stack_watch.WATCH_TASK_GROUP,
+                                    sw.periodic_watcher_task)],
                          tg.add_timer.call_args_list)
 
     @mock.patch.object(service_stack_watch.stack_object.Stack,
@@ -109,6 +109,61 @@ class StackServiceWatcherTest(common.HeatTestCase):
         sw.start_watch_task(stack_id, self.ctx)
 
         # assert that add_timer IS called.
-        self.assertEqual([mock.call(stack_id, sw.periodic_watcher_task,
-                                    sid=stack_id)],
+        self.assertEqual([mock.call(service_stack_watch.WATCH_TASK_GROUP,
+                                    sw.periodic_watcher_task)],
                          tg.add_timer.call_args_list)
+
+    @mock.patch.object(service_stack_watch.stack_object.Stack,
+                       'get_all_by_owner_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_all_by_stack')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'update_by_id')
+    def test_periodic_watch_task_created_once(self, watch_rule_update,
+                                              watch_rule_get_all_by_stack,
+                                              stack_get_all_by_owner_id):
+        wr1 = mock.Mock()
+        wr1.id = 4
+        wr1.state = rpc_api.WATCH_STATE_NODATA
+
+        watch_rule_get_all_by_stack.return_value = [wr1]
+        stack_get_all_by_owner_id.return_value = []
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        sw.start_watch_task(86, self.ctx)
+        sw.start_watch_task(87, self.ctx)
+
+        # assert that only one timer is added for all stacks
+        self.assertEqual([mock.call(service_stack_watch.WATCH_TASK_GROUP,
+                                    sw.periodic_watcher_task)],
+                         tg.add_timer.call_args_list)
+
+    @mock.patch.object(service_stack_watch.watchrule.WatchRule, 'load')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_all_due')
+    def test_check_watches(self, watch_rule_get_all_due, watch_rule_load):
+        wr1 = mock.Mock()
+        wr2 = mock.Mock()
+        watch_rule_get_all_due.return_value = [wr1, wr2]
+
+        quiet_rule = mock.Mock()
+        quiet_rule.evaluate.return_value = []
+        alarm_rule = mock.Mock()
+        alarm_rule.stack_id = 'stack-1'
+        alarm_rule.evaluate.return_value = ['action']
+        watch_rule_load.side_effect = [quiet_rule, alarm_rule]
+
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        sw.periodic_watcher_task()
+
+        self.assertEqual([mock.call(mock.ANY, watch=wr1,
+                                    use_stored_context=True),
+                          mock.call(mock.ANY, watch=wr2,
+                                    use_stored_context=True)],
+                         watch_rule_load.call_args_list)
+        # Only the stack of the rule with actions to run is loaded
+        self.assertFalse(quiet_rule.load_stack.called)
+        tg.start.assert_called_once_with(
+            'stack-1', mock.ANY, alarm_rule.load_stack.return_value,
+            ['action'], alarm_rule.get_details.return_value)
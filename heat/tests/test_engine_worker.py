@@ -39,7 +39,7 @@ class WorkerServiceTest(common.HeatTestCase):
 
     def test_make_sure_rpc_version(self):
         self.assertEqual(
-            '1.1',
+            '1.2',
             worker.WorkerService.RPC_API_VERSION,
             ('RPC version is changed, please update this test to new version '
              'and make sure additional test cases are added for RPC APIs '
@@ -84,6 +84,16 @@ class WorkerServiceTest(common.HeatTestCase):
                          self.worker._rpc_client,
                          "Failed to create RPC client")
 
+    def test_check_resources(self):
+        ctx = utils.dummy_context()
+        resources = [('res-1', True, {}), ('res-2', False, {})]
+        self.worker.check_resources(ctx, 'stack-1', 'traversal-1', resources)
+        self.worker.thread_group_mgr.start.assert_has_calls([
+            mock.call('stack-1', self.worker.check_resource, ctx,
+                      'res-1', 'traversal-1', {}, True),
+            mock.call('stack-1', self.worker.check_resource, ctx,
+                      'res-2', 'traversal-1', {}, False)])
+
     def test_service_stop(self):
         with mock.patch.object(self.worker, '_rpc_server') as mock_rpc_server:
             self.worker.stop()
@@ -160,6 +170,65 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
             self.resource.id,
             mock.ANY, True)
 
+    @mock.patch.object(worker_client.WorkerClient, 'check_resources')
+    def test_queued_checks_sent_when_propagation_fails(
+            self, mock_crs, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
+        rsrc = self.stack['C']
+        traversal = self.stack.current_traversal
+
+        def propagate(cnxt, rpc_client, next_res_id, *args):
+            if mock_pcr.call_count > 1:
+                raise sync_point.SyncPointUpdateFailed(next_res_id, 3)
+            rpc_client.queue_check_resource(cnxt, self.stack.id, traversal,
+                                            next_res_id, {}, True)
+
+        mock_pcr.side_effect = propagate
+        self.assertRaises(sync_point.SyncPointUpdateFailed,
+                          self.worker.check_resource,
+                          self.ctx, rsrc.id, traversal, {}, self.is_update)
+        self.assertEqual(2, mock_pcr.call_count)
+        first_res_id = mock_pcr.call_args_list[0][0][2]
+        mock_crs.assert_called_once_with(self.ctx, self.stack.id, traversal,
+                                         [(first_res_id, True, {})])
+        self.assertEqual({}, self.worker._rpc_client._queued)
+        self.assertFalse(mock_csc.called)
+
+    def test_traversal_context_cached(
+            self, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
+        cache = templatem._template_cache
+        with mock.patch.object(cache, 'get', wraps=cache.get) as mock_get:
+            for i in range(2):
+                self.worker.check_resource(
+                    self.ctx, self.resource.id, self.stack.current_traversal,
+                    {}, self.is_update)
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual([self.stack.current_traversal],
+                         list(self.worker._traversals))
+        tc = self.worker._traversals[self.stack.current_traversal]
+        self.assertIn(self.resource.current_template_id, tc.templates)
+        self.assertEqual(2, mock_cru.call_count)
+
+    def test_traversal_context_replaced_by_new_traversal(
+            self, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
+        self.worker.check_resource(
+            self.ctx, self.resource.id, self.stack.current_traversal, {},
+            self.is_update)
+        self.stack.current_traversal = 'new-traversal'
+        self.worker.check_resource(
+            self.ctx, self.resource.id, 'new-traversal', {}, self.is_update)
+        self.assertEqual(['new-traversal'], list(self.worker._traversals))
+
+    def test_traversal_context_dropped_when_cancelled(
+            self, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
+        old_traversal = self.stack.current_traversal
+        self.worker.check_resource(
+            self.ctx, self.resource.id, old_traversal, {}, self.is_update)
+        self.stack.current_traversal = 'new-traversal'
+        self.worker.check_resource(
+            self.ctx, self.resource.id, old_traversal, {}, self.is_update)
+        self.assertEqual({}, self.worker._traversals)
+        self.assertEqual(1, mock_cru.call_count)
+
     @mock.patch.object(resource.Resource, 'make_replacement')
     def test_is_update_traversal_raise_update_replace(
             self, mock_mr, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
@@ -453,9 +522,22 @@ class MiscMethodsTest(common.HeatTestCase):
         worker.propagate_check_resource(
             self.ctx, mock.ANY, mock.ANY,
             self.stack.current_traversal, mock.ANY,
-            mock.ANY, {}, True)
+            mock.ANY, {}, True, self.stack.id)
         self.assertTrue(mock_sync.called)
 
+    @mock.patch.object(sync_point, 'sync')
+    def test_propagate_check_resource_queues_check(self, mock_sync):
+        rpc_client = mock.Mock()
+        worker.propagate_check_resource(
+            self.ctx, rpc_client, 'res-1',
+            self.stack.current_traversal, set(),
+            ('res-0', True), {}, True, self.stack.id)
+        do_check = mock_sync.call_args[0][4]
+        do_check('res-1', 'data')
+        rpc_client.queue_check_resource.assert_called_once_with(
+            self.ctx, self.stack.id, self.stack.current_traversal,
+            'res-1', 'data', True)
+
     @mock.patch.object(resource.Resource, 'create_convergence')
     def test_check_resource_update_create(self, mock_create):
         worker.check_resource_update(self.resource, self.resource.stack.t.id,
@@ -12,8 +12,11 @@
 #    under the License.
 
 import datetime
+
+import eventlet
 import mock
 from oslo_config import cfg
+from oslo_utils import timeutils
 
 from heat.common import exception
 from heat.engine import event
@@ -125,9 +128,14 @@ class EventTest(common.HeatTestCase):
         self.assertIsNotNone(loaded_e.timestamp)
         self.assertEqual({'Foo': 'goo'}, loaded_e.resource_properties)
 
+    def _prune_synchronously(self):
+        self.patchobject(eventlet, 'spawn_n',
+                         side_effect=lambda func, *args: func(*args))
+
     def test_store_caps_events(self):
         cfg.CONF.set_override('event_purge_batch_size', 1)
         cfg.CONF.set_override('max_events_per_stack', 1)
+        self._prune_synchronously()
         self.resource.resource_id_set('resource_physical_id')
 
         e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
@@ -145,6 +153,156 @@ class EventTest(common.HeatTestCase):
         self.assertEqual(1, len(events))
         self.assertEqual('arizona', events[0].physical_resource_id)
 
+    def test_store_counts_events_only_when_headroom_used(self):
+        cfg.CONF.set_override('event_purge_batch_size', 2)
+        cfg.CONF.set_override('max_events_per_stack', 4)
+        self._prune_synchronously()
+        count = self.patchobject(event_object.Event, 'count_all_by_stack',
+                                 side_effect=event_object.Event.
+                                 count_all_by_stack)
+        self.resource.resource_id_set('resource_physical_id')
+
+        def store_event(physical_id):
+            e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS',
+                            'Testing', physical_id, self.resource.properties,
+                            self.resource.name, self.resource.type())
+            e.store()
+
+        for i in range(4):
+            store_event('event%d' % i)
+        # Counted on the first write, then not again until the remaining
+        # headroom of 3 events was used up
+        self.assertEqual(2, count.call_count)
+        self.assertEqual(4, len(event_object.Event.get_all_by_stack(
+            self.ctx, self.stack.id)))
+
+        store_event('event4')
+        self.assertEqual(3, count.call_count)
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(['event2', 'event3', 'event4'],
+                         sorted(e.physical_resource_id for e in events))
+
+    def test_store_prune_in_background(self):
+        cfg.CONF.set_override('max_events_per_stack', 1)
+        spawn = self.patchobject(eventlet, 'spawn_n')
+        self.addCleanup(event._prunes_in_progress.discard, self.stack.id)
+        self.resource.resource_id_set('resource_physical_id')
+
+        for physical_id in ('alabama', 'arizona'):
+            e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS',
+                            'Testing', physical_id, self.resource.properties,
+                            self.resource.name, self.resource.type())
+            e.store()
+
+        # Only one prune is started while one is already in progress
+        spawn.assert_called_once_with(event._prune, self.stack.id)
+        self.assertEqual(2, len(event_object.Event.get_all_by_stack(
+            self.ctx, self.stack.id)))
+
+    def test_prune_uses_own_context(self):
+        cfg.CONF.set_override('max_events_per_stack', 1)
+        self._prune_synchronously()
+        count = self.patchobject(event_object.Event, 'count_all_by_stack',
+                                 return_value=1)
+        self.resource.resource_id_set('resource_physical_id')
+
+        e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
+                        'alabama', self.resource.properties,
+                        self.resource.name, self.resource.type())
+        e.store()
+
+        self.assertEqual(1, count.call_count)
+        prune_ctx = count.call_args[0][0]
+        self.assertIsNot(self.ctx, prune_ctx)
+        self.assertTrue(prune_ctx.is_admin)
+
+    def _queue_events(self, *physical_ids):
+        for physical_id in physical_ids:
+            e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS',
+                            'Testing', physical_id, self.resource.properties,
+                            self.resource.name, self.resource.type())
+            self.assertIsNone(e.store())
+
+    def test_store_queued(self):
+        cfg.CONF.set_override('event_flush_interval', 5)
+        self.patchobject(event, '_writer', new=None)
+        spawn_after = self.patchobject(eventlet, 'spawn_after')
+
+        self._queue_events('alabama', 'arizona')
+        spawn_after.assert_called_once_with(5, mock.ANY)
+        self.assertEqual(0, len(event_object.Event.get_all_by_stack(
+            self.ctx, self.stack.id)))
+
+        event.flush()
+        events = sorted(event_object.Event.get_all_by_stack(self.ctx,
+                                                            self.stack.id),
+                        key=lambda e: e.id)
+        self.assertEqual(['alabama', 'arizona'],
+                         [e.physical_resource_id for e in events])
+        self.assertEqual(['Testing', 'Testing'],
+                         [e.resource_status_reason for e in events])
+        self.assertEqual({'Foo': 'goo'}, events[0].resource_properties)
+        self.assertIsNotNone(events[0].uuid)
+        self.assertIsNotNone(events[0].created_at)
+
+    def test_store_queued_writes_full_batch(self):
+        cfg.CONF.set_override('event_flush_interval', 5)
+        self.patchobject(event, '_writer', new=None)
+        self.patchobject(event, 'MAX_WRITE_BATCH', new=3)
+        self.patchobject(eventlet, 'spawn_after')
+        create_batch = self.patchobject(event_object.Event, 'create_batch')
+
+        self._queue_events('alabama', 'arizona', 'arkansas', 'california')
+        self.assertEqual(1, create_batch.call_count)
+        batch = create_batch.call_args[0][1]
+        self.assertEqual(['alabama', 'arizona', 'arkansas'],
+                         [ev['physical_resource_id'] for ev in batch])
+
+        event.flush()
+        self.assertEqual(2, create_batch.call_count)
+        batch = create_batch.call_args[0][1]
+        self.assertEqual(['california'],
+                         [ev['physical_resource_id'] for ev in batch])
+
+    def test_store_queued_timestamp(self):
+        cfg.CONF.set_override('event_flush_interval', 5)
+        self.patchobject(event, '_writer', new=None)
+        self.patchobject(eventlet, 'spawn_after')
+        now = timeutils.utcnow().replace(microsecond=0)
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+
+        self._queue_events('alabama')
+        timeutils.advance_time_seconds(30)
+        event.flush()
+
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(now, events[0].created_at)
+
+    def test_store_queued_batch_fails(self):
+        cfg.CONF.set_override('event_flush_interval', 5)
+        self.patchobject(event, '_writer', new=None)
+        self.patchobject(eventlet, 'spawn_after')
+        self.patchobject(event_object.Event, 'create_batch',
+                         side_effect=exception.Error('boom'))
+        create = self.patchobject(event_object.Event, 'create',
+                                  side_effect=[exception.Error('boom'),
+                                               mock.Mock()])
+        failures = event.counters.get('write_failures')
+        written = event.counters.get('written')
+
+        self._queue_events('alabama', 'arizona')
+        event.flush()
+
+        # The events are written one at a time, and only the one that
+        # could not be written is lost
+        self.assertEqual(2, create.call_count)
+        self.assertEqual(['alabama', 'arizona'],
+                         [c[0][1]['physical_resource_id']
+                          for c in create.call_args_list])
+        self.assertEqual(failures + 1, event.counters.get('write_failures'))
+        self.assertEqual(written + 1, event.counters.get('written'))
+
     def test_identifier(self):
         event_uuid = 'abc123yc-9f88-404d-a85b-531529456xyz'
         e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
@@ -56,6 +56,18 @@ class GlanceUtilsTests(common.HeatTestCase):
         self.glance_client.images.get.assert_called_once_with(img_id)
         self.glance_client.images.list.assert_has_calls(calls)
 
+    def test_get_image_id_cached(self):
+        """Tests that get_image_id caches the images it finds."""
+        img_id = str(uuid.uuid4())
+        self.my_image.id = img_id
+        img_name = 'myfakeimage'
+        self.my_image.name = img_name
+        self.glance_client.images.list.return_value = [self.my_image]
+        self.assertEqual(img_id, self.glance_plugin.get_image_id(img_name))
+        self.assertEqual(img_id, self.glance_plugin.get_image_id(img_name))
+        self.glance_client.images.list.assert_called_once_with(
+            filters={'name': img_name})
+
     def test_get_image_id_by_name_in_uuid(self):
         """Tests the get_image_id function by name in uuid."""
         img_id = str(uuid.uuid4())
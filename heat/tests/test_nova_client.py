@@ -82,6 +82,21 @@ class NovaClientPluginTests(NovaClientPluginTestCase):
         self.assertEqual([(), (), ()],
                          self.nova_client.flavors.list.call_args_list)
 
+    def test_get_flavor_id_cached(self):
+        """Tests that get_flavor_id caches the flavors it finds."""
+        flav_id = str(uuid.uuid4())
+        my_flavor = mock.MagicMock()
+        my_flavor.name = 'X-Large'
+        my_flavor.id = flav_id
+        self.nova_client.flavors.list.return_value = [my_flavor]
+        self.assertEqual(flav_id, self.nova_plugin.get_flavor_id('X-Large'))
+        self.assertEqual(flav_id, self.nova_plugin.get_flavor_id('X-Large'))
+        self.assertEqual(1, self.nova_client.flavors.list.call_count)
+
+        self.nova_plugin.invalidate_lookups('flavor')
+        self.assertEqual(flav_id, self.nova_plugin.get_flavor_id('X-Large'))
+        self.assertEqual(2, self.nova_client.flavors.list.call_count)
+
     def test_get_keypair(self):
         """Tests the get_keypair function."""
         my_pub_key = 'a cool public key string'
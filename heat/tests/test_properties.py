@@ -11,6 +11,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+from oslo_config import cfg
 from oslo_serialization import jsonutils
 import six
 
@@ -21,8 +23,11 @@ from heat.engine.hot import parameters as hot_param
 from heat.engine import parameters
 from heat.engine import properties
 from heat.engine import resources
+from heat.engine import stack as parser
 from heat.engine import support
+from heat.engine import template
 from heat.tests import common
+from heat.tests import utils
 
 
 class PropertySchemaTest(common.HeatTestCase):
@@ -1119,6 +1124,70 @@ class PropertiesTest(common.HeatTestCase):
         except exception.StackValidationFailed:
             self.fail("Constraints should not have been evaluated.")
 
+    def test_resolved_value_cache(self):
+        schema = {'foo': {'Type': 'String'}}
+        resolver = mock.Mock(return_value='bar')
+        props = properties.Properties(schema, {'foo': 'baz'}, resolver)
+        counters = properties.cache_counters
+        hits = counters.get('hits')
+        misses = counters.get('misses')
+
+        self.assertEqual('bar', props['foo'])
+        self.assertEqual('bar', props['foo'])
+        self.assertEqual(2, resolver.call_count)
+
+        props.enable_cache()
+        self.assertEqual('bar', props['foo'])
+        self.assertEqual('bar', props['foo'])
+        self.assertEqual(3, resolver.call_count)
+        self.assertEqual(hits + 1, counters.get('hits'))
+        self.assertEqual(misses + 1, counters.get('misses'))
+
+        resolver.return_value = 'qux'
+        props.reset_cache()
+        self.assertEqual('qux', props['foo'])
+        self.assertEqual(4, resolver.call_count)
+
+    def test_resolved_value_cache_copies_containers(self):
+        schema = {'foo': {'Type': 'Map'}, 'bar': {'Type': 'List'}}
+        props = properties.Properties(schema, {'foo': {'a': ['b']},
+                                               'bar': ['c']})
+        props.enable_cache()
+
+        props['foo']['a'].append('x')
+        props['bar'].append('y')
+        self.assertEqual({'a': ['b']}, props['foo'])
+        self.assertEqual(['c'], props['bar'])
+
+    def test_resolved_value_cache_enabled_when_replaced(self):
+        cfg.CONF.set_override('cache_resolved_properties', True)
+        tmpl = template.Template({
+            'HeatTemplateFormatVersion': '2012-12-12',
+            'Resources': {
+                'res': {'Type': 'GenericResourceType',
+                        'Properties': {}}}})
+        stack = parser.Stack(utils.dummy_context(), 'test', tmpl)
+        res = stack['res']
+        self.assertIsNotNone(res.properties._cache)
+
+        res.properties = res.t.properties(res.properties_schema,
+                                          res.context)
+        self.assertIsNotNone(res.properties._cache)
+
+    def test_resolved_value_cache_reset_with_stack_attributes(self):
+        cfg.CONF.set_override('cache_resolved_properties', True)
+        tmpl = template.Template({
+            'HeatTemplateFormatVersion': '2012-12-12',
+            'Resources': {
+                'res': {'Type': 'GenericResourceType',
+                        'Properties': {}}}})
+        stack = parser.Stack(utils.dummy_context(), 'test', tmpl)
+        props = stack['res'].properties
+        props._cache['foo'] = 'bar'
+
+        stack.reset_resource_attributes()
+        self.assertEqual({}, props._cache)
+
     def test_schema_from_params(self):
         params_snippet = {
             "DBUsername": {
@@ -556,9 +556,16 @@ class ProviderTemplateTest(common.HeatTestCase):
         temp_res = template_resource.TemplateResource('test_t_res',
                                                       definition, stack)
         temp_res.metadata_set = mock.Mock()
+        temp_res.metadata_get = mock.Mock(return_value={'Foo': 'old'})
         temp_res.metadata_update()
         temp_res.metadata_set.assert_called_once_with({})
 
+        # Unchanged metadata is not written back
+        temp_res.metadata_set.reset_mock()
+        temp_res.metadata_get.return_value = {}
+        temp_res.metadata_update()
+        self.assertFalse(temp_res.metadata_set.called)
+
     def test_get_template_resource_class(self):
         test_templ_name = 'file:///etc/heatr/frodo.yaml'
         minimal_temp = json.dumps({'HeatTemplateFormatVersion': '2012-12-12',
@@ -96,6 +96,35 @@ class ResourceTest(common.HeatTestCase):
                                                    res.id, {})
         self.assertEqual(loaded_res.id, res.id)
 
+    def test_resource_load_with_templates(self):
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                  template.Template(empty_template))
+        self.stack.store()
+        snippet = rsrc_defn.ResourceDefinition('aresource',
+                                               'GenericResourceType')
+        res = resource.Resource('aresource', snippet, self.stack)
+        res.current_template_id = self.stack.t.id
+        res.state_set('CREATE', 'IN_PROGRESS')
+        self.stack.add_resource(res)
+
+        templates = {}
+        res1, stack1 = resource.Resource.load(self.stack.context, res.id, {},
+                                              templates=templates)
+        self.assertEqual([self.stack.t.id], list(templates))
+        stack1.t.dep_attrs(stack1, 'aresource')
+
+        with mock.patch.object(template._template_cache,
+                               'get') as mock_get:
+            with mock.patch.object(rsrc_defn.ResourceDefinition,
+                                   'all_dep_attrs') as mock_dep_attrs:
+                res2, stack2 = resource.Resource.load(
+                    self.stack.context, res.id, {}, templates=templates)
+                stack2.t.dep_attrs(stack2, 'aresource')
+        self.assertFalse(mock_get.called)
+        self.assertFalse(mock_dep_attrs.called)
+        self.assertEqual(res.id, res2.id)
+        self.assertIsNot(stack1.t, stack2.t)
+
     def test_resource_invalid_name(self):
         snippet = rsrc_defn.ResourceDefinition('wrong/name',
                                                'GenericResourceType')
@@ -646,6 +675,42 @@ class ResourceTest(common.HeatTestCase):
         self.assertEqual((res.CREATE, res.COMPLETE), res.state)
         self.m.VerifyAll()
 
+    def test_polling_policy_default(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        policy = res.polling_policy(res.CREATE)
+        self.assertEqual(1, policy.maximum)
+
+    def test_polling_policy_expected_duration(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        res.expected_durations = {res.CREATE: 60}
+        self.assertEqual(6, res.polling_policy(res.CREATE).maximum)
+        self.assertEqual(1, res.polling_policy(res.DELETE).maximum)
+
+    def test_action_handler_checks_immediately(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        self.patchobject(res, 'handle_create', return_value='data')
+        check = self.patchobject(res, 'check_create_complete', create=True,
+                                 return_value=True)
+        runner = scheduler.TaskRunner(res.action_handler_task, res.CREATE)
+        runner.start()
+        self.assertTrue(runner.done())
+        check.assert_called_once_with('data')
+
+    def test_action_handler_invalidates_lookups(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        res.client_lookup_kind = 'foo'
+        self.patchobject(res, 'handle_create',
+                         side_effect=exception.Error('boom'))
+        plugin = mock.Mock()
+        self.patchobject(res, 'client_plugin', return_value=plugin)
+        runner = scheduler.TaskRunner(res.action_handler_task, res.CREATE)
+        self.assertRaises(exception.Error, runner)
+        plugin.invalidate_lookups.assert_called_once_with('foo')
+
     def test_create_fail_retry_disabled(self):
         cfg.CONF.set_override('action_retry_limit', 0)
         tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo',
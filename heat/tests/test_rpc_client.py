@@ -142,7 +142,8 @@ class EngineRpcAPITestCase(common.HeatTestCase):
                               stack_name='wordpress')
 
     def test_show_stack(self):
-        self._test_engine_api('show_stack', 'call', stack_identity='wordpress')
+        self._test_engine_api('show_stack', 'call', stack_identity='wordpress',
+                              live_outputs=False, version='1.12')
 
     def test_preview_stack(self):
         self._test_engine_api('preview_stack', 'call', stack_name='wordpress',
@@ -218,6 +219,11 @@ class EngineRpcAPITestCase(common.HeatTestCase):
                               resource_name='LogicalResourceId',
                               with_attr=None)
 
+    def test_resource_metadata(self):
+        self._test_engine_api('resource_metadata', 'call',
+                              stack_identity=self.identity,
+                              resource_name='LogicalResourceId')
+
     def test_find_physical_resource(self):
         self._test_engine_api('find_physical_resource', 'call',
                               physical_resource_id=u'404d-a85b-5315293e67de')
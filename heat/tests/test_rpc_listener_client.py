@@ -68,3 +68,15 @@ class ListenerClientTest(common.HeatTestCase):
         self.assertFalse(ret)
         mock_prepare_client.call.assert_called_once_with(mock_cnxt,
                                                          'listening')
+
+    @mock.patch('heat.common.messaging.get_rpc_client',
+                return_value=mock.Mock())
+    def test_notify_state_change(self, rpc_client_method):
+        mock_rpc_client = rpc_client_method.return_value
+        mock_prepare_client = mock_rpc_client.prepare.return_value
+        mock_cnxt = mock.Mock()
+
+        listener_client = rpc_client.EngineListenerClient('engine-007')
+        listener_client.notify_state_change(mock_cnxt, 'stack-id')
+        mock_prepare_client.cast.assert_called_once_with(
+            mock_cnxt, 'state_changed', stack_id='stack-id')
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import mock
+from oslo_config import cfg
 
 from heat.rpc import worker_api as rpc_api
 from heat.rpc import worker_client as rpc_client
@@ -72,3 +73,60 @@ class WorkerClientTest(common.HeatTestCase):
         mock_rpc_client.cast.assert_called_once_with(mock_cnxt,
                                                      method,
                                                      **kwargs)
+
+    @mock.patch('heat.common.messaging.get_rpc_client',
+                return_value=mock.Mock())
+    def test_check_resources_batches(self, rpc_client_method):
+        cfg.CONF.set_override('convergence_check_batch_size', 2)
+        mock_rpc_client = rpc_client_method.return_value
+        prepared = mock_rpc_client.prepare.return_value
+        worker_client = rpc_client.WorkerClient()
+        mock_cnxt = mock.Mock()
+        resources = [('res-1', True, {}), ('res-2', True, {}),
+                     ('res-3', False, {})]
+
+        worker_client.check_resources(mock_cnxt, 'stack-1', 'traversal-1',
+                                      resources)
+
+        mock_rpc_client.prepare.assert_called_once_with(version='1.2')
+        prepared.cast.assert_called_once_with(
+            mock_cnxt, 'check_resources', stack_id='stack-1',
+            current_traversal='traversal-1', resources=resources[:2])
+        mock_rpc_client.cast.assert_called_once_with(
+            mock_cnxt, 'check_resource', resource_id='res-3',
+            current_traversal='traversal-1', data={}, is_update=False)
+
+    @mock.patch('heat.common.messaging.get_rpc_client',
+                return_value=mock.Mock())
+    def test_queue_check_resource(self, rpc_client_method):
+        worker_client = rpc_client.WorkerClient()
+        mock_cnxt = mock.Mock()
+        with mock.patch.object(worker_client, 'check_resources') as mock_crs:
+            worker_client.queue_check_resource(mock_cnxt, 'stack-1', 't-1',
+                                               'res-1', {}, True)
+            worker_client.queue_check_resource(mock_cnxt, 'stack-1', 't-1',
+                                               'res-2', {}, True)
+            self.assertFalse(mock_crs.called)
+
+            worker_client.flush()
+            mock_crs.assert_called_once_with(
+                mock_cnxt, 'stack-1', 't-1',
+                [('res-1', True, {}), ('res-2', True, {})])
+
+            mock_crs.reset_mock()
+            worker_client.flush()
+            self.assertFalse(mock_crs.called)
+
+    @mock.patch('heat.common.messaging.get_rpc_client',
+                return_value=mock.Mock())
+    def test_queue_check_resource_full_batch(self, rpc_client_method):
+        cfg.CONF.set_override('convergence_check_batch_size', 2)
+        worker_client = rpc_client.WorkerClient()
+        mock_cnxt = mock.Mock()
+        with mock.patch.object(worker_client, 'check_resources') as mock_crs:
+            for res_id in ('res-1', 'res-2', 'res-3'):
+                worker_client.queue_check_resource(mock_cnxt, 'stack-1',
+                                                   't-1', res_id, {}, True)
+            mock_crs.assert_called_once_with(
+                mock_cnxt, 'stack-1', 't-1',
+                [('res-1', True, {}), ('res-2', True, {})])
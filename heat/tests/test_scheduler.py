@@ -12,8 +12,10 @@
 #    under the License.
 
 import contextlib
+import itertools
 
 import eventlet
+import mock
 
 from heat.engine import dependencies
 from heat.engine import scheduler
@@ -400,6 +402,59 @@ class DependencyTaskGroupTest(common.HeatTestCase):
                                 run_tasks_with_exceptions, e1)
         self.assertEqual([e1], exc.exceptions)
 
+    def test_aggregate_exceptions_cancelled_task_not_started(self):
+        def run_tasks_with_exceptions(e1=None):
+            self.aggregate_exceptions = True
+            tasks = (('C', 'A'), ('C', 'B'))
+            with self._dep_test(*tasks) as dummy:
+                dummy.do_step(1, 'A').InAnyOrder('1').AndRaise(e1)
+                dummy.do_step(1, 'B').InAnyOrder('1')
+                dummy.do_step(2, 'B')
+                dummy.do_step(3, 'B')
+
+        e1 = Exception('e1')
+
+        exc = self.assertRaises(scheduler.ExceptionGroup,
+                                run_tasks_with_exceptions, e1)
+        self.assertEqual([e1], exc.exceptions)
+
+    def test_ready_queue(self):
+        deps = dependencies.Dependencies([('last', 'mid1'),
+                                          ('last', 'mid2'),
+                                          ('mid1', 'first'),
+                                          ('mid2', 'first')])
+        tg = scheduler.DependencyTaskGroup(deps, DummyTask(1))
+        self.assertEqual(['first'], list(tg._ready_queue))
+
+        runner = tg()
+        next(runner)
+        self.assertEqual(['first'], list(tg._active))
+        self.assertEqual([], list(tg._ready_queue))
+
+        next(runner)
+        self.assertEqual(set(['mid1', 'mid2']), set(tg._active))
+        self.assertNotIn('first', tg._graph)
+
+    def test_max_active(self):
+        deps = dependencies.Dependencies([('A', None), ('B', None),
+                                          ('C', None), ('D', 'A')])
+        tg = scheduler.DependencyTaskGroup(deps, DummyTask(2), max_active=2)
+
+        runner = tg()
+        next(runner)
+        self.assertEqual(2, len(tg._active))
+
+        started = set(tg._active)
+        while True:
+            self.assertTrue(len(tg._active) <= 2)
+            started.update(tg._active)
+            try:
+                next(runner)
+            except StopIteration:
+                break
+
+        self.assertEqual(set(['A', 'B', 'C', 'D']), started)
+
     def test_exception_grace_period(self):
         e1 = Exception('e1')
 
@@ -439,6 +494,163 @@ class DependencyTaskGroupTest(common.HeatTestCase):
         self.assertEqual(e1, exc)
 
 
+class ConcurrencyLimiterTest(common.HeatTestCase):
+
+    def _task(self, log, name, steps=2, exc=None):
+        for i in range(steps):
+            log.append(name)
+            yield
+        if exc is not None:
+            raise exc
+
+    def _run_all(self, runners, log):
+        for r in runners:
+            r.start()
+        while not all(r.done() for r in runners):
+            log.append('|')
+            for r in runners:
+                r.step()
+
+    def test_unlimited(self):
+        limiter = scheduler.ConcurrencyLimiter()
+        log = []
+        runners = [scheduler.TaskRunner(limiter.limit_task, 's',
+                                        self._task(log, str(i)))
+                   for i in range(3)]
+        self._run_all(runners, log)
+        self.assertEqual(['0', '1', '2', '|', '0', '1', '2', '|'], log)
+        self.assertEqual(0, limiter.in_use)
+
+    def test_limit_shared_fairly(self):
+        limiter = scheduler.ConcurrencyLimiter(2)
+        log = []
+        tasks = (('a', 'a0', 1), ('a', 'a1', 3), ('a', 'a2', 1),
+                 ('b', 'b0', 1))
+        runners = [scheduler.TaskRunner(limiter.limit_task, owner,
+                                        self._task(log, name, steps))
+                   for owner, name, steps in tasks]
+        self._run_all(runners, log)
+        self.assertEqual(['a0', 'a1', '|', 'a1', 'b0', '|', 'a1', '|',
+                          'a2', '|'], log)
+        self.assertEqual(0, limiter.in_use)
+
+    def test_cancel_waiting(self):
+        limiter = scheduler.ConcurrencyLimiter(1)
+        log = []
+        first = scheduler.TaskRunner(limiter.limit_task, 'a',
+                                     self._task(log, 'first'))
+        second = scheduler.TaskRunner(limiter.limit_task, 'b',
+                                      self._task(log, 'second'))
+        first.start()
+        second.start()
+        second.cancel()
+        first.cancel()
+        self.assertEqual(['first'], log)
+        self.assertEqual(0, limiter.in_use)
+
+        third = scheduler.TaskRunner(limiter.limit_task, 'c',
+                                     self._task(log, 'third'))
+        third.start()
+        self.assertEqual(['first', 'third'], log)
+
+    def test_over_limit_throttles(self):
+        limiter = scheduler.ConcurrencyLimiter(8)
+        log = []
+        exc = ValueError('Over limit')
+        runners = [scheduler.TaskRunner(limiter.limit_task, 's',
+                                        self._task(log, str(i), steps=1,
+                                                   exc=exc if i == 0
+                                                   else None),
+                                        lambda ex: ex is exc)
+                   for i in range(4)]
+        for r in runners:
+            r.start()
+
+        self.assertRaises(ValueError, runners[0].step)
+        self.assertEqual(2, limiter.window)
+        self.assertEqual(3, limiter.in_use)
+
+        for r in runners[1:]:
+            r.step()
+        self.assertEqual(5, limiter.window)
+        self.assertEqual(0, limiter.in_use)
+
+    def test_unlimited_not_throttled(self):
+        limiter = scheduler.ConcurrencyLimiter()
+        log = []
+        exc = ValueError('Over limit')
+        runner = scheduler.TaskRunner(limiter.limit_task, 's',
+                                      self._task(log, 'x', steps=1, exc=exc),
+                                      lambda ex: ex is exc)
+        runner.start()
+        self.assertRaises(ValueError, runner.step)
+        self.assertIsNone(limiter.window)
+
+        runners = [scheduler.TaskRunner(limiter.limit_task, 's',
+                                        self._task(log, str(i)))
+                   for i in range(3)]
+        log[:] = []
+        self._run_all(runners, log)
+        self.assertEqual(['0', '1', '2', '|', '0', '1', '2', '|'], log)
+
+    def test_other_error_does_not_throttle(self):
+        limiter = scheduler.ConcurrencyLimiter(4)
+        log = []
+        runner = scheduler.TaskRunner(limiter.limit_task, 's',
+                                      self._task(log, 'x', steps=1,
+                                                 exc=ValueError()),
+                                      lambda ex: False)
+        runner.start()
+        self.assertRaises(ValueError, runner.step)
+        self.assertEqual(4, limiter.window)
+        self.assertEqual(0, limiter.in_use)
+
+
+class PollingPolicyTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(PollingPolicyTest, self).setUp()
+        scheduler.counters.reset()
+
+    def _intervals(self, policy, count):
+        return list(itertools.islice(policy.intervals(), count))
+
+    def test_default_intervals(self):
+        policy = scheduler.PollingPolicy()
+        self.assertEqual([1, 1, 1, 1], self._intervals(policy, 4))
+
+    def test_backoff_intervals(self):
+        policy = scheduler.PollingPolicy(initial=1, factor=2, maximum=10)
+        self.assertEqual([1, 2, 4, 8, 10, 10], self._intervals(policy, 6))
+
+    def test_for_duration(self):
+        self.assertEqual(1, scheduler.PollingPolicy.for_duration(None).maximum)
+        self.assertEqual(1, scheduler.PollingPolicy.for_duration(5).maximum)
+        self.assertEqual(6, scheduler.PollingPolicy.for_duration(60).maximum)
+
+    def test_poll_complete_immediately(self):
+        check = mock.Mock(return_value=True)
+        runner = scheduler.TaskRunner(scheduler.PollingPolicy().poll, check)
+        runner.start()
+        self.assertTrue(runner.done())
+        self.assertEqual(1, check.call_count)
+        self.assertEqual(1, scheduler.counters.get('polls'))
+
+    def test_poll_backoff(self):
+        check = mock.Mock(side_effect=[False, False, False, True])
+        policy = scheduler.PollingPolicy(maximum=4)
+        runner = scheduler.TaskRunner(policy.poll, check, name='Test::Res')
+        runner.start()
+        steps = 0
+        while not runner.step():
+            steps += 1
+        self.assertEqual(6, steps)
+        self.assertEqual(4, check.call_count)
+        self.assertEqual(4, scheduler.counters.get('polls'))
+        self.assertEqual(4, scheduler.counters.get('polls.Test::Res'))
+        self.assertEqual(4, scheduler.counters.get('polls_skipped'))
+
+
 class TaskTest(common.HeatTestCase):
 
     def setUp(self):
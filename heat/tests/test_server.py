@@ -1432,6 +1432,21 @@ class ServersTest(common.HeatTestCase):
         server.metadata_update()
         self.assertEqual({'test': 456}, server.metadata_get())
 
+    def test_server_update_metadata_unchanged(self):
+        return_server = self.fc.servers.list()[1]
+        server = self._create_test_server(return_server,
+                                          'md_update')
+        server.metadata_set({'test': 123, 'deployments': []})
+
+        ud_tmpl = self._get_test_template('update_stack')[0]
+        ud_tmpl.t['Resources']['WebServer']['Metadata'] = {'test': 123}
+        server.t = ud_tmpl.resource_definitions(server.stack)['WebServer']
+        with mock.patch.object(server, 'metadata_set') as md_set:
+            server.metadata_update()
+            self.assertFalse(md_set.called)
+        self.assertEqual({'test': 123, 'deployments': []},
+                         server.metadata_get(refresh=True))
+
     def test_server_update_nova_metadata(self):
         return_server = self.fc.servers.list()[1]
         server = self._create_test_server(return_server,
@@ -27,13 +27,16 @@ from heat.common import template_format
 from heat.db import api as db_api
 from heat.engine.clients.os import keystone
 from heat.engine.clients.os import nova
+from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import stack
+from heat.engine import status_waiter
 from heat.engine import template
 from heat.objects import raw_template as raw_template_object
 from heat.objects import stack as stack_object
+from heat.objects import stack_lock as stack_lock_object
 from heat.objects import stack_tag as stack_tag_object
 from heat.objects import user_creds as ucreds_object
 from heat.tests import common
@@ -140,6 +143,29 @@ class StackTest(common.HeatTestCase):
                                                'test'))
         self.m.VerifyAll()
 
+    @mock.patch('heat.rpc.listener_client.EngineListenerClient')
+    @mock.patch.object(stack_lock_object.StackLock, 'get_engine_id')
+    @mock.patch.object(status_waiter, 'notify')
+    def test_state_set_notifies_parent_engine(self, mock_notify,
+                                              mock_get_engine, mock_client):
+        parent = stack.Stack(self.ctx, 'parent_stack', self.tmpl)
+        parent.store()
+        self.stack = stack.Stack(self.ctx, 'test_stack', self.tmpl,
+                                 owner_id=parent.id)
+        self.stack.store()
+        mock_get_engine.return_value = 'engine-007'
+
+        self.stack.state_set(stack.Stack.CREATE, stack.Stack.IN_PROGRESS,
+                             'test')
+        mock_notify.assert_called_once_with(self.stack.id)
+        self.assertFalse(mock_client.called)
+
+        self.stack.state_set(stack.Stack.CREATE, stack.Stack.COMPLETE, 'test')
+        mock_get_engine.assert_called_once_with(parent.id)
+        mock_client.assert_called_once_with('engine-007')
+        mock_client.return_value.notify_state_change.assert_called_once_with(
+            self.stack.context, self.stack.id)
+
     def test_state_bad(self):
         self.stack = stack.Stack(self.ctx, 'test_stack', self.tmpl,
                                  action=stack.Stack.CREATE,
@@ -189,6 +215,35 @@ class StackTest(common.HeatTestCase):
         self.assertEqual(1, self.stack.total_resources(self.stack.id))
         self.assertEqual(1, self.stack.total_resources())
 
+    def test_metadata_dependents(self):
+        tpl = {'HeatTemplateFormatVersion': '2012-12-12',
+               'Resources': {
+                   'A': {'Type': 'GenericResourceType'},
+                   'B': {'Type': 'GenericResourceType',
+                         'DependsOn': 'A'},
+                   'C': {'Type': 'GenericResourceType',
+                         'Metadata': {'b': {'Fn::GetAtt': ['B', 'foo']}}},
+                   'D': {'Type': 'GenericResourceType',
+                         'Metadata': {'a': {'Fn::GetAtt': ['A', 'foo']}}},
+                   'E': {'Type': 'GenericResourceType',
+                         'Metadata': {'a': {'Ref': 'A'}}},
+                   'F': {'Type': 'GenericResourceType',
+                         'Metadata': {'c': {'Fn::GetAtt': ['C', 'foo']}}}}}
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(tpl))
+        self.stack.store()
+        self.stack.create()
+        self.assertEqual((stack.Stack.CREATE, stack.Stack.COMPLETE),
+                         self.stack.state)
+
+        def dependents(name):
+            rsrcs = self.stack.metadata_dependents(self.stack[name])
+            return set(r.name for r in rsrcs)
+
+        self.assertEqual(set(['C', 'D', 'F']), dependents('A'))
+        self.assertEqual(set(['C', 'F']), dependents('B'))
+        self.assertEqual(set(), dependents('D'))
+
     def test_iter_resources(self):
         tpl = {'HeatTemplateFormatVersion': '2012-12-12',
                'Resources':
@@ -255,7 +310,7 @@ class StackTest(common.HeatTestCase):
         t = template.Template.load(self.ctx, stk.raw_template_id)
         self.m.StubOutWithMock(template.Template, 'load')
         template.Template.load(
-            self.ctx, stk.raw_template_id, stk.raw_template
+            self.ctx, stk.raw_template_id, stk.raw_template, templates=None
         ).AndReturn(t)
 
         self.m.StubOutWithMock(stack.Stack, '__init__')
@@ -276,7 +331,8 @@ class StackTest(common.HeatTestCase):
                              current_traversal=None,
                              tags=mox.IgnoreArg(),
                              prev_raw_template_id=None,
-                             current_deps=None, cache_data=None)
+                             current_deps=None, cache_data=None,
+                             stored_outputs=None)
 
         self.m.ReplayAll()
         stack.Stack.load(self.ctx, stack_id=self.stack.id)
@@ -977,6 +1033,86 @@ class StackTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_stack_create_concurrency_limited(self):
+        cfg.CONF.set_override('max_concurrent_resource_actions', 1)
+        cfg.CONF.set_override('max_concurrent_resource_actions_per_stack', 1)
+        self.patchobject(stack, '_action_limiter', new=None)
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'A': {'Type': 'GenericResourceType'},
+                    'B': {'Type': 'GenericResourceType'},
+                    'C': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'limited_stack',
+                                 template.Template(tmpl))
+        self.stack.store()
+        self.stack.create()
+
+        self.assertEqual((stack.Stack.CREATE, stack.Stack.COMPLETE),
+                         self.stack.state)
+        limiter = stack.resource_action_limiter()
+        self.assertEqual(1, limiter.limit)
+        self.assertEqual(0, limiter.in_use)
+
+    def _limited_action_stack(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {'A': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'limited_stack',
+                                 template.Template(tmpl))
+        limiter = scheduler.ConcurrencyLimiter(4)
+        self.patchobject(stack, '_action_limiter', new=limiter)
+        return limiter, self.stack['A']
+
+    def test_limit_resource_action_over_limit(self):
+        limiter, rsrc = self._limited_action_stack()
+        rsrc.default_client_name = 'nova'
+        plugin = mock.Mock()
+        plugin.is_over_limit.return_value = True
+        self.patchobject(rsrc, 'client_plugin', return_value=plugin)
+        exc = Exception('Over limit')
+
+        def failing_action():
+            raise exception.ResourceFailure(exc, rsrc, rsrc.CREATE)
+            yield
+
+        task = self.stack._limit_resource_action(rsrc, failing_action())
+        self.assertRaises(exception.ResourceFailure, next, task)
+        plugin.is_over_limit.assert_called_once_with(exc)
+        self.assertEqual(1, limiter.window)
+        self.assertEqual(0, limiter.in_use)
+
+    def test_limit_resource_action_over_limit_default_config(self):
+        self.patchobject(stack, '_action_limiter', new=None)
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {'A': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'unlimited_stack',
+                                 template.Template(tmpl))
+        rsrc = self.stack['A']
+        rsrc.default_client_name = 'nova'
+        plugin = mock.Mock()
+        plugin.is_over_limit.return_value = True
+        self.patchobject(rsrc, 'client_plugin', return_value=plugin)
+        exc = Exception('Over limit')
+
+        def failing_action():
+            raise exception.ResourceFailure(exc, rsrc, rsrc.CREATE)
+            yield
+
+        task = self.stack._limit_resource_action(rsrc, failing_action())
+        self.assertRaises(exception.ResourceFailure, next, task)
+        limiter = stack.resource_action_limiter()
+        self.assertIsNone(limiter.limit)
+        self.assertIsNone(limiter.window)
+
+    def test_limit_resource_action_nested_stack(self):
+        limiter, rsrc = self._limited_action_stack()
+        rsrc.nested = mock.Mock()
+
+        def action():
+            yield
+
+        task = action()
+        self.assertIs(task, self.stack._limit_resource_action(rsrc, task))
+
     def test_stack_name_valid(self):
         stk = stack.Stack(self.ctx, 's', self.tmpl)
         self.assertIsInstance(stk, stack.Stack)
@@ -1438,6 +1574,162 @@ class StackTest(common.HeatTestCase):
         self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
                          self.stack.state)
 
+    def test_outputs_stored(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'Resource_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Foo']}},
+                    'Bad_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Bar']}}}}
+
+        self.stack = stack.Stack(self.ctx, 'stack_with_stored_outputs',
+                                 template.Template(tmpl))
+
+        self.stack.store()
+        self.stack.create()
+
+        self.assertEqual((stack.Stack.CREATE, stack.Stack.COMPLETE),
+                         self.stack.state)
+        expected = {
+            'Resource_attr': {'value': 'AResource', 'error_msg': None},
+            'Bad_attr': {'value': None,
+                         'error_msg': 'The Referenced Attribute '
+                                      '(AResource Bar) is incorrect.'}}
+        self.assertEqual(expected, self.stack.stored_outputs)
+
+        loaded_stack = stack.Stack.load(self.ctx, self.stack.id)
+        self.assertEqual(expected, loaded_stack.stored_outputs)
+
+        self.stack.delete()
+
+        self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.assertIsNone(self.stack.stored_outputs)
+
+    def test_store_outputs(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'Resource_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Foo']}}}}
+
+        self.stack = stack.Stack(self.ctx, 'stack_with_stored_outputs',
+                                 template.Template(tmpl))
+        self.stack.store()
+        self.patchobject(self.stack, 'output', return_value='new')
+
+        self.stack.store_outputs()
+
+        expected = {'Resource_attr': {'value': 'new', 'error_msg': None}}
+        self.assertEqual(expected, self.stack.stored_outputs)
+        loaded_stack = stack.Stack.load(self.ctx, self.stack.id)
+        self.assertEqual(expected, loaded_stack.stored_outputs)
+
+    def test_store_outputs_encrypted(self):
+        cfg.CONF.set_override('encrypt_parameters_and_properties', True)
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'Resource_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Foo']}}}}
+
+        self.stack = stack.Stack(self.ctx, 'stack_with_stored_outputs',
+                                 template.Template(tmpl))
+        self.stack.store()
+        self.patchobject(self.stack, 'output', return_value='secret')
+
+        self.stack.store_outputs()
+
+        db_stack = db_api.stack_get(self.ctx, self.stack.id)
+        self.assertTrue(db_stack.outputs_encrypted)
+        self.assertEqual('oslo_decrypt_v1',
+                         db_stack.outputs['Resource_attr'][0])
+        self.assertNotIn('secret', db_stack.outputs['Resource_attr'][1])
+        expected = {'Resource_attr': {'value': 'secret', 'error_msg': None}}
+        loaded_stack = stack.Stack.load(self.ctx, self.stack.id)
+        self.assertEqual(expected, loaded_stack.stored_outputs)
+
+    def test_nested_stack_outputs_not_stored(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'Resource_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Foo']}}}}
+
+        parent = stack.Stack(self.ctx, 'parent_stack',
+                             template.Template(tmpl))
+        parent.store()
+        self.stack = stack.Stack(self.ctx, 'nested_stack',
+                                 template.Template(tmpl),
+                                 owner_id=parent.id)
+        self.stack.store()
+        mock_store = self.patchobject(self.stack, 'store_outputs')
+        self.stack.create()
+
+        self.assertEqual((stack.Stack.CREATE, stack.Stack.COMPLETE),
+                         self.stack.state)
+        self.assertFalse(mock_store.called)
+        self.assertIsNone(self.stack.stored_outputs)
+
+    def test_outputs_stored_after_update(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'Resource_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Foo']}}}}
+        self.stack = stack.Stack(self.ctx, 'stack_with_stored_outputs',
+                                 template.Template(tmpl))
+        self.stack.store()
+        self.stack.create()
+
+        new_tmpl = copy.deepcopy(tmpl)
+        new_tmpl['Outputs']['Resource_ref'] = {'Value': {'Ref': 'AResource'}}
+        updated_stack = stack.Stack(self.ctx, 'updated_stack',
+                                    template.Template(new_tmpl))
+        self.stack.update(updated_stack)
+
+        self.assertEqual((stack.Stack.UPDATE, stack.Stack.COMPLETE),
+                         self.stack.state)
+        expected = {
+            'Resource_attr': {'value': 'AResource', 'error_msg': None},
+            'Resource_ref': {'value': 'AResource', 'error_msg': None}}
+        self.assertEqual(expected, self.stack.stored_outputs)
+        loaded_stack = stack.Stack.load(self.ctx, self.stack.id)
+        self.assertEqual(expected, loaded_stack.stored_outputs)
+
+    def test_state_set_clears_outputs(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'Resource_attr': {
+                        'Value': {
+                            'Fn::GetAtt': ['AResource', 'Foo']}}}}
+        self.stack = stack.Stack(self.ctx, 'stack_with_stored_outputs',
+                                 template.Template(tmpl))
+        self.stack.store()
+        self.stack.store_outputs()
+        mock_store = self.patchobject(self.stack, 'store_outputs')
+
+        self.stack.state_set(self.stack.CHECK, self.stack.COMPLETE, 'done')
+
+        self.assertFalse(mock_store.called)
+        self.assertIsNone(self.stack.stored_outputs)
+        loaded_stack = stack.Stack.load(self.ctx, self.stack.id)
+        self.assertIsNone(loaded_stack.stored_outputs)
+
     def test_incorrect_outputs(self):
         tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
                 'Resources': {
@@ -2047,12 +2339,14 @@ class StackTest(common.HeatTestCase):
         tmpl_stack.action = tmpl_stack.CREATE
         tmpl_stack.status = tmpl_stack.IN_PROGRESS
         tmpl_stack.current_traversal = 'some-traversal'
+        mock_outputs = self.patchobject(tmpl_stack, 'store_outputs')
         tmpl_stack.mark_complete('some-traversal')
         self.assertEqual(tmpl_stack.prev_raw_template_id,
                          None)
         self.assertFalse(mock_tmpl_delete.called)
         self.assertFalse(mock_stack_delete.called)
         self.assertEqual(tmpl_stack.status, tmpl_stack.COMPLETE)
+        mock_outputs.assert_called_once_with()
 
     @mock.patch.object(stack_object.Stack, 'delete')
     @mock.patch.object(raw_template_object.RawTemplate, 'delete')
@@ -2073,12 +2367,14 @@ class StackTest(common.HeatTestCase):
         tmpl_stack.action = tmpl_stack.UPDATE
         tmpl_stack.status = tmpl_stack.IN_PROGRESS
         tmpl_stack.current_traversal = 'some-traversal'
+        mock_outputs = self.patchobject(tmpl_stack, 'store_outputs')
         tmpl_stack.mark_complete('some-traversal')
         self.assertEqual(tmpl_stack.prev_raw_template_id,
                          None)
         self.assertFalse(mock_stack_delete.called)
         mock_tmpl_delete.assert_called_once_with(self.ctx, 1)
         self.assertEqual(tmpl_stack.status, tmpl_stack.COMPLETE)
+        mock_outputs.assert_called_once_with()
 
     @mock.patch.object(stack_object.Stack, 'delete')
     @mock.patch.object(raw_template_object.RawTemplate, 'delete')
@@ -2208,3 +2504,41 @@ class StackKwargsForCloningTest(common.HeatTestCase):
             # just make sure that the kwargs are valid
             # (no exception should be raised)
             stack.Stack(ctx, utils.random_name(), tmpl, **res)
+
+
+class ConvergenceDependenciesScaleTest(common.HeatTestCase):
+    '''
+    Microbenchmark of calculating convergence dependencies for an update of
+    a large stack.
+
+    If each existing resource costs a sort of the whole graph, an update of
+    this size takes minutes; in linear time it takes well under a second.
+    '''
+
+    num_resources = 10000
+
+    def setUp(self):
+        super(ConvergenceDependenciesScaleTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.stack = stack.Stack(self.ctx, 'scale_test_stack',
+                                 template.Template(
+                                     copy.deepcopy(empty_template)))
+
+    def test_update_all_resources(self):
+        FakeResource = collections.namedtuple('FakeResource',
+                                              ['id', 'requires', 'replaces'])
+        rsrcs = [FakeResource(i, (i - 1,) if i else (), None)
+                 for i in range(self.num_resources)]
+        existing = dict((r.id, r) for r in rsrcs)
+        edges = [(rsrcs[i], rsrcs[i - 1] if i else None)
+                 for i in range(self.num_resources)]
+        curr_deps = dependencies.Dependencies(edges)
+
+        deps = self.stack._convergence_dependencies(existing, curr_deps)
+
+        graph = deps.graph()
+        self.assertEqual(2 * self.num_resources, len(graph))
+        last = self.num_resources - 1
+        self.assertEqual(set([(last - 1, True)]), set(graph[(last, True)]))
+        self.assertEqual(set([(last, True)]), set(graph[(last, False)]))
+        self.assertEqual(set([(0, True), (1, False)]), set(graph[(0, False)]))
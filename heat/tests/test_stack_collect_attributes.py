@@ -11,9 +11,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
 import six
 
 from heat.common import template_format
+from heat.engine import function
 from heat.engine import stack
 from heat.engine import template
 from heat.tests import common
@@ -178,3 +180,26 @@ class DepAttrsTest(common.HeatTestCase):
             self.assertEqual(self.expected[res.name],
                              self.stack.get_dep_attrs(resources, outputs,
                                                       res.name))
+
+    def test_template_dep_attrs(self):
+        parsed_tmpl = template_format.parse(self.tmpl)
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(parsed_tmpl))
+
+        for res in six.itervalues(self.stack.resources):
+            self.assertEqual(self.expected[res.name],
+                             self.stack.t.dep_attrs(self.stack, res.name))
+
+    def test_template_dep_attrs_index_built_once(self):
+        parsed_tmpl = template_format.parse(self.tmpl)
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(parsed_tmpl))
+
+        with mock.patch.object(function, 'all_dep_attrs',
+                               wraps=function.all_dep_attrs) as mock_all:
+            for res in six.itervalues(self.stack.resources):
+                self.stack.t.dep_attrs(self.stack, res.name)
+            calls = mock_all.call_count
+            for res in six.itervalues(self.stack.resources):
+                self.stack.t.dep_attrs(self.stack, res.name)
+            self.assertEqual(calls, mock_all.call_count)
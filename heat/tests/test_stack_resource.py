@@ -24,7 +24,9 @@ from heat.common import template_format
 from heat.engine import resource
 from heat.engine.resources import stack_resource
 from heat.engine import stack as parser
+from heat.engine import status_waiter
 from heat.engine import template as templatem
+from heat.objects import stack as stack_object
 from heat.tests import common
 from heat.tests import generic_resource as generic_rsrc
 from heat.tests import utils
@@ -707,75 +709,109 @@ class StackResourceCheckCompleteTest(StackResourceBaseTest):
 
     def setUp(self):
         super(StackResourceCheckCompleteTest, self).setUp()
-        self.nested = mock.MagicMock()
-        self.nested.name = 'nested-stack'
-        self.parent_resource.nested = mock.MagicMock(return_value=self.nested)
-        self.parent_resource._nested = self.nested
-        setattr(self.nested, self.action.upper(), self.action.upper())
-        self.nested.action = self.action.upper()
-        self.nested.COMPLETE = 'COMPLETE'
+        self.parent_resource.resource_id = 'nested-stack-id'
+        self.status = [self.action.upper(), None, '', 'test']
+        self.mock_status = self.patchobject(stack_object.Stack, 'get_status')
+        self.mock_status.side_effect = lambda *a, **kw: tuple(self.status)
+
+    def _assert_status_queried(self):
+        self.mock_status.assert_called_once_with(
+            self.parent_resource.context, 'nested-stack-id',
+            show_deleted=self.show_deleted)
 
     def test_state_ok(self):
         """
         check_create_complete should return True create task is
         done and the nested stack is in (<action>,COMPLETE) state.
         """
-        self.nested.status = 'COMPLETE'
+        self.status[1] = 'COMPLETE'
         complete = getattr(self.parent_resource,
                            'check_%s_complete' % self.action)
         self.assertIs(True, complete(None))
-        self.parent_resource.nested.assert_called_once_with(
-            show_deleted=self.show_deleted, force_reload=True)
+        self._assert_status_queried()
 
     def test_state_err(self):
         """
         check_create_complete should raise error when create task is
         done but the nested stack is not in (<action>,COMPLETE) state
         """
-        self.nested.status = 'FAILED'
+        self.status[1] = 'FAILED'
         reason = ('Resource %s failed: ValueError: '
                   'resources.%s: broken on purpose' % (
                       self.action.upper(),
                       'child_res'))
         exp_path = 'resources.test.resources.child_res'
         exp = 'ValueError: %s: broken on purpose' % exp_path
-        self.nested.status_reason = reason
+        self.status[2] = reason
         complete = getattr(self.parent_resource,
                            'check_%s_complete' % self.action)
         exc = self.assertRaises(exception.ResourceFailure, complete, None)
         self.assertEqual(exp, six.text_type(exc))
-        self.parent_resource.nested.assert_called_once_with(
-            show_deleted=self.show_deleted, force_reload=True)
+        self._assert_status_queried()
 
     def test_state_unknown(self):
         """
         check_create_complete should raise error when create task is
         done but the nested stack is not in (<action>,COMPLETE) state
         """
-        self.nested.status = 'WTF'
-        self.nested.status_reason = 'broken on purpose'
+        self.status[1] = 'WTF'
+        self.status[2] = 'broken on purpose'
         complete = getattr(self.parent_resource,
                            'check_%s_complete' % self.action)
         self.assertRaises(resource.ResourceUnknownStatus, complete, None)
-        self.parent_resource.nested.assert_called_once_with(
-            show_deleted=self.show_deleted, force_reload=True)
+        self._assert_status_queried()
 
     def test_in_progress(self):
-        self.nested.status = 'IN_PROGRESS'
+        self.status[1] = 'IN_PROGRESS'
+        complete = getattr(self.parent_resource,
+                           'check_%s_complete' % self.action)
+        self.assertFalse(complete(None))
+        self._assert_status_queried()
+
+    def test_in_progress_waits_for_notification(self):
+        self.status[1] = 'IN_PROGRESS'
+        complete = getattr(self.parent_resource,
+                           'check_%s_complete' % self.action)
+        self.assertFalse(complete(None))
+        self.assertFalse(complete(None))
+        self._assert_status_queried()
+
+        self.status[1] = 'COMPLETE'
+        status_waiter.notify('nested-stack-id')
+        self.assertIs(True, complete(None))
+        self.assertEqual(2, self.mock_status.call_count)
+
+    def test_in_progress_fallback_check(self):
+        self.status[1] = 'IN_PROGRESS'
         complete = getattr(self.parent_resource,
                            'check_%s_complete' % self.action)
         self.assertFalse(complete(None))
-        self.parent_resource.nested.assert_called_once_with(
-            show_deleted=self.show_deleted, force_reload=True)
+        self.status[1] = 'COMPLETE'
+        for i in range(status_waiter.FALLBACK_POLL_STEPS):
+            self.assertFalse(complete(None))
+        self.assertEqual(1, self.mock_status.call_count)
+        self.assertIs(True, complete(None))
+        self.assertEqual(2, self.mock_status.call_count)
+
+    def test_not_found(self):
+        self.mock_status.side_effect = exception.NotFound
+        complete = getattr(self.parent_resource,
+                           'check_%s_complete' % self.action)
+        self.assertEqual(self.action == 'delete', complete(None))
+
+    def test_no_nested_stack(self):
+        self.parent_resource.resource_id = None
+        complete = getattr(self.parent_resource,
+                           'check_%s_complete' % self.action)
+        self.assertIs(True, complete(None))
+        self.assertFalse(self.mock_status.called)
 
     def test_update_not_started(self):
         if self.action != 'update':
             # only valid for updates at the moment.
             return
 
-        self.nested.status = 'COMPLETE'
-        self.nested.state = ('UPDATE', 'COMPLETE')
-        self.nested.updated_time = 'test'
+        self.status[1] = 'COMPLETE'
         cookie = {'previous': {'state': ('UPDATE', 'COMPLETE'),
                                'updated_at': 'test'}}
 
@@ -783,16 +819,14 @@ class StackResourceCheckCompleteTest(StackResourceBaseTest):
                            'check_%s_complete' % self.action)
 
         self.assertFalse(complete(cookie=cookie))
-        self.parent_resource.nested.assert_called_once_with(
-            show_deleted=self.show_deleted, force_reload=True)
+        self._assert_status_queried()
 
     def test_wrong_action(self):
-        self.nested.action = 'COMPLETE'
+        self.status[0] = 'COMPLETE'
         complete = getattr(self.parent_resource,
                            'check_%s_complete' % self.action)
         self.assertFalse(complete(None))
-        self.parent_resource.nested.assert_called_once_with(
-            show_deleted=self.show_deleted, force_reload=True)
+        self._assert_status_queried()
 
 
 class WithTemplateTest(StackResourceBaseTest):
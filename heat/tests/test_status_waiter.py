@@ -0,0 +1,53 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from heat.engine import status_waiter
+from heat.tests import common
+
+
+class StatusWaiterTest(common.HeatTestCase):
+
+    def test_first_check(self):
+        waiter = status_waiter.StatusWaiter('stack-1')
+        self.addCleanup(waiter.close)
+        self.assertTrue(waiter.should_check())
+        self.assertFalse(waiter.should_check())
+
+    def test_notify(self):
+        waiter = status_waiter.StatusWaiter('stack-1')
+        self.addCleanup(waiter.close)
+        other = status_waiter.StatusWaiter('stack-2')
+        self.addCleanup(other.close)
+        waiter.should_check()
+        other.should_check()
+
+        status_waiter.notify('stack-1')
+        self.assertTrue(waiter.should_check())
+        self.assertFalse(waiter.should_check())
+        self.assertFalse(other.should_check())
+
+    def test_fallback(self):
+        waiter = status_waiter.StatusWaiter('stack-1', fallback_steps=2)
+        self.addCleanup(waiter.close)
+        self.assertTrue(waiter.should_check())
+        self.assertFalse(waiter.should_check())
+        self.assertFalse(waiter.should_check())
+        self.assertTrue(waiter.should_check())
+
+    def test_close(self):
+        waiter = status_waiter.StatusWaiter('stack-1')
+        waiter.should_check()
+        waiter.close()
+        self.assertNotIn('stack-1', status_waiter._waiters)
+        status_waiter.notify('stack-1')
+        self.assertFalse(waiter.should_check())
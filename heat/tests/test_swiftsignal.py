@@ -13,6 +13,7 @@
 
 import copy
 import datetime
+import hashlib
 import json
 import uuid
 
@@ -27,6 +28,7 @@ from heat.common import exception
 from heat.common import template_format
 from heat.engine.clients.os import swift
 from heat.engine import resource
+from heat.engine.resources.openstack.heat import swiftsignal
 from heat.engine import rsrc_defn
 from heat.engine import scheduler
 from heat.engine import stack
@@ -102,17 +104,58 @@ def create_stack(template, stack_id=None):
 def cont_index(obj_name, num_version_hist):
     objects = [{'bytes': 11,
                 'last_modified': '2014-07-03T19:42:03.281640',
-                'hash': '9214b4e4460fcdb9f3a369941400e71e',
-                'name': "02b" + obj_name + '/1404416326.51383',
-                'content_type': 'application/octet-stream'}] * num_version_hist
+                'hash': '9214b4e4460fcdb9f3a369941400e7%02x' % v,
+                'name': "02b" + obj_name + '/1404416326.513%02d' % v,
+                'content_type': 'application/octet-stream'}
+               for v in six.moves.xrange(num_version_hist)]
     objects.append({'bytes': 8,
                     'last_modified': '2014-07-03T19:42:03.849870',
-                    'hash': '9ab7c0738852d7dd6a2dc0b261edc300',
+                    'hash': '9ab7c0738852d7dd6a2dc0b261edc3%02x' % (
+                        num_version_hist),
                     'name': obj_name,
                     'content_type': 'application/x-www-form-urlencoded'})
     return (container_header, objects)
 
 
+class FakeSwiftClient(object):
+    """An in-memory Swift client supporting object versioning."""
+
+    url = "http://fake-host.com:8080/v1/AUTH_1234"
+
+    def __init__(self):
+        self.containers = {}
+        self.get_container_calls = 0
+        self.get_object_calls = 0
+        self._timestamp = 1404416326
+
+    def head_account(self):
+        return {'x-account-meta-temp-url-key': '123456'}
+
+    def put_container(self, container, headers=None):
+        self.containers.setdefault(container, {})
+
+    def put_object(self, container, name, body):
+        objects = self.containers[container]
+        if name in objects:
+            self._timestamp += 1
+            version = '%03x%s/%d' % (len(name), name, self._timestamp)
+            objects[version] = objects[name]
+        objects[name] = body
+
+    def get_container(self, container):
+        self.get_container_calls += 1
+        if container not in self.containers:
+            raise swiftclient_client.ClientException("Container GET failed",
+                                                     http_status=404)
+        index = [{'name': name, 'hash': hashlib.md5(six.b(body)).hexdigest()}
+                 for name, body in sorted(self.containers[container].items())]
+        return (container_header, index)
+
+    def get_object(self, container, name):
+        self.get_object_calls += 1
+        return (obj_header, self.containers[container][name])
+
+
 class SwiftSignalHandleTest(common.HeatTestCase):
     def setUp(self):
         super(SwiftSignalHandleTest, self).setUp()
@@ -351,12 +394,16 @@ class SwiftSignalTest(common.HeatTestCase):
         }
         obj_name = "%s-%s-abcdefghijkl" % (st.name, handle.name)
         mock_name.return_value = obj_name
-        mock_swift_object.get_container.return_value = cont_index(obj_name, 2)
+        mock_swift_object.get_container.side_effect = (
+            cont_index(obj_name, 2),
+            cont_index(obj_name, 4),
+        )
         mock_swift_object.get_object.side_effect = (
             (obj_header, json.dumps({'id': 1})),
             (obj_header, json.dumps({'id': 1})),
             (obj_header, json.dumps({'id': 1})),
 
+            # Only new objects are fetched
             (obj_header, json.dumps({'id': 1})),
             (obj_header, json.dumps({'id': 2})),
             (obj_header, json.dumps({'id': 3})),
@@ -443,12 +490,6 @@ class SwiftSignalTest(common.HeatTestCase):
                                      'reason': "foo"})),
             (obj_header, json.dumps({'id': 2, 'status': "FAILURE",
                                      'reason': "bar"})),
-
-            # SwiftSignalFailure
-            (obj_header, json.dumps({'id': 1, 'status': "FAILURE",
-                                     'reason': "foo"})),
-            (obj_header, json.dumps({'id': 2, 'status': "FAILURE",
-                                     'reason': "bar"})),
         )
 
         st.create()
@@ -478,11 +519,6 @@ class SwiftSignalTest(common.HeatTestCase):
             (obj_header, json.dumps({'id': 1, 'data': "foo"})),
             (obj_header, json.dumps({'id': 2, 'data': "bar"})),
             (obj_header, json.dumps({'id': 3, 'data': "baz"})),
-
-            # FnGetAtt call
-            (obj_header, json.dumps({'id': 1, 'data': "foo"})),
-            (obj_header, json.dumps({'id': 2, 'data': "bar"})),
-            (obj_header, json.dumps({'id': 3, 'data': "baz"})),
         )
 
         st.create()
@@ -513,12 +549,6 @@ class SwiftSignalTest(common.HeatTestCase):
                                      'status': "SUCCESS"})),
             (obj_header, json.dumps({'data': "dog", 'reason': "cat",
                                      'status': "SUCCESS"})),
-
-            # FnGetAtt call
-            (obj_header, json.dumps({'data': "foo", 'reason': "bar",
-                                     'status': "SUCCESS"})),
-            (obj_header, json.dumps({'data': "dog", 'reason': "cat",
-                                     'status': "SUCCESS"})),
         )
 
         st.create()
@@ -546,10 +576,6 @@ class SwiftSignalTest(common.HeatTestCase):
             # st create
             (obj_header, ''),
             (obj_header, ''),
-
-            # FnGetAtt call
-            (obj_header, ''),
-            (obj_header, ''),
         )
 
         st.create()
@@ -884,3 +910,103 @@ class SwiftSignalTest(common.HeatTestCase):
 
         st.create()
         self.assertEqual(('CREATE', 'COMPLETE'), st.state)
+
+
+class SignallingSwiftClient(FakeSwiftClient):
+    """A fake Swift client where each handle is signalled on creation."""
+
+    def put_object(self, container, name, body):
+        super(SignallingSwiftClient, self).put_object(container, name, body)
+        if body == swift.IN_PROGRESS:
+            super(SignallingSwiftClient, self).put_object(
+                container, name, json.dumps({'id': 1, 'data': name}))
+
+
+class SignalPollerTest(common.HeatTestCase):
+    def setUp(self):
+        super(SignalPollerTest, self).setUp()
+        self.client = FakeSwiftClient()
+        self.client.put_container('cont')
+        self.client_plugin = mock.Mock()
+        self.client_plugin.client.return_value = self.client
+        self.poller = swiftsignal.SignalPoller('cont')
+
+    def test_poll_fetches_new_objects(self):
+        self.client.put_object('cont', 'handle', swift.IN_PROGRESS)
+        self.client.put_object('cont', 'handle', json.dumps({'id': 1}))
+        self.poller.poll(self.client_plugin)
+        self.assertEqual([None, {'id': 1}],
+                         [body for name, body in self.poller.objects])
+        self.assertEqual(2, self.client.get_object_calls)
+
+        self.client.put_object('cont', 'handle', json.dumps({'id': 2}))
+        self.poller.poll(self.client_plugin)
+        self.assertEqual([None, {'id': 1}, {'id': 2}],
+                         [body for name, body in self.poller.objects])
+        self.assertEqual(4, self.client.get_object_calls)
+
+        self.poller.poll(self.client_plugin)
+        self.assertEqual(3, len(self.poller.objects))
+        self.assertEqual(4, self.client.get_object_calls)
+        self.assertEqual(3, self.client.get_container_calls)
+
+    def test_poll_container_deleted(self):
+        self.client.put_object('cont', 'handle', json.dumps({'id': 1}))
+        self.poller.poll(self.client_plugin)
+        self.assertEqual(1, len(self.poller.objects))
+
+        del self.client.containers['cont']
+        self.poller.poll(self.client_plugin)
+        self.assertIsNone(self.poller.objects)
+
+    def test_poll_invalid_json(self):
+        self.client.put_object('cont', 'handle', '{"status": "FAI')
+        self.poller.poll(self.client_plugin)
+        name, body = self.poller.objects[0]
+        self.assertIsInstance(body, exception.Error)
+
+    def test_is_stale(self):
+        self.assertTrue(self.poller.is_stale(0))
+        self.poller.poll(self.client_plugin)
+        self.assertTrue(self.poller.is_stale(1))
+        self.assertFalse(self.poller.is_stale(0))
+
+        timeutils.set_time_override(self.poller.polled_at)
+        self.addCleanup(timeutils.clear_time_override)
+        timeutils.advance_time_seconds(swiftsignal.POLL_INTERVAL + 1)
+        self.assertTrue(self.poller.is_stale(0))
+
+    @mock.patch.object(swift.SwiftClientPlugin, '_create')
+    def test_signals_share_poller(self, mock_swift):
+        tmpl = template_format.parse(swiftsignal_template)
+        resources = tmpl['resources']
+        resources['test_wait_condition']['properties']['count'] = 1
+        resources['test_wait_condition_2'] = copy.deepcopy(
+            resources['test_wait_condition'])
+        resources['test_wait_condition_2']['properties']['handle'] = {
+            'get_resource': 'test_wait_condition_handle_2'}
+        resources['test_wait_condition_handle_2'] = copy.deepcopy(
+            resources['test_wait_condition_handle'])
+        st = create_stack(json.dumps(tmpl))
+
+        client = SignallingSwiftClient()
+        mock_swift.return_value = client
+
+        st.create()
+        self.assertEqual(('CREATE', 'COMPLETE'), st.state)
+        wc1 = st['test_wait_condition']
+        wc2 = st['test_wait_condition_2']
+        self.assertIs(wc1._signal_poller(), wc2._signal_poller())
+
+        # Both signals were found in a single listing of the container,
+        # and each object was fetched only once
+        self.assertEqual(1, client.get_container_calls)
+        self.assertEqual(4, client.get_object_calls)
+
+        data1 = json.loads(wc1.FnGetAtt('data'))
+        data2 = json.loads(wc2.FnGetAtt('data'))
+        self.assertEqual(st['test_wait_condition_handle'].resource_id,
+                         data1['1'])
+        self.assertEqual(st['test_wait_condition_handle_2'].resource_id,
+                         data2['1'])
+        self.assertEqual(4, client.get_object_calls)
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import eventlet
 import mock
 
 from heat.engine import sync_point
@@ -42,6 +43,21 @@ class SyncPointTestCase(common.HeatTestCase):
         self.assertEqual({sender: None}, input_data)
         self.assertFalse(mock_callback.called)
 
+    def test_create_all(self):
+        ctx = utils.dummy_context()
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.store()
+        traversal = 'test-traversal'
+        sync_point.create_all(ctx, [(1, True), (2, False), (stack.id, True)],
+                              traversal, stack.id)
+
+        for entity_id, is_update in [(1, True), (2, False), (stack.id, True)]:
+            created = sync_point.get(ctx, entity_id, traversal, is_update)
+            self.assertEqual(stack.id, created.stack_id)
+            self.assertEqual(0, created.atomic_key)
+
     def test_sync_non_waiting(self):
         ctx = utils.dummy_context()
         stack = tools.get_stack('test_stack', utils.dummy_context(),
@@ -66,3 +82,170 @@ class SyncPointTestCase(common.HeatTestCase):
     def test_serialize_input_data(self):
         res = sync_point.serialize_input_data({(3L, 8): None})
         self.assertEqual({'input_data': [[[3L, 8], None]]}, res)
+
+    @mock.patch.object(sync_point.eventlet, 'sleep')
+    @mock.patch.object(sync_point, 'update_input_data')
+    @mock.patch.object(sync_point, 'get')
+    def test_sync_retries_conflicting_update(self, mock_get, mock_update,
+                                             mock_sleep):
+        ctx = utils.dummy_context()
+        mock_get.return_value = mock.Mock(atomic_key=0, input_data={})
+        mock_update.side_effect = [0, 0, 1]
+        mock_callback = mock.Mock()
+        retries = sync_point.counters.get('retries')
+
+        sync_point.sync(ctx, 'entity', 'traversal', True, mock_callback,
+                        {(1, True)}, {(1, True): None})
+
+        self.assertEqual(3, mock_update.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+        self.assertEqual(retries + 2, sync_point.counters.get('retries'))
+        self.assertTrue(mock_callback.called)
+
+    @mock.patch.object(sync_point.eventlet, 'sleep')
+    @mock.patch.object(sync_point, 'update_input_data')
+    @mock.patch.object(sync_point, 'get')
+    def test_sync_retry_limit(self, mock_get, mock_update, mock_sleep):
+        ctx = utils.dummy_context()
+        sync_point.cfg.CONF.set_override('sync_point_retry_limit', 3)
+        mock_get.return_value = mock.Mock(atomic_key=0, input_data={})
+        mock_update.return_value = 0
+        mock_callback = mock.Mock()
+
+        self.assertRaises(sync_point.SyncPointUpdateFailed,
+                          sync_point.sync, ctx, 'entity', 'traversal', True,
+                          mock_callback, {(1, True)}, {(1, True): None})
+        self.assertEqual(4, mock_update.call_count)
+        self.assertFalse(mock_callback.called)
+        self.assertEqual({}, sync_point._pending_updates)
+
+    @mock.patch.object(sync_point, 'update_input_data')
+    @mock.patch.object(sync_point, 'get')
+    def test_sync_coalesces_concurrent_updates(self, mock_get, mock_update):
+        ctx = utils.dummy_context()
+        stored = {}
+        predecessors = {(1, True), (2, True), (3, True)}
+        mock_callback = mock.Mock()
+        senders = []
+
+        def get(cnxt, entity_id, traversal_id, is_update):
+            return mock.Mock(atomic_key=0,
+                             input_data=sync_point.serialize_input_data(
+                                 stored))
+
+        def update(cnxt, entity_id, traversal_id, is_update, atomic_key,
+                   input_data):
+            if not stored:
+                # Other predecessors arrive while the first write is in
+                # progress
+                for sender in ((2, True), (3, True)):
+                    senders.append(eventlet.spawn(
+                        sync_point.sync, ctx, 'entity', 'traversal', True,
+                        mock_callback, predecessors, {sender: None}))
+                eventlet.sleep(0)
+            stored.update(sync_point.deserialize_input_data(input_data))
+            return 1
+
+        mock_get.side_effect = get
+        mock_update.side_effect = update
+
+        sync_point.sync(ctx, 'entity', 'traversal', True, mock_callback,
+                        predecessors, {(1, True): None})
+        for sender in senders:
+            sender.wait()
+
+        self.assertEqual(2, mock_update.call_count)
+        self.assertEqual(predecessors, set(stored))
+        self.assertEqual(1, mock_callback.call_count)
+        entity_id, data = mock_callback.call_args[0]
+        self.assertEqual('entity', entity_id)
+        self.assertEqual(stored, sync_point.deserialize_input_data(data))
+        self.assertEqual({}, sync_point._pending_updates)
+
+    def _mock_sync_point(self, mock_get, mock_update, stored, fail):
+        def get(cnxt, entity_id, traversal_id, is_update):
+            return mock.Mock(atomic_key=0,
+                             input_data=sync_point.serialize_input_data(
+                                 stored))
+
+        def update(cnxt, entity_id, traversal_id, is_update, atomic_key,
+                   input_data):
+            data = sync_point.deserialize_input_data(input_data)
+            if fail(data):
+                return 0
+            stored.update(data)
+            return 1
+
+        mock_get.side_effect = get
+        mock_update.side_effect = update
+
+    def _sync_in_thread(self, ctx, callback, predecessors, sender):
+        thread = eventlet.spawn(sync_point.sync, ctx, 'entity', 'traversal',
+                                True, callback, predecessors, {sender: None})
+        # Let it hand its data over to the update in progress
+        eventlet.sleep(0)
+        return thread
+
+    @mock.patch.object(sync_point, 'update_input_data')
+    @mock.patch.object(sync_point, 'get')
+    def test_sync_coalesced_update_fails(self, mock_get, mock_update):
+        ctx = utils.dummy_context()
+        sync_point.cfg.CONF.set_override('sync_point_retry_limit', 0)
+        stored = {}
+        predecessors = {(1, True), (2, True), (3, True)}
+        mock_callback = mock.Mock()
+        senders = []
+        coalesced = sync_point.counters.get('coalesced')
+
+        def fail(data):
+            if senders:
+                return False
+            # Another predecessor hands its data over while the first write
+            # is in progress, and the write fails
+            senders.append(self._sync_in_thread(ctx, mock_callback,
+                                                predecessors, (2, True)))
+            return True
+
+        self._mock_sync_point(mock_get, mock_update, stored, fail)
+
+        self.assertRaises(sync_point.SyncPointUpdateFailed,
+                          sync_point.sync, ctx, 'entity', 'traversal', True,
+                          mock_callback, predecessors, {(1, True): None})
+        # The handed over data was never written, so the second predecessor
+        # writes it itself
+        senders[0].wait()
+        self.assertEqual(coalesced + 1, sync_point.counters.get('coalesced'))
+        self.assertEqual({(2, True): None}, stored)
+        self.assertFalse(mock_callback.called)
+        self.assertEqual({}, sync_point._pending_updates)
+
+    @mock.patch.object(sync_point, 'update_input_data')
+    @mock.patch.object(sync_point, 'get')
+    def test_sync_coalesced_data_write_fails(self, mock_get, mock_update):
+        ctx = utils.dummy_context()
+        sync_point.cfg.CONF.set_override('sync_point_retry_limit', 0)
+        stored = {}
+        predecessors = {(1, True), (2, True), (3, True)}
+        mock_callback = mock.Mock()
+        senders = []
+
+        def fail(data):
+            if not senders:
+                # Another predecessor hands its data over while the first
+                # write is in progress
+                senders.append(self._sync_in_thread(ctx, mock_callback,
+                                                    predecessors, (2, True)))
+                return False
+            # Writing the handed over data fails
+            return True
+
+        self._mock_sync_point(mock_get, mock_update, stored, fail)
+
+        self.assertRaises(sync_point.SyncPointUpdateFailed,
+                          sync_point.sync, ctx, 'entity', 'traversal', True,
+                          mock_callback, predecessors, {(1, True): None})
+        self.assertRaises(sync_point.SyncPointUpdateFailed, senders[0].wait)
+        self.assertEqual({(1, True): None}, stored)
+        self.assertEqual(2, mock_update.call_count)
+        self.assertFalse(mock_callback.called)
+        self.assertEqual({}, sync_point._pending_updates)
@@ -15,6 +15,8 @@ import copy
 import json
 
 import fixtures
+import mock
+from oslo_config import cfg
 from oslotest import mockpatch
 import six
 from stevedore import extension
@@ -924,6 +926,114 @@ Mappings:
         self.assertEqual({}, empty_template['outputs'])
 
 
+class TemplateCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(TemplateCacheTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.tmpl_id = template.Template(
+            copy.deepcopy(resource_template)).store(self.ctx)
+        self.counters = template._template_cache.counters
+        self.counters.reset()
+
+    def test_load_cached(self):
+        with mock.patch.object(environment, 'Environment',
+                               wraps=environment.Environment) as mock_env:
+            t1 = template.Template.load(self.ctx, self.tmpl_id)
+            t2 = template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(1, mock_env.call_count)
+        self.assertEqual(1, self.counters.get('hits'))
+        self.assertEqual(1, self.counters.get('misses'))
+        self.assertIsNot(t1, t2)
+        self.assertEqual(self.tmpl_id, t2.id)
+        self.assertEqual(t1.t, t2.t)
+
+    def test_modified_template_not_shared(self):
+        t1 = template.Template.load(self.ctx, self.tmpl_id)
+        t1.add_resource(rsrc_defn.ResourceDefinition('new',
+                                                     'GenericResourceType'))
+        t1.remove_resource('foo')
+        t2 = template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(set(['blarg', 'new']),
+                         set(t1[t1.RESOURCES]))
+        self.assertEqual(set(['foo', 'blarg']),
+                         set(t2[t2.RESOURCES]))
+
+    def test_files_and_env_not_shared(self):
+        t1 = template.Template.load(self.ctx, self.tmpl_id)
+        t1.register_template_file('My::Type', 'my.yaml', 'data')
+        self.assertEqual('data', t1.files['my.yaml'])
+        self.assertEqual('my.yaml',
+                         t1.env.get_resource_info('My::Type').value)
+        t1.files['other.yaml'] = 'other'
+
+        t2 = template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(1, self.counters.get('hits'))
+        self.assertEqual({}, t2.files)
+        self.assertIsNone(t2.env.get_resource_info('My::Type'))
+
+    def test_dep_attrs_index_shared(self):
+        def dep_attrs():
+            tmpl = template.Template.load(self.ctx, self.tmpl_id)
+            stk = stack.Stack(self.ctx, 'test_stack', tmpl)
+            return tmpl.dep_attrs(stk, 'foo')
+
+        with mock.patch.object(rsrc_defn.ResourceDefinition, 'all_dep_attrs',
+                               return_value=[('foo', 'bar')]) as mock_all:
+            self.assertEqual(set(['bar']), dep_attrs())
+            self.assertEqual(2, mock_all.call_count)
+            self.assertEqual(set(['bar']), dep_attrs())
+            self.assertEqual(2, mock_all.call_count)
+        self.assertEqual(1, self.counters.get('hits'))
+
+    def test_modified_template_dep_attrs_not_shared(self):
+        t1 = template.Template.load(self.ctx, self.tmpl_id)
+        t1.dep_attrs(stack.Stack(self.ctx, 'test_stack', t1), 'foo')
+        t2 = template.Template.load(self.ctx, self.tmpl_id)
+        t2.remove_resource('blarg')
+        with mock.patch.object(rsrc_defn.ResourceDefinition, 'all_dep_attrs',
+                               return_value=[('foo', 'bar')]) as mock_all:
+            self.assertEqual(set(['bar']), t2.dep_attrs(
+                stack.Stack(self.ctx, 'test_stack', t2), 'foo'))
+            self.assertEqual(1, mock_all.call_count)
+            t3 = template.Template.load(self.ctx, self.tmpl_id)
+            self.assertEqual(set(), t3.dep_attrs(
+                stack.Stack(self.ctx, 'test_stack', t3), 'foo'))
+            self.assertEqual(1, mock_all.call_count)
+
+    def test_store_invalidates(self):
+        t1 = template.Template.load(self.ctx, self.tmpl_id)
+        t1.remove_resource('foo')
+        t1.store(self.ctx)
+        t2 = template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(set(['blarg']), set(t2[t2.RESOURCES]))
+        self.assertEqual(0, self.counters.get('hits'))
+
+    def test_recently_updated_not_cached(self):
+        t1 = template.Template.load(self.ctx, self.tmpl_id)
+        t1.remove_resource('blarg')
+        t1.store(self.ctx)
+        template.Template.load(self.ctx, self.tmpl_id)
+        template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(0, self.counters.get('hits'))
+
+    def test_cache_disabled(self):
+        cfg.CONF.set_override('template_cache_size', 0)
+        template.Template.load(self.ctx, self.tmpl_id)
+        template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(0, self.counters.get('hits'))
+
+    def test_cache_size_limit(self):
+        cfg.CONF.set_override('template_cache_size', 1)
+        other_id = template.Template(
+            copy.deepcopy(resource_template)).store(self.ctx)
+        template.Template.load(self.ctx, self.tmpl_id)
+        template.Template.load(self.ctx, other_id)
+        template.Template.load(self.ctx, self.tmpl_id)
+        self.assertEqual(0, self.counters.get('hits'))
+        self.assertEqual(2, self.counters.get('evictions'))
+
+
 class TemplateFnErrorTest(common.HeatTestCase):
     scenarios = [
         ('select_from_list_not_int',
@@ -21,6 +21,7 @@ from heat.common import exception
 from heat.engine import stack
 from heat.engine import template
 from heat.engine import watchrule
+from heat.objects import watch_data as watch_data_object
 from heat.objects import watch_rule
 from heat.tests import common
 from heat.tests import utils
@@ -383,6 +384,39 @@ class WatchRuleTest(common.HeatTestCase):
         self.assertEqual(now, self.wr.last_evaluated)
         self.assertEqual([], actions)
 
+    def test_evaluate_prunes_old_data(self):
+        rule = {'EvaluationPeriods': '1',
+                'MetricName': 'test_metric',
+                'Period': '300',
+                'Statistic': 'Maximum',
+                'ComparisonOperator': 'GreaterThanOrEqualToThreshold',
+                'Threshold': '30'}
+
+        now = timeutils.utcnow()
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+
+        last = now - datetime.timedelta(seconds=300)
+        old = WatchData(35, now - datetime.timedelta(seconds=400))
+        new = WatchData(25, now - datetime.timedelta(seconds=150))
+        self.wr = watchrule.WatchRule(context=self.ctx,
+                                      watch_name="testwatch",
+                                      rule=rule,
+                                      watch_data=[old, new],
+                                      stack_id=self.stack_id,
+                                      last_evaluated=last)
+        self.wr.store()
+        self.m.StubOutWithMock(watch_data_object.WatchData,
+                               'delete_older_than')
+        watch_data_object.WatchData.delete_older_than(
+            self.ctx, self.wr.id, now - datetime.timedelta(seconds=300))
+        self.m.ReplayAll()
+
+        self.wr.evaluate()
+        self.assertEqual('NORMAL', self.wr.state)
+        self.assertEqual([new], self.wr.watch_data)
+        self.m.VerifyAll()
+
     def test_evaluate_suspend(self):
         rule = {'EvaluationPeriods': '1',
                 'MetricName': 'test_metric',